@@ -0,0 +1,133 @@
+"""
+Vectorized backtester for calendar strategies over the election cycle.
+
+Strategies are columns of a (days x strategies) boolean mask: True means the
+strategy holds its "in" leg that day, False its "out" leg. Legs:
+
+    in_leg:  'long' (+index) or 'short' (-index)
+    out_leg: 'cash' (0%), 'rf' (risk-free rate) or 'short' (-index)
+
+All strategies are evaluated together: means and volatilities are linear in
+the mask, so they come from two matrix-vector products; equity curves and
+drawdowns from one cumulative sum of log returns and a running maximum over a
+(strategies x days) array. Strategy columns are processed in chunks to bound
+memory.
+"""
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+# Dataset convention: Cycle_Year = Year % 4 (0 Election, 1 Post, 2 Midterm, 3 Pre-Election)
+PHASE_LABELS = {1: 'Y1', 2: 'Y2', 3: 'Y3', 0: 'Y4'}
+
+
+def cycle_month(index):
+    """Month of the presidential term, 0 = January of Year 1 ... 47 = December of the election year."""
+    index = pd.DatetimeIndex(index)
+    return ((index.year - 1) % 4) * 12 + (index.month - 1)
+
+
+def phase_subset_masks(cycle_year):
+    """All 2^4 subsets of cycle phases as a (days x 16) mask, with names like 'Y1+Y3'."""
+    cycle_year = np.asarray(cycle_year)
+    phases = [1, 2, 3, 0]
+    masks, names = [], []
+    for size in range(len(phases) + 1):
+        for subset in combinations(phases, size):
+            masks.append(np.isin(cycle_year, subset))
+            names.append('+'.join(PHASE_LABELS[p] for p in subset) or 'None')
+    return np.column_stack(masks), names
+
+
+def month_window_masks(index, windows):
+    """
+    Masks for cycle-month windows [start, end) given as (start, end) pairs.
+
+    Months count from January of Year 1 (0) to December of the election year
+    (47); windows may wrap past 47, e.g. (42, 51) is Jul of the election year
+    through Mar of the next term's Year 1.
+    """
+    month = np.asarray(cycle_month(index))
+    masks, names = [], []
+    for start, end in windows:
+        offset = (month - start) % 48
+        masks.append(offset < (end - start))
+        names.append(f"M{start}-{end}")
+    return np.column_stack(masks), names
+
+
+def run_backtest(returns, masks, names=None, in_leg='long', out_leg='cash', rf=None,
+                 chunk_size=256, return_curves=False):
+    """
+    Evaluate every strategy column in `masks` against daily index `returns`.
+
+    Returns a DataFrame of metrics per strategy (and the equity curves as a
+    days x strategies array when return_curves=True). Sharpe ratios are of
+    returns in excess of rf when rf is given (always for out_leg='rf'), so a
+    strategy sitting in T-bills scores 0; without rf they use raw returns.
+    """
+    r = np.asarray(returns, dtype=np.float64)
+    masks = np.asarray(masks, dtype=bool)
+    n_days, n_strats = masks.shape
+    names = names if names is not None else [f"S{i}" for i in range(n_strats)]
+
+    in_ret = r if in_leg == 'long' else -r
+    if out_leg == 'cash':
+        out_ret = np.zeros_like(r)
+    elif out_leg == 'rf':
+        if rf is None:
+            raise ValueError("out_leg='rf' needs the rf series")
+        out_ret = np.asarray(rf, dtype=np.float64)
+    elif out_leg == 'short':
+        out_ret = -r
+    else:
+        raise ValueError(f"Unknown out_leg: {out_leg}")
+
+    # Sharpe uses excess returns: strategy - rf = (out - rf) + mask * (in - out)
+    rf_ret = np.zeros_like(r) if rf is None else np.asarray(rf, dtype=np.float64)
+    ex_in, ex_out = in_ret - rf_ret, out_ret - rf_ret
+
+    years = n_days / TRADING_DAYS
+    metrics = {key: np.empty(n_strats) for key in
+               ('Final', 'CAGR (%)', 'Vol (%)', 'Sharpe', 'Max DD (%)', 'Exposure')}
+    curves = np.empty((n_days, n_strats)) if return_curves else None
+
+    # Moments are linear in the mask: sum_t strat = mask' (in - out) + sum_t out
+    diff, diff_sq = in_ret - out_ret, in_ret ** 2 - out_ret ** 2
+    ex_diff_sq = ex_in ** 2 - ex_out ** 2
+    in_log, out_log = np.log1p(in_ret), np.log1p(out_ret)
+
+    for start in range(0, n_strats, chunk_size):
+        cols = slice(start, min(start + chunk_size, n_strats))
+        # Strategies x days layout keeps the running sums/maxima contiguous
+        m = np.ascontiguousarray(masks[:, cols].T)
+        mf = m.astype(np.float64)
+
+        total = mf @ diff + out_ret.sum()
+        total_sq = mf @ diff_sq + (out_ret ** 2).sum()
+        mean = total / n_days
+        std = np.sqrt(np.maximum(total_sq - total * mean, 0.0) / (n_days - 1))
+        ex_total = mf @ diff + ex_out.sum()
+        ex_mean = ex_total / n_days
+        ex_std = np.sqrt(np.maximum(mf @ ex_diff_sq + (ex_out ** 2).sum() - ex_total * ex_mean, 0.0) / (n_days - 1))
+
+        log_equity = np.cumsum(np.where(m, in_log, out_log), axis=1)
+        drawdown = (log_equity - np.maximum.accumulate(log_equity, axis=1)).min(axis=1)
+        final = np.exp(log_equity[:, -1])
+
+        metrics['Final'][cols] = final
+        metrics['CAGR (%)'][cols] = (final ** (1.0 / years) - 1.0) * 100
+        metrics['Vol (%)'][cols] = std * np.sqrt(TRADING_DAYS) * 100
+        with np.errstate(divide='ignore', invalid='ignore'):
+            metrics['Sharpe'][cols] = np.where(ex_std > 0, ex_mean / ex_std * np.sqrt(TRADING_DAYS), 0.0)
+        metrics['Max DD (%)'][cols] = np.expm1(drawdown) * 100
+        metrics['Exposure'][cols] = mf.mean(axis=1)
+        if return_curves:
+            curves[:, cols] = np.exp(log_equity).T
+
+    table = pd.DataFrame(metrics, index=pd.Index(names, name='Strategy'))
+    table.insert(0, 'Legs', f"{in_leg}/{out_leg}")
+    return (table, curves) if return_curves else table
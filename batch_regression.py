@@ -0,0 +1,145 @@
+"""
+Batched OLS with HAC standard errors across specifications and assets.
+
+Each specification's design matrix is factorized once (QR) and solved for all
+response columns together. The Newey-West meat for every column comes from
+one matrix product per lag:
+
+    Gamma_l[i, j] for all columns = (X_t,i * X_t-l,j)' @ (e_t * e_t-l)
+
+so thousands of (spec, asset, lag) fits cost a handful of BLAS calls instead
+of one statsmodels fit each. Coefficients and HAC errors match
+sm.OLS(y, X).fit(cov_type='HAC', cov_kwds={'maxlags': L}) (Bartlett weights,
+no small-sample correction, normal p-values).
+"""
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from rolling_regression import bartlett_weights
+
+FACTOR_SETS = {
+    'FF3': ['Mkt_RF', 'SMB', 'HML'],
+    'FF5': ['Mkt_RF', 'SMB', 'HML', 'RMW', 'CMA'],
+    'FF5_MOM': ['Mkt_RF', 'SMB', 'HML', 'RMW', 'CMA', 'Mom'],
+}
+
+# Cycle_Year 0 (Election) is the base phase when all phases get a dummy
+PHASE_DUMMIES = {1: 'Is_Year1', 2: 'Is_Year2', 3: 'Is_Year3'}
+
+
+def load_extended_factors(start="1950-01-01"):
+    """FF5 + momentum daily factors (decimals) with column names matching the dataset."""
+    from data_providers import get_provider
+    provider = get_provider('famafrench')
+    ff5 = provider.fetch('F-F_Research_Data_5_Factors_2x3_daily', start=start)
+    mom = provider.fetch('F-F_Momentum_Factor_daily', start=start)
+    mom.columns = [c.strip() for c in mom.columns]
+    factors = ff5.join(mom[['Mom']], how='inner')
+    return factors.rename(columns={'Mkt-RF': 'Mkt_RF'})
+
+
+def build_designs(df, factor_sets=('FF3', 'FF5', 'FF5_MOM'), phase_modes=('year3', 'all')):
+    """
+    Design matrices {spec_name: X} for every factor set x phase-dummy choice.
+
+    'year3' adds the Is_Year3 dummy; 'all' adds one dummy per phase with the
+    election year as base. Factor sets whose columns are missing from df are
+    skipped.
+    """
+    cycle = df['Cycle_Year'].to_numpy()
+    dummies = pd.DataFrame({name: (cycle == phase).astype(float) for phase, name in PHASE_DUMMIES.items()},
+                           index=df.index)
+    designs = {}
+    for set_name in factor_sets:
+        factors = FACTOR_SETS[set_name]
+        missing = [c for c in factors if c not in df.columns]
+        if missing:
+            print(f"Skipping {set_name}: missing columns {missing}")
+            continue
+        for mode in phase_modes:
+            phase_cols = ['Is_Year3'] if mode == 'year3' else list(PHASE_DUMMIES.values())
+            X = pd.concat([df[factors].astype(float), dummies[phase_cols]], axis=1)
+            X.insert(0, 'const', 1.0)
+            designs[f"{set_name}+{mode}"] = X
+    return designs
+
+
+def _hac_gammas(X, E, max_lag):
+    # Gamma_l as (m, k, k) for l = 0..max_lag, all response columns at once
+    n, k = X.shape
+    gammas = []
+    for lag in range(max_lag + 1):
+        xx = (X[lag:, :, None] * X[:n - lag, None, :]).reshape(n - lag, k * k)
+        ee = E[lag:] * E[:n - lag]
+        gammas.append((xx.T @ ee).T.reshape(-1, k, k))
+    return gammas
+
+
+def _fit_block(X, Y, hac_lags):
+    # One factorization of X, solved for every column of Y
+    q, r = np.linalg.qr(X)
+    coef = np.linalg.solve(r, q.T @ Y)
+    r_inv = np.linalg.inv(r)
+    xx_inv = r_inv @ r_inv.T
+    resid = Y - X @ coef
+
+    gammas = _hac_gammas(X, resid, max(hac_lags))
+    out = {}
+    for lags in hac_lags:
+        weights = bartlett_weights(lags)
+        S = gammas[0].copy()
+        for lag in range(1, lags + 1):
+            S += weights[lag] * (gammas[lag] + gammas[lag].transpose(0, 2, 1))
+        cov_diag = np.einsum('ij,mjl,li->mi', xx_inv, S, xx_inv)
+        out[lags] = np.sqrt(cov_diag)
+    return coef.T, out
+
+
+def batch_ols(Y, designs, hac_lags=(1,), chunk_columns=512):
+    """
+    Fit every response column of Y against every design in `designs`.
+
+    Y: DataFrame (days x responses); designs: {spec_name: X DataFrame} sharing
+    Y's index. Rows with missing regressors are dropped per spec; response
+    columns are grouped by their own missing-data pattern so each group
+    shares one factorization. Returns a tidy frame with one row per
+    (spec, response, hac_lags, term).
+    """
+    if isinstance(Y, pd.Series):
+        Y = Y.to_frame()
+    hac_lags = sorted(set(hac_lags))
+    rows = []
+    for spec, X in designs.items():
+        X = X.dropna()
+        Ys = Y.loc[X.index]
+        terms = list(X.columns)
+        # Columns with identical missing-data patterns share the same rows
+        patterns = {}
+        for col in Ys.columns:
+            patterns.setdefault(Ys[col].notna().to_numpy().tobytes(), []).append(col)
+
+        for cols in patterns.values():
+            mask = Ys[cols[0]].notna().to_numpy()
+            if mask.sum() <= len(terms):
+                continue
+            Xv = X.to_numpy(dtype=np.float64)[mask]
+            for start in range(0, len(cols), chunk_columns):
+                chunk = cols[start:start + chunk_columns]
+                coef, se_by_lag = _fit_block(Xv, Ys[chunk].to_numpy(dtype=np.float64)[mask], hac_lags)
+                for lags, se in se_by_lag.items():
+                    t_stat = coef / se
+                    rows.append(pd.DataFrame({
+                        'spec': spec,
+                        'response': np.repeat(chunk, len(terms)),
+                        'hac_lags': lags,
+                        'term': np.tile(terms, len(chunk)),
+                        'coef': coef.ravel(),
+                        'std_err': se.ravel(),
+                        't_stat': t_stat.ravel(),
+                        'p_value': 2 * stats.norm.sf(np.abs(t_stat.ravel())),
+                        'nobs': int(mask.sum()),
+                    }))
+
+    columns = ['spec', 'response', 'hac_lags', 'term', 'coef', 'std_err', 't_stat', 'p_value', 'nobs']
+    return pd.concat(rows, ignore_index=True) if rows else pd.DataFrame(columns=columns)
@@ -0,0 +1,258 @@
+"""
+Offline benchmark suite on synthetic data.
+
+Synthetic datasets follow the institutional_data.pkl schema (SP500_Ret,
+Mkt_RF, SMB, HML, RF, Cycle_Year, Is_Year3, ...) over 75 to 1,000 years of
+business days, plus return panels of 1 to 1,000 assets driven by the same
+factors. Nothing is downloaded. Dates use second resolution so multi-century
+indexes fit pandas' datetime range.
+
+Each case times the code path used by the analysis scripts (bootstrap,
+rolling OLS, full HAC regression, batched OLS, election event study,
+drawdowns, annual cycle metrics): best and median wall time over --repeat
+runs after a warm-up run, then one extra run under tracemalloc for the peak
+traced memory. Results are appended to benchmark_results.jsonl with the git
+commit, so
+
+    python benchmarks.py                 # run the suite
+    python benchmarks.py --quick         # smallest size of each case
+    python benchmarks.py --compare       # latest commit vs the previous one
+
+shows regressions across commits (slowdowns beyond --threshold are flagged).
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+RESULTS_FILE = "benchmark_results.jsonl"
+YEARS = (75, 250, 1000)
+ASSETS = (1, 10, 100, 1000)
+# Panel cases skip sizes above this many asset-years (~150 MB of float64 returns)
+MAX_ASSET_YEARS = 75_000
+BOOT_SIMS = 1000
+FACTORS = ['Mkt_RF', 'SMB', 'HML']
+
+
+def business_days(years, start_year=None):
+    """Weekday index covering `years` calendar years ending in 2024 (second resolution)."""
+    start_year = 2025 - years if start_year is None else start_year
+    days = np.arange(f"{start_year}-01-01", f"{start_year + years}-01-01", dtype='datetime64[D]')
+    weekday = (days.astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday
+    return pd.DatetimeIndex(days[weekday < 5].astype('datetime64[s]'), name='Date')
+
+
+def synthetic_dataset(years=75, seed=0):
+    """Daily frame with the institutional_data.pkl columns and a built-in Year 3 premium."""
+    rng = np.random.default_rng(seed)
+    index = business_days(years)
+    n = len(index)
+    cycle = index.year % 4
+    mkt = rng.normal(0.0003, 0.01, n) + np.where(cycle == 3, 0.0004, 0.0)
+    smb = rng.normal(0.0, 0.005, n)
+    hml = rng.normal(0.0001, 0.005, n)
+    rf = np.full(n, 0.00015) + rng.normal(0.0, 0.00001, n)
+    df = pd.DataFrame({
+        'SP500_Ret': rf + mkt - 0.1 * smb + 0.05 * hml + rng.normal(0.0, 0.001, n),
+        'Mkt_RF': mkt, 'SMB': smb, 'HML': hml, 'RF': rf,
+    }, index=index)
+    df['Year'] = index.year
+    df['Cycle_Year'] = cycle
+    df['Is_Year3'] = (cycle == 3).astype(int)
+    df['Is_Election'] = (cycle == 0).astype(int)
+    return df
+
+
+def synthetic_panel(df, assets, seed=1):
+    """Daily returns (days x assets) with random market betas and idiosyncratic noise."""
+    rng = np.random.default_rng(seed)
+    beta = rng.uniform(0.5, 1.5, assets)
+    idio = rng.uniform(0.005, 0.02, assets)
+    noise = rng.standard_normal((len(df), assets)) * idio
+    returns = df['RF'].to_numpy()[:, None] + df['Mkt_RF'].to_numpy()[:, None] * beta + noise
+    return pd.DataFrame(returns, index=df.index, columns=[f"A{i:04d}" for i in range(assets)])
+
+
+# --- Cases: setup(df, panel, sims) returns the zero-argument callable to time ---
+
+def _excess(df):
+    return df.assign(Excess_Ret=df['SP500_Ret'] - df['RF'])
+
+
+def _design(df):
+    X = df[FACTORS + ['Is_Year3']].astype(float)
+    X.insert(0, 'const', 1.0)
+    return X
+
+
+def case_bootstrap_iid(df, panel, sims):
+    from bootstrap import sharpe_diff_bootstrap
+    excess = df['SP500_Ret'] - df['RF']
+    year3 = df['Is_Year3'] == 1
+    return lambda: sharpe_diff_bootstrap(excess[year3], excess[~year3], n_sims=sims, seed=42)
+
+
+def case_bootstrap_block(df, panel, sims):
+    from bootstrap import parallel_sharpe_diff_bootstrap
+    excess = df['SP500_Ret'] - df['RF']
+    year3 = df['Is_Year3'] == 1
+    return lambda: parallel_sharpe_diff_bootstrap(excess[year3], excess[~year3], n_sims=sims, seed=42,
+                                                  method='stationary', block_length=20, n_workers=1)
+
+
+def case_rolling_ols(df, panel, sims):
+    from rolling_regression import rolling_ols
+    data = _excess(df)
+    return lambda: rolling_ols(data['Excess_Ret'], _design(data), [252, 1260], hac_lags=1)
+
+
+def case_hac_regression(df, panel, sims):
+    from institutional_analysis import full_regression
+    data = _excess(df)
+    return lambda: full_regression(data)
+
+
+def case_batch_ols(df, panel, sims):
+    from batch_regression import batch_ols
+    excess = panel.sub(df['RF'], axis=0)
+    X = _design(df)
+    return lambda: batch_ols(excess, {'FF3+year3': X}, hac_lags=(1,))
+
+
+def case_event_study(df, panel, sims):
+    from event_study import event_study
+    excess = panel.sub(df['RF'], axis=0)
+    return lambda: event_study(excess, df, n_boot=sims)
+
+
+def case_drawdown(df, panel, sims):
+    from drawdown import drawdown_stats
+    curves = (1 + panel).cumprod()
+    return lambda: drawdown_stats(curves, top_n=3)
+
+
+def case_annual_metrics(df, panel, sims):
+    from universe_analysis import annual_returns, cycle_phase_table
+    prices = (1 + panel).cumprod()
+    return lambda: cycle_phase_table(annual_returns(prices))
+
+
+# name -> (setup, scales over which it runs: 'years' for one series, 'panel' for assets)
+CASES = {
+    'bootstrap_iid': (case_bootstrap_iid, 'years'),
+    'bootstrap_block': (case_bootstrap_block, 'years'),
+    'rolling_ols': (case_rolling_ols, 'years'),
+    'hac_regression': (case_hac_regression, 'years'),
+    'batch_ols': (case_batch_ols, 'panel'),
+    'event_study': (case_event_study, 'panel'),
+    'drawdown': (case_drawdown, 'panel'),
+    'annual_metrics': (case_annual_metrics, 'panel'),
+}
+
+
+def sizes_for(scale, years, assets):
+    if scale == 'years':
+        return [(y, 1) for y in years]
+    return [(y, a) for y in years for a in assets if y * a <= MAX_ASSET_YEARS]
+
+
+def measure(func, repeat):
+    """Best/median wall time over `repeat` runs, then peak traced MB of one more run."""
+    func()  # warm-up: lazy imports, first-touch allocations
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(timings), float(np.median(timings)), peak / 2 ** 20
+
+
+def _git(*args):
+    try:
+        return subprocess.run(['git', *args], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(cases=None, years=YEARS, assets=ASSETS, repeat=3, sims=BOOT_SIMS, quick=False, path=RESULTS_FILE):
+    commit = _git('rev-parse', '--short', 'HEAD') or 'unknown'
+    dirty = bool(_git('status', '--porcelain', '--untracked-files=no'))
+    run_id = datetime.datetime.now().isoformat(timespec='seconds')
+    machine = {'python': platform.python_version(), 'numpy': np.__version__, 'pandas': pd.__version__,
+               'machine': platform.machine(), 'cpus': os.cpu_count()}
+    print(f"Benchmarks at {commit}{' (dirty)' if dirty else ''}, {repeat} repeats, {sims:,} bootstrap draws")
+
+    datasets, panels, records = {}, {}, []
+    for name in cases or CASES:
+        setup, scale = CASES[name]
+        sizes = sizes_for(scale, years, assets)
+        for n_years, n_assets in sizes[:1] if quick else sizes:
+            if n_years not in datasets:
+                datasets[n_years] = synthetic_dataset(n_years)
+            df = datasets[n_years]
+            if scale == 'panel' and (n_years, n_assets) not in panels:
+                panels[(n_years, n_assets)] = synthetic_panel(df, n_assets)
+            func = setup(df, panels.get((n_years, n_assets)), sims)
+            best, median, peak = measure(func, repeat)
+            record = {'run': run_id, 'commit': commit, 'dirty': dirty, 'case': name, 'years': n_years,
+                      'assets': n_assets, 'rows': len(df), 'sims': sims if name.startswith('bootstrap') else None,
+                      'best_s': best, 'median_s': median, 'peak_mb': peak, **machine}
+            records.append(record)
+            print(f"{name:<16} {n_years:>5} yrs x {n_assets:>4} assets: best {best:8.4f}s  "
+                  f"median {median:8.4f}s  peak {peak:8.1f} MB")
+
+    with open(path, 'a', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+    print(f"Appended {len(records)} results to {path}")
+    return records
+
+
+def compare(path=RESULTS_FILE, threshold=1.2):
+    """Latest run vs the most recent run from a different commit, per case and size."""
+    history = pd.read_json(path, lines=True)
+    latest = history[history['run'] == history['run'].max()]
+    earlier = history[history['commit'] != latest['commit'].iloc[0]]
+    if earlier.empty:
+        print("No results from an earlier commit to compare against.")
+        return None
+    baseline = earlier[earlier['run'] == earlier['run'].max()]
+    keys = ['case', 'years', 'assets']
+    table = latest.merge(baseline, on=keys, suffixes=('', '_base'))[keys + ['best_s', 'best_s_base', 'peak_mb', 'peak_mb_base']]
+    table['ratio'] = table['best_s'] / table['best_s_base']
+    table['flag'] = np.where(table['ratio'] > threshold, 'SLOWER', np.where(table['ratio'] < 1 / threshold, 'faster', ''))
+    print(f"{latest['commit'].iloc[0]} vs {baseline['commit'].iloc[0]} (flag at {threshold:.2f}x)")
+    print(table.to_string(index=False, float_format='%.4f'))
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmarks on synthetic election-cycle data.")
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), help="Subset of cases (default: all)")
+    parser.add_argument('--years', nargs='+', type=int, default=list(YEARS))
+    parser.add_argument('--assets', nargs='+', type=int, default=list(ASSETS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--sims', type=int, default=BOOT_SIMS, help="Bootstrap replicates per timed run")
+    parser.add_argument('--quick', action='store_true', help="Only the smallest size of each case")
+    parser.add_argument('--compare', action='store_true', help="Compare stored results instead of running")
+    parser.add_argument('--threshold', type=float, default=1.2)
+    parser.add_argument('--path', default=RESULTS_FILE)
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(args.path, args.threshold)
+    else:
+        run_suite(args.cases, args.years, args.assets, args.repeat, args.sims, args.quick, args.path)
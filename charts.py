@@ -0,0 +1,174 @@
+"""
+Headless, downsampled line charts for long daily series.
+
+A 75-year daily curve has ~19k points but a 12-inch PNG has ~1,200 pixel
+columns, so most of the drawing (and PNG size) goes on points nobody can see.
+Series are reduced to at most MAX_POINTS before plotting:
+
+  - 'lttb' (Largest-Triangle-Three-Buckets) keeps the visually dominant point
+    of each bucket, plus the global minimum and maximum;
+  - 'minmax' keeps every bucket's minimum and maximum, so no peak or
+    drawdown trough is lost (for underwater/drawdown plots).
+
+Charts are drawn with matplotlib's object API on an Agg canvas (no pyplot
+state, no GUI backend, nothing to close). Each named template in TEMPLATES
+builds its figure, axes and line artists once per process; rendering only
+swaps the line data, so chart time and file size stay flat as history grows.
+
+    python charts.py        # timing and PNG size for 10k..1M point series
+"""
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+from profiling import stage
+
+MAX_POINTS = 2000
+
+
+def _x_values(index):
+    if isinstance(index, pd.DatetimeIndex):
+        return index.asi8.astype(np.float64)
+    return np.asarray(index, dtype=np.float64)
+
+
+def lttb_indices(x, y, n_out):
+    """Positions selected by Largest-Triangle-Three-Buckets (first and last always kept)."""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    # n_out - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[hi:next_hi].mean()
+        avg_y = y[hi:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        idx[i + 1] = a
+    return idx
+
+
+def minmax_indices(y, n_out):
+    """Positions of each bucket's minimum and maximum (plus the endpoints), in order."""
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    buckets = max(n_out // 2, 1)
+    starts = np.arange(buckets) * n // buckets
+    bucket = np.repeat(np.arange(buckets), np.diff(np.r_[starts, n]))
+    keep = [[0, n - 1]]
+    for reduce in (np.minimum, np.maximum):
+        hits = np.flatnonzero(y == reduce.reduceat(y, starts)[bucket])
+        # First hit per bucket (flat stretches would otherwise keep every tie)
+        keep.append(hits[np.r_[True, bucket[hits][1:] != bucket[hits][:-1]]])
+    return np.unique(np.concatenate(keep))
+
+
+def downsample(series, max_points=MAX_POINTS, method='lttb', log=False):
+    """
+    Subset of a Series for display, at most ~max_points long (NaNs dropped).
+
+    log=True selects points on log values (for log-scale axes).
+    """
+    series = series.dropna()
+    if len(series) <= max_points:
+        return series
+    y = series.to_numpy(dtype=np.float64)
+    if log:
+        y = np.log(np.where(y > 0, y, np.nan))
+        y = np.where(np.isnan(y), np.nanmin(y), y)
+    if method == 'minmax':
+        idx = minmax_indices(y, max_points)
+    elif method == 'lttb':
+        idx = np.union1d(lttb_indices(_x_values(series.index), y, max_points), [y.argmin(), y.argmax()])
+    else:
+        raise ValueError(f"Unknown downsampling method {method!r}")
+    return series.iloc[idx]
+
+
+class LineChart:
+    """Figure, axes and styled line artists built once; render() only swaps the data."""
+
+    def __init__(self, lines, title, ylabel=None, log=False, hline=None, method='lttb',
+                 figsize=(12, 6), dpi=100):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        self.fig = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot()
+        self.log = log
+        self.method = method
+        self.lines = {}
+        for column, label, style in lines:
+            self.lines[column], = self.ax.plot([], [], label=label, **style)
+        if hline is not None:
+            self.ax.axhline(hline, color='red', linestyle='--')
+        if log:
+            self.ax.set_yscale('log')
+        self.ax.xaxis_date()
+        self.ax.set_title(title)
+        if ylabel:
+            self.ax.set_ylabel(ylabel)
+        self.ax.legend()
+        self.ax.grid(True)
+
+    def render(self, data, max_points=MAX_POINTS):
+        """PNG bytes for a DataFrame holding one column per line."""
+        from matplotlib.dates import date2num
+
+        for column, line in self.lines.items():
+            shown = downsample(data[column], max_points, self.method, self.log)
+            line.set_data(date2num(shown.index), shown.to_numpy())
+        self.ax.relim()
+        self.ax.autoscale_view()
+        buf = io.BytesIO()
+        self.fig.savefig(buf, format='png')
+        return buf.getvalue()
+
+
+TEMPLATES = {
+    'rolling_alpha': dict(
+        lines=[('gamma', 'Year 3 Alpha (Rolling 5Y)', {'color': 'blue'})],
+        title='Rolling 5-Year Alpha Coefficient for Pre-Election Year (Year 3)',
+        ylabel='Alpha coef', hline=0),
+    'equity_curve': dict(
+        lines=[('BuyHold_Curve', 'Buy & Hold', {'color': 'gray', 'alpha': 0.6}),
+               ('Strategy_Curve', 'Year 3 Only', {'color': 'green'})],
+        title='Equity Curve: Year 3 Only vs Buy & Hold (Log Scale)', log=True),
+}
+_charts = {}
+
+
+def get_chart(name):
+    """The process-wide LineChart for a named template, built on first use."""
+    if name not in _charts:
+        _charts[name] = LineChart(**TEMPLATES[name])
+    return _charts[name]
+
+
+def render_chart(name, data, max_points=MAX_POINTS):
+    """Render a named template to PNG bytes."""
+    with stage('plot', rows=len(data), chart=name):
+        return get_chart(name).render(data, max_points)
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    for n in [10_000, 100_000, 1_000_000]:
+        index = pd.date_range("1700-01-01", "2024-12-31", periods=n)
+        rets = pd.Series(rng.normal(0.0003, 0.01, n), index=index)
+        curves = pd.DataFrame({'BuyHold_Curve': (1 + rets).cumprod(),
+                               'Strategy_Curve': (1 + rets.where(index.year % 4 == 3, 0.0)).cumprod()})
+        render_chart('equity_curve', curves)  # build the template outside the timing
+        for points in [n, MAX_POINTS]:
+            start = time.perf_counter()
+            png = render_chart('equity_curve', curves, max_points=points)
+            print(f"{n:>9,} points, drawing {min(points, n):>9,}: {time.perf_counter() - start:6.3f}s, {len(png) / 1024:6.0f} KB")
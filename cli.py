@@ -0,0 +1,202 @@
+"""
+Single entry point for the research pipeline.
+
+    python cli.py fetch [--incremental]        # download / top up institutional_data.pkl
+    python cli.py analyze [annual|institutional] [--ff5]
+    python cli.py bootstrap [--sims N ...]     # Sharpe-difference bootstrap only
+    python cli.py report [annual|institutional|notebook|readme]
+    python cli.py live                         # incremental refresh of the live metrics
+    python cli.py show [SECTION]               # key numbers from results.json
+    python cli.py startup                      # startup-time guard for `show`
+    python cli.py --profile trace.json analyze # per-stage timings (see profiling.py)
+
+Only the standard library is imported at module level. Each subcommand imports
+what it needs (pandas, statsmodels, matplotlib, reportlab, yfinance) inside
+its handler, so `show` reads results.json without paying for any of them.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+# Modules that `show` must never pull in (checked by `startup`)
+HEAVY_MODULES = ('numpy', 'pandas', 'scipy', 'statsmodels', 'matplotlib', 'reportlab',
+                 'yfinance', 'pandas_datareader', 'seaborn')
+STARTUP_BUDGET_MS = 200
+
+
+def cmd_fetch(args):
+    from fetch_data import fetch_data, refresh_data
+    if args.incremental:
+        refresh_data()
+    else:
+        fetch_data()
+
+
+def cmd_analyze(args):
+    if args.part in ('all', 'annual'):
+        from election_analysis import analyze_election_cycle
+        analyze_election_cycle()
+    if args.part in ('all', 'institutional'):
+        from institutional_analysis import run_analysis
+        run_analysis(extended_factors=args.ff5)
+
+
+def cmd_bootstrap(args):
+    from column_store import load_dataset
+    from institutional_analysis import DATA_FILE, excess_returns, sharpe_bootstrap
+    from stage_cache import StageCache
+
+    df = excess_returns(load_dataset(DATA_FILE))
+    # Same stage name and parameters as run_analysis, so either run reuses the other's result
+    boot = StageCache().run('sharpe_bootstrap', sharpe_bootstrap, df[['Excess_Ret', 'Is_Year3']],
+                            n_sims=args.sims, block_sims=args.block_sims,
+                            block_length=args.block_length, seed=args.seed)
+    print(f"i.i.d. bootstrap p = {boot['p_iid']:.5f} ({args.sims:,} draws)")
+    print(f"Stationary block bootstrap p = {boot['p_block']:.5f} ({args.block_sims:,} draws, "
+          f"mean block {args.block_length} days)")
+
+
+def cmd_live(args):
+    from live_state import print_snapshot, sync
+    _, snapshot = sync()
+    print_snapshot(snapshot)
+
+
+def cmd_report(args):
+    if args.kind in ('all', 'annual'):
+        from generate_pdf import create_pdf
+        create_pdf("Pre_Election_Alpha_Paper.pdf")
+    if args.kind in ('all', 'institutional'):
+        from generate_institutional_pdf import create_pdf
+        create_pdf("Institutional_Research_Paper.pdf")
+    if args.kind in ('all', 'notebook'):
+        import runpy
+        runpy.run_module('create_notebook', run_name='__main__')
+    if args.kind in ('all', 'readme'):
+        from results_artifact import load_results, render_readme
+        render_readme(load_results())
+
+
+def cmd_show(args):
+    from results_artifact import RESULTS_FILE, load_results, row, significance
+
+    results = load_results(args.path)
+    print(f"{args.path} (schema v{results['schema_version']}, generated {results['generated_at']})")
+    for name in ('institutional_data.pkl', RESULTS_FILE):
+        if os.path.exists(name):
+            stamp = time.strftime('%Y-%m-%d %H:%M', time.localtime(os.path.getmtime(name)))
+            print(f"  {name:<24} {os.path.getsize(name) / 1024:>8,.0f} KB  modified {stamp}")
+        else:
+            print(f"  {name:<24} missing")
+
+    annual = results.get('annual')
+    if annual and args.section in (None, 'annual'):
+        y3 = row(annual['phases'], "Pre-Election (Year 3)")
+        bh = row(annual['metrics'], "Buy & Hold (All)")
+        test = annual['ttest']
+        print(f"\nAnnual ({annual['start_year']}-{annual['end_year']}, updated {annual['updated_at']})")
+        print(f"  Year 3 mean {y3['Mean (%)']:.2f}%  vol {y3['Vol (%)']:.2f}%  Sharpe {y3['Sharpe']:.2f}  "
+              f"win rate {y3['Win Rate']:.0%}")
+        print(f"  Buy & Hold mean {bh['Mean (%)']:.2f}%  vol {bh['Vol (%)']:.2f}%  Sharpe {bh['Sharpe']:.2f}")
+        print(f"  Welch t = {test['t_stat']:.4f}, p = {test['p_value']:.4f} ({significance(test['p_value']).lower()})")
+
+    inst = results.get('institutional')
+    if inst and args.section in (None, 'institutional'):
+        reg = inst['regression']
+        boot = inst['sharpe_bootstrap']
+        dd = {entry['Curve']: entry for entry in inst['drawdown']['summary']}
+        print(f"\nInstitutional ({inst['data']['start']} to {inst['data']['end']}, "
+              f"{inst['data']['rows']:,} days, updated {inst['updated_at']})")
+        print(f"  Year 3 alpha {reg['params']['Is_Year3']:.6f}/day, HAC t = {reg['tvalues']['Is_Year3']:.2f}, "
+              f"p = {reg['pvalues']['Is_Year3']:.4f}")
+        print(f"  Sharpe bootstrap p = {boot['p_iid']:.4f} (i.i.d.), {boot['p_block']:.4f} (block)")
+        print(f"  Max drawdown: Year 3 {dd['Strategy_Curve']['Max DD (%)']:.2f}%, "
+              f"Buy & Hold {dd['BuyHold_Curve']['Max DD (%)']:.2f}%")
+
+    live = results.get('live')
+    if live and args.section in (None, 'live'):
+        reg = live['regression']
+        dd = live['drawdown']
+        print(f"\nLive (as of {live['as_of']}, {live['rows']:,} days, updated {live['updated_at']})")
+        print(f"  Year 3 alpha {reg['params']['Is_Year3']:.6f}/day, HAC t = {reg['tvalues']['Is_Year3']:.2f}")
+        rolling = [f"{window}d {v['gamma']:.6f} (t {v['t_hac']:.2f})" for window, v in
+                   sorted(live['rolling'].items(), key=lambda item: int(item[0])) if v['gamma'] is not None]
+        print(f"  Rolling Year 3 alpha: {', '.join(rolling) or 'n/a'}")
+        print(f"  Drawdown now: Year 3 {dd['year3']['current_dd']:.2f}% (max {dd['year3']['max_dd']:.2f}%), "
+              f"Buy & Hold {dd['buy_hold']['current_dd']:.2f}% (max {dd['buy_hold']['max_dd']:.2f}%)")
+
+
+def cmd_startup(args):
+    """Time `cli.py show` in fresh interpreters and fail if it is slow or imports heavy modules."""
+    command = [sys.executable, os.path.abspath(__file__), 'show', '--path', args.path]
+    timings = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    median = sorted(timings)[len(timings) // 2]
+
+    # -X importtime lists every module imported, one per stderr line
+    trace = subprocess.run([sys.executable, '-X', 'importtime'] + command[1:], check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True).stderr
+    imported = {line.rsplit('|', 1)[-1].strip().split('.')[0] for line in trace.splitlines() if '|' in line}
+    heavy = sorted(imported.intersection(HEAVY_MODULES))
+
+    print(f"`show` startup: median {median:.0f} ms over {args.runs} runs "
+          f"(min {min(timings):.0f}, max {max(timings):.0f}; budget {args.budget_ms} ms)")
+    print(f"Heavy modules imported: {', '.join(heavy) or 'none'}")
+    if median > args.budget_ms or heavy:
+        sys.exit(1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Presidential election cycle research pipeline.")
+    parser.add_argument('--profile', metavar='TRACE', help="Append per-stage timings and memory to a Chrome trace file")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    fetch = sub.add_parser('fetch', help="Download S&P 500 and Fama-French daily data")
+    fetch.add_argument('--incremental', action='store_true', help="Append only the days missing from the cache")
+    fetch.set_defaults(func=cmd_fetch)
+
+    analyze = sub.add_parser('analyze', help="Run the annual and/or institutional analysis")
+    analyze.add_argument('part', nargs='?', choices=['all', 'annual', 'institutional'], default='all')
+    analyze.add_argument('--ff5', action='store_true', help="Add FF5 and FF5 + momentum specs to the regression grid")
+    analyze.set_defaults(func=cmd_analyze)
+
+    boot = sub.add_parser('bootstrap', help="Sharpe-difference bootstrap on the daily data")
+    boot.add_argument('--sims', type=int, default=10000)
+    boot.add_argument('--block-sims', type=int, default=100000)
+    boot.add_argument('--block-length', type=int, default=20)
+    boot.add_argument('--seed', type=int, default=42)
+    boot.set_defaults(func=cmd_bootstrap)
+
+    live = sub.add_parser('live', help="Append new days to the live checkpoint and refresh its metrics")
+    live.set_defaults(func=cmd_live)
+
+    report = sub.add_parser('report', help="Render PDFs, the notebook or README tables from results.json")
+    report.add_argument('kind', nargs='?', choices=['all', 'annual', 'institutional', 'notebook', 'readme'],
+                        default='all')
+    report.set_defaults(func=cmd_report)
+
+    show = sub.add_parser('show', help="Print key results and data status")
+    show.add_argument('section', nargs='?', choices=['annual', 'institutional', 'live'])
+    show.add_argument('--path', default='results.json')
+    show.set_defaults(func=cmd_show)
+
+    startup = sub.add_parser('startup', help="Benchmark `show` startup time and check its imports")
+    startup.add_argument('--runs', type=int, default=7)
+    startup.add_argument('--budget-ms', type=int, default=STARTUP_BUDGET_MS)
+    startup.add_argument('--path', default='results.json')
+    startup.set_defaults(func=cmd_startup)
+
+    args = parser.parse_args(argv)
+    if args.profile:
+        from profiling import enable
+        enable(args.profile)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
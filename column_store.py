@@ -0,0 +1,223 @@
+"""
+Memory-mapped columnar store for the daily dataset.
+
+institutional_data.pkl is a pandas pickle: every process that reads it parses
+and owns a full private copy. The store keeps the same frame as one .npy file
+per column plus the date index and a meta.json, using compact dtypes
+(Cycle_Year int8, Is_Year3/Is_Election bool, Year int16). open_store() memory-maps the files read-only and wraps them in a
+DataFrame without copying, so opening is near-instant and every process
+(notebook kernels, pool workers) reads the same page-cache pages.
+
+load_dataset() is the drop-in replacement for pd.read_pickle(DATA_FILE): it
+opens <name>.columns/ next to the pickle, rebuilding it first when the pickle
+is newer than the store (or the store is missing). Float columns keep full
+float64 precision; load_dataset(float32=True) reads a separate
+<name>.f32.columns/ store with float32 returns instead, so the halved
+footprint is always an explicit choice of the reader.
+
+    python column_store.py build [--float32]   # (re)build from institutional_data.pkl
+    python column_store.py info
+    python column_store.py bench --workers 4   # load time and per-worker private memory
+    python column_store.py bench --years 1000  # same on a synthetic 1000-year dataset
+"""
+import argparse
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+DATA_FILE = "institutional_data.pkl"
+STORE_SUFFIX = ".columns"
+FLOAT32_SUFFIX = ".f32.columns"
+OPEN_RETRIES = 5
+STORE_VERSION = 1
+COMPACT_DTYPES = {'Cycle_Year': np.int8, 'Is_Year3': np.bool_, 'Is_Election': np.bool_, 'Year': np.int16}
+
+
+def store_path(data_file=DATA_FILE, float32=False):
+    return os.path.splitext(data_file)[0] + (FLOAT32_SUFFIX if float32 else STORE_SUFFIX)
+
+
+def _column_file(i):
+    # Column names can hold any characters (tickers like ^GSPC), so files are numbered
+    return f"c{i:05d}.npy"
+
+
+def write_store(df, directory, float32=False, source=None):
+    """Write df (DatetimeIndex, one array per column) as a column store, replacing any old one."""
+    tmp_dir = f"{directory}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    columns = []
+    for i, name in enumerate(df.columns):
+        values = df[name].to_numpy()
+        dtype = COMPACT_DTYPES.get(name)
+        if dtype is None and values.dtype.kind == 'f':
+            dtype = np.float32 if float32 else np.float64
+        values = np.ascontiguousarray(values, dtype=dtype)
+        np.save(os.path.join(tmp_dir, _column_file(i)), values)
+        columns.append({'name': name, 'file': _column_file(i), 'dtype': values.dtype.str})
+    index = df.index.to_numpy()
+    # A view with the dtype rebuilt from its string drops pandas' dtype metadata (.npy cannot store it)
+    np.save(os.path.join(tmp_dir, 'index.npy'), index.view(np.dtype(index.dtype.str)))
+
+    meta = {'version': STORE_VERSION, 'rows': len(df), 'index_name': df.index.name,
+            'columns': columns, 'source': source}
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=1)
+
+    # Swap directories so readers never see a half-written store. Rebuilds can race (fetch_data's
+    # build_store and a reader's load_dataset): the first store swapped in wins, later ones are dropped
+    old_dir = f"{directory}.old-{os.getpid()}"
+    try:
+        os.replace(directory, old_dir)
+    except FileNotFoundError:
+        pass
+    try:
+        os.replace(tmp_dir, directory)
+    except OSError:
+        # ENOTEMPTY/EEXIST: another writer's store landed in between
+        if not os.path.isdir(directory):
+            raise
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    shutil.rmtree(old_dir, ignore_errors=True)
+    return meta
+
+
+def read_meta(directory):
+    with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('version') != STORE_VERSION:
+        raise ValueError(f"{directory} has store version {meta.get('version')}, expected {STORE_VERSION}")
+    return meta
+
+
+def open_store(directory, columns=None, mmap=True):
+    """DataFrame over the store's memory-mapped columns (read-only, no copy)."""
+    meta = read_meta(directory)
+    mode = 'r' if mmap else None
+    wanted = meta['columns'] if columns is None else [c for c in meta['columns'] if c['name'] in set(columns)]
+    data = {c['name']: np.load(os.path.join(directory, c['file']), mmap_mode=mode) for c in wanted}
+    index = pd.DatetimeIndex(np.load(os.path.join(directory, 'index.npy'), mmap_mode=mode), name=meta['index_name'])
+    frame = pd.DataFrame(data, index=index, copy=False)
+    return frame[columns] if columns is not None else frame
+
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return {'path': os.path.basename(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def build_store(data_file=DATA_FILE, float32=False):
+    """(Re)build the float64 store for a pickled dataset, or its separate float32 store."""
+    directory = store_path(data_file, float32)
+    # Stamp before reading: if the pickle is replaced meanwhile, the store is seen as stale next time
+    source = _source_stamp(data_file)
+    write_store(pd.read_pickle(data_file), directory, float32=float32, source=source)
+    return directory
+
+
+def load_dataset(data_file=DATA_FILE, columns=None, float32=False):
+    """The dataset behind data_file, memory-mapped from its column store (built on first use)."""
+    directory = store_path(data_file, float32)
+    if os.path.exists(data_file):
+        try:
+            meta = read_meta(directory)
+            # Stores built by older versions may hold float32 under the float64 name
+            stale = (meta.get('source') != _source_stamp(data_file)
+                     or any(c['dtype'] == '<f4' for c in meta['columns']) != float32)
+        except (OSError, ValueError):
+            stale = True
+        # The pickle was rewritten (fetch_data) or the store is missing, from an older layout or the wrong width
+        if stale:
+            build_store(data_file, float32)
+    elif not os.path.exists(directory):
+        raise FileNotFoundError(f"{data_file} not found. Run fetch_data.py first.")
+    for attempt in range(OPEN_RETRIES):
+        try:
+            return open_store(directory, columns)
+        except FileNotFoundError:
+            # Another process is swapping a rebuilt store in; it is back within milliseconds
+            if attempt == OPEN_RETRIES - 1:
+                raise
+            time.sleep(0.05)
+
+
+def _private_mb():
+    """Private (anonymous) resident memory of this process in MB; None off Linux."""
+    try:
+        with open('/proc/self/status', encoding='ascii') as f:
+            fields = dict(line.split(':', 1) for line in f)
+        return int(fields['RssAnon'].split()[0]) / 1024
+    except (OSError, KeyError):
+        return None
+
+
+def _worker_load(data_file, use_store):
+    """Load and scan two columns; returns the private memory the load added (MB)."""
+    before = _private_mb()
+    df = load_dataset(data_file) if use_store else pd.read_pickle(data_file)
+    float(df['SP500_Ret'].sum() + df['Mkt_RF'].sum())
+    after = _private_mb()
+    return None if before is None else after - before
+
+
+def bench(data_file=DATA_FILE, workers=4, repeat=5, years=None):
+    """Load time and per-worker private memory, pickle vs store (years=N: synthetic N-year dataset)."""
+    import multiprocessing
+    import tempfile
+    from concurrent.futures import ProcessPoolExecutor
+
+    if years:
+        from benchmarks import synthetic_dataset
+        tmp_dir = tempfile.mkdtemp(prefix='column_store_bench-')
+        data_file = os.path.join(tmp_dir, 'synthetic.pkl')
+        synthetic_dataset(years).to_pickle(data_file)
+    print(f"{data_file}: {os.path.getsize(data_file) / 2 ** 20:.1f} MB pickle")
+    load_dataset(data_file)  # make sure the store exists and is current
+    for label, load in [('pickle', lambda: pd.read_pickle(data_file)), ('column store', lambda: load_dataset(data_file))]:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            load()
+            timings.append(time.perf_counter() - start)
+        print(f"{label:<13} load: best {min(timings) * 1000:7.2f} ms")
+
+    for label, use_store in [('pickle', False), ('column store', True)]:
+        # Fresh interpreters: forked workers would reuse heap pages the parent already freed
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            private = [mb for mb in pool.map(_worker_load, [data_file] * workers, [use_store] * workers)
+                       if mb is not None]
+        if private:
+            print(f"{label:<13} {workers} workers: +{np.mean(private):6.1f} MB private memory per worker "
+                  f"(total +{sum(private):6.1f} MB)")
+    if years:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory-mapped column store for the daily dataset.")
+    parser.add_argument('command', choices=['build', 'info', 'bench'])
+    parser.add_argument('--data-file', default=DATA_FILE)
+    parser.add_argument('--float32', action='store_true',
+                        help="Use the separate float32 store (<name>.f32.columns) instead of the float64 one")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--years', type=int, help="bench: use a synthetic dataset of this many years")
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        directory = build_store(args.data_file, float32=args.float32)
+        print(f"Built {directory}")
+    elif args.command == 'info':
+        directory = store_path(args.data_file, args.float32)
+        meta = read_meta(directory)
+        print(f"{directory}: {meta['rows']:,} rows, source {meta['source']}")
+        for column in meta['columns']:
+            size = os.path.getsize(os.path.join(directory, column['file']))
+            print(f"  {column['name']:<14} {np.dtype(column['dtype']).name:<8} {size / 1024:8.1f} KB")
+    else:
+        bench(args.data_file, args.workers, years=args.years)
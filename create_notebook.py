@@ -1,7 +1,18 @@
 import nbformat as nbf
 
+from results_artifact import load_results, row, significance
+
 nb = nbf.v4.new_notebook()
 
+# Headline numbers come from results.json (written by the analysis scripts)
+results = load_results(require=('annual', 'institutional'))
+annual, inst = results['annual'], results['institutional']
+y3 = row(annual['phases'], "Pre-Election (Year 3)")
+bh = row(annual['metrics'], "Buy & Hold (All)")
+dd = {entry['Curve']: entry for entry in inst['drawdown']['summary']}
+reg = inst['regression']
+boot = inst['sharpe_bootstrap']
+
 # Title and Introduction
 title_cell = nbf.v4.new_markdown_cell("""# 🏛️ Institutional Grade Research: The Pre-Election Alpha
 **Author:** Gabriel Bengo (Quantitative Research Team)  
@@ -17,13 +28,30 @@ This notebook performs a rigorous factor-based analysis of the US Presidential E
 4. **Reality Check**: Daily Drawdown analysis.
 """)
 
+# Key results
+summary_cell = nbf.v4.new_markdown_cell(f"""## Key Results ({annual['start_year']}-{annual['end_year']})
+| Metric | Year 3 (Pre-Election) | Buy & Hold |
+| :--- | :---: | :---: |
+| Mean Annual Return | {y3['Mean (%)']:.2f}% | {bh['Mean (%)']:.2f}% |
+| Sharpe Ratio (annual) | {y3['Sharpe']:.2f} | {bh['Sharpe']:.2f} |
+| Max Drawdown (daily) | {dd['Strategy_Curve']['Max DD (%)']:.2f}% | {dd['BuyHold_Curve']['Max DD (%)']:.2f}% |
+
+- Welch t-test (annual, Year 3 > rest): t = {annual['ttest']['t_stat']:.4f}, p = {annual['ttest']['p_value']:.4f}
+- Factor-adjusted Year 3 alpha: t = {reg['tvalues']['Is_Year3']:.2f} (HAC), p = {reg['pvalues']['Is_Year3']:.4f} ({significance(reg['pvalues']['Is_Year3']).lower()})
+- Sharpe-difference bootstrap: p = {boot['p_iid']:.4f} (i.i.d., {boot['n_sims']:,} draws), p = {boot['p_block']:.4f} (stationary blocks)
+
+*Rendered from results.json, updated {inst['updated_at']}.*""")
+
 # Imports
 import_cell = nbf.v4.new_code_cell("""import pandas as pd
 import numpy as np
 import statsmodels.api as sm
-from statsmodels.regression.rolling import RollingOLS
+from rolling_regression import rolling_ols
 import matplotlib.pyplot as plt
 import seaborn as sns
+from bootstrap import sharpe_diff_bootstrap, bootstrap_pvalue
+from drawdown import drawdown_stats, underwater
+from charts import downsample
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -32,9 +60,10 @@ plt.style.use('seaborn-v0_8-darkgrid')
 sns.set_context('talk')""")
 
 # Load Data
-load_data_cell = nbf.v4.new_code_cell("""# Load pre-fetched data (see fetch_data.py)
+load_data_cell = nbf.v4.new_code_cell("""# Load pre-fetched data (see fetch_data.py); memory-mapped from the column store
+from column_store import load_dataset
 try:
-    df = pd.read_pickle("institutional_data.pkl")
+    df = load_dataset("institutional_data.pkl")
     print(f"Loaded {len(df)} daily observations from 1950-2024")
 except FileNotFoundError:
     print("Error: institutional_data.pkl not found. Please run fetch_data.py first.")
@@ -47,7 +76,7 @@ We control for Market Risk (Beta), Size (SMB), and Value (HML) to ensure the 'Ye
 
 reg_code = nbf.v4.new_code_cell("""# Define Variables
 df['Excess_Ret'] = df['SP500_Ret'] - df['RF']
-X = df[['Mkt_RF', 'SMB', 'HML', 'Is_Year3']]
+X = df[['Mkt_RF', 'SMB', 'HML', 'Is_Year3']].astype(float)
 X = sm.add_constant(X)
 y = df['Excess_Ret']
 
@@ -59,15 +88,16 @@ print(model.summary())""")
 rolling_intro = nbf.v4.new_markdown_cell("""## 2. Stability Analysis: Rolling Alpha
 Is the alpha structural or episodic? We run a 5-year (1260 day) rolling regression to track the $\gamma$ coefficient over time.""")
 
-rolling_code = nbf.v4.new_code_cell("""# Rolling OLS
-rolling = RollingOLS(y, X, window=1260).fit()
+rolling_code = nbf.v4.new_code_cell("""# Rolling OLS (prefix-sum engine, see rolling_regression.py)
+rolling = rolling_ols(y, X, windows=[1260])[1260]
 rolling_params = rolling.params
 
-# Plot
+# Plot (downsampled to ~2,000 points for display, see charts.py)
+gamma = downsample(rolling_params['Is_Year3'])
 plt.figure(figsize=(12, 6))
-plt.plot(rolling_params.index, rolling_params['Is_Year3'], label='Year 3 Alpha (5Y Rolling)', color='#1f77b4')
+plt.plot(gamma.index, gamma, label='Year 3 Alpha (5Y Rolling)', color='#1f77b4')
 plt.axhline(0, color='red', linestyle='--', alpha=0.5)
-plt.fill_between(rolling_params.index, rolling_params['Is_Year3'], 0, where=(rolling_params['Is_Year3']>=0), color='green', alpha=0.1)
+plt.fill_between(gamma.index, gamma, 0, where=(gamma>=0), color='green', alpha=0.1)
 plt.title('Time-Varying Alpha: Pre-Election Year Coefficient')
 plt.ylabel('Alpha Coefficient')
 plt.legend()
@@ -81,22 +111,11 @@ boot_code = nbf.v4.new_code_cell("""year3_rets = df[df['Is_Year3'] == 1]['Excess
 other_rets = df[df['Is_Year3'] == 0]['Excess_Ret']
 
 n_sims = 10000
-diffs = []
 
+# Vectorized, chunked resampling (see bootstrap.py)
 print(f"Running {n_sims} bootstrap simulations...")
-for _ in range(n_sims):
-    # Resample
-    s_y3 = year3_rets.sample(n=len(year3_rets), replace=True)
-    s_ot = other_rets.sample(n=len(other_rets), replace=True)
-    
-    # Calc Annualized Sharpe
-    sh_y3 = (s_y3.mean() / s_y3.std()) * np.sqrt(252)
-    sh_ot = (s_ot.mean() / s_ot.std()) * np.sqrt(252)
-    
-    diffs.append(sh_y3 - sh_ot)
-
-diffs = np.array(diffs)
-p_val = (diffs <= 0).sum() / n_sims
+diffs = sharpe_diff_bootstrap(year3_rets, other_rets, n_sims=n_sims, seed=42)
+p_val = bootstrap_pvalue(diffs)
 
 plt.figure(figsize=(10, 6))
 sns.histplot(diffs, kde=True, color='purple')
@@ -120,34 +139,34 @@ df['BuyHold_Curve'] = (1 + df['SP500_Ret']).cumprod()
 df['Strategy_Curve'] = (1 + df['Strategy_Ret']).cumprod()
 
 # Calculate Drawdowns
-def calc_dd(series):
-    peak = series.cummax()
-    return (series - peak) / peak
-
-df['BH_DD'] = calc_dd(df['BuyHold_Curve'])
-df['Strat_DD'] = calc_dd(df['Strategy_Curve'])
+df['BH_DD'], df['Strat_DD'] = underwater(df[['BuyHold_Curve', 'Strategy_Curve']].to_numpy().T)
+dd_summary, dd_episodes = drawdown_stats(df[['BuyHold_Curve', 'Strategy_Curve']], top_n=3)
 
 print(f"Max Drawdown (Buy & Hold): {df['BH_DD'].min():.2%}")
 print(f"Max Drawdown (Year 3 Only): {df['Strat_DD'].min():.2%}")
+display(dd_episodes)
 
-# Plot Logs
+# Plot Logs (downsampled for display; extremes are kept)
+bh_curve = downsample(df['BuyHold_Curve'], log=True)
+strat_curve = downsample(df['Strategy_Curve'], log=True)
 plt.figure(figsize=(12, 6))
-plt.plot(df.index, np.log10(df['BuyHold_Curve']), label='Buy & Hold (Log)', color='gray', alpha=0.5)
-plt.plot(df.index, np.log10(df['Strategy_Curve']), label='Year 3 Only (Log)', color='green')
+plt.plot(bh_curve.index, np.log10(bh_curve), label='Buy & Hold (Log)', color='gray', alpha=0.5)
+plt.plot(strat_curve.index, np.log10(strat_curve), label='Year 3 Only (Log)', color='green')
 plt.title('Log Equity Curve: 75 Years of Compounding')
 plt.ylabel('Log Wealth')
 plt.legend()
 plt.show()
 
-# Plot Underwater
+# Plot Underwater (min/max buckets keep every trough)
+strat_dd = downsample(df['Strat_DD'], method='minmax')
 plt.figure(figsize=(12, 4))
-plt.fill_between(df.index, df['Strat_DD'], 0, color='red', alpha=0.3, label='Year 3 Drawdown')
+plt.fill_between(strat_dd.index, strat_dd, 0, color='red', alpha=0.3, label='Year 3 Drawdown')
 plt.title('Underwater Plot: Year 3 Strategy Risk')
 plt.ylabel('Drawdown')
 plt.legend()
 plt.show()""")
 
-nb.cells = [title_cell, import_cell, load_data_cell, reg_intro, reg_code, rolling_intro, rolling_code, boot_intro, boot_code, dd_intro, dd_code]
+nb.cells = [title_cell, summary_cell, import_cell, load_data_cell, reg_intro, reg_code, rolling_intro, rolling_code, boot_intro, boot_code, dd_intro, dd_code]
 
 with open('Institutional_Research.ipynb', 'w', encoding='utf-8') as f:
     nbf.write(nb, f)
@@ -0,0 +1,273 @@
+"""
+Pluggable market-data providers with an on-disk response cache.
+
+Every script gets its data through get_provider(source), where source is
+'yfinance' (price history) or 'famafrench' (factor datasets). The backend is
+chosen with the DATA_PROVIDER environment variable:
+
+    online  - yfinance / pandas_datareader (default)
+    local   - CSV fixtures under DATA_DIR (default ./data/<source>/<symbol>.csv)
+    http    - the same fixture layout served over HTTP from DATA_URL
+
+Responses are cached under DATA_CACHE_DIR (default .data_cache, set it to an
+empty string to disable) keyed by (source, symbol, start, end), so repeated
+runs read straight from local disk. Requests without a past end date can
+still gain rows, so their entries expire after DATA_CACHE_TTL seconds
+(default 900); empty responses (failed downloads) are never cached. All providers return normalized frames:
+single-level price columns and factor returns in decimals.
+
+Run `python data_providers.py serve data` to start the local stand-in server.
+"""
+import argparse
+import datetime
+import hashlib
+import io
+import os
+import time
+import urllib.parse
+import urllib.request
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+DEFAULT_DATA_DIR = "data"
+DEFAULT_CACHE_DIR = ".data_cache"
+DEFAULT_URL = "http://127.0.0.1:8765"
+DEFAULT_OPEN_TTL = 900  # seconds an open-ended (end=None or not yet past) response stays cached
+
+
+def normalize_price_frame(raw, symbol=None):
+    """Flatten a yfinance download to one column per field with a sorted DatetimeIndex."""
+    frame = raw.copy()
+    # Handle MultiIndex columns (common in new yfinance): (field, ticker)
+    if isinstance(frame.columns, pd.MultiIndex):
+        tickers = frame.columns.get_level_values(-1)
+        if symbol is not None and symbol in tickers:
+            frame = frame.xs(symbol, axis=1, level=-1)
+        else:
+            frame.columns = frame.columns.get_level_values(0)
+    frame.index = pd.to_datetime(frame.index)
+    frame.index.name = 'Date'
+    return frame.sort_index()
+
+
+def price_series(frame, prefer=('Adj Close', 'Close')):
+    """Pick the first available price column from a normalized frame."""
+    for col in prefer:
+        if col in frame.columns:
+            if col != prefer[0]:
+                print(f"Warning: '{prefer[0]}' not found. Using '{col}'.")
+            return frame[col].dropna()
+    raise KeyError(f"Could not find price column. Available: {list(frame.columns)}")
+
+
+def _clip(frame, start=None, end=None):
+    # yfinance convention: start inclusive, end exclusive
+    if start is not None:
+        frame = frame[frame.index >= pd.Timestamp(start)]
+    if end is not None:
+        frame = frame[frame.index < pd.Timestamp(end)]
+    return frame
+
+
+class DataProvider:
+    """Base interface: fetch(symbol, start, end) -> normalized DataFrame."""
+    source = None
+
+    def fetch(self, symbol, start=None, end=None):
+        raise NotImplementedError
+
+    def fetch_many(self, symbols, start=None, end=None):
+        """Fetch several symbols; returns {symbol: frame}, skipping ones that fail."""
+        frames = {}
+        for symbol in symbols:
+            try:
+                frames[symbol] = self.fetch(symbol, start, end)
+            except Exception as e:
+                print(f"Warning: Failed to fetch {symbol}: {e}")
+        return frames
+
+
+class YFinanceProvider(DataProvider):
+    source = 'yfinance'
+
+    def fetch(self, symbol, start=None, end=None):
+        import yfinance as yf
+        raw = yf.download(symbol, start=start, end=end, progress=False)
+        return normalize_price_frame(raw, symbol)
+
+    def fetch_many(self, symbols, start=None, end=None):
+        # One bulk request instead of one per ticker
+        import yfinance as yf
+        symbols = list(symbols)
+        raw = yf.download(symbols, start=start, end=end, progress=False)
+        frames = {}
+        for symbol in symbols:
+            frame = normalize_price_frame(raw, symbol).dropna(how='all')
+            if len(frame):
+                frames[symbol] = frame
+            else:
+                print(f"Warning: No data returned for {symbol}")
+        return frames
+
+
+class FamaFrenchProvider(DataProvider):
+    """Fama-French datasets (e.g. 'F-F_Research_Data_Factors_daily'), converted from percent."""
+    source = 'famafrench'
+
+    def fetch(self, symbol, start=None, end=None):
+        import pandas_datareader.data as web
+        frame = web.DataReader(symbol, 'famafrench', start=start, end=end)[0]
+        # FF data is in percent (e.g., 0.5 for 0.5%), convert to decimal
+        frame = frame / 100.0
+        frame.index = pd.to_datetime(frame.index)
+        frame.index.name = 'Date'
+        return _clip(frame, start, end)
+
+
+class LocalFileProvider(DataProvider):
+    """Reads normalized CSV fixtures from <directory>/<source>/<symbol>.csv."""
+
+    def __init__(self, directory, source):
+        self.directory = directory
+        self.source = source
+
+    def path_for(self, symbol):
+        return os.path.join(self.directory, self.source, f"{symbol}.csv")
+
+    def fetch(self, symbol, start=None, end=None):
+        frame = pd.read_csv(self.path_for(symbol), index_col=0, parse_dates=True)
+        return _clip(frame, start, end)
+
+
+class HTTPProvider(DataProvider):
+    """Fetches the LocalFileProvider layout from an HTTP stand-in server."""
+
+    def __init__(self, base_url, source, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.source = source
+        self.timeout = timeout
+
+    def fetch(self, symbol, start=None, end=None):
+        url = f"{self.base_url}/{self.source}/{urllib.parse.quote(symbol)}.csv"
+        with urllib.request.urlopen(url, timeout=self.timeout) as response:
+            body = response.read()
+        frame = pd.read_csv(io.BytesIO(body), index_col=0, parse_dates=True)
+        return _clip(frame, start, end)
+
+
+class CachedProvider(DataProvider):
+    """Wraps a provider with a pickle cache keyed by (source, symbol, start, end)."""
+
+    def __init__(self, provider, cache_dir=DEFAULT_CACHE_DIR, open_ttl=None):
+        self.provider = provider
+        self.source = provider.source
+        self.cache_dir = cache_dir
+        self.open_ttl = float(os.environ.get('DATA_CACHE_TTL', DEFAULT_OPEN_TTL)) if open_ttl is None else open_ttl
+
+    def cache_path(self, symbol, start=None, end=None):
+        key = "|".join(str(part) for part in (self.source, symbol, start, end))
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.pkl")
+
+    def is_fresh(self, path, end=None):
+        """Cached and still valid: ranges ending in the past never change, open ones expire after open_ttl."""
+        if not os.path.exists(path):
+            return False
+        if end is not None and pd.Timestamp(end).date() <= datetime.date.today():
+            return True
+        # The source may still add rows today (intraday refresh), so only reuse recent responses
+        return time.time() - os.path.getmtime(path) < self.open_ttl
+
+    def fetch(self, symbol, start=None, end=None):
+        path = self.cache_path(symbol, start, end)
+        if self.is_fresh(path, end):
+            return pd.read_pickle(path)
+
+        frame = self.provider.fetch(symbol, start, end)
+        self._store(path, frame)
+        return frame
+
+    def fetch_many(self, symbols, start=None, end=None):
+        frames, missing = {}, []
+        for symbol in symbols:
+            path = self.cache_path(symbol, start, end)
+            if self.is_fresh(path, end):
+                frames[symbol] = pd.read_pickle(path)
+            else:
+                missing.append(symbol)
+
+        # Only cache misses go to the wrapped provider, in one batch
+        if missing:
+            for symbol, frame in self.provider.fetch_many(missing, start, end).items():
+                self._store(self.cache_path(symbol, start, end), frame)
+                frames[symbol] = frame
+        return {symbol: frames[symbol] for symbol in symbols if symbol in frames}
+
+    def _store(self, path, frame):
+        # An empty frame is a failed download (yf.download does not raise); caching it would stick
+        if frame.empty:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        frame.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+
+
+def get_provider(source, mode=None, cache_dir=None):
+    """Build the configured provider for 'yfinance' or 'famafrench' (see module docstring)."""
+    mode = mode or os.environ.get('DATA_PROVIDER', 'online')
+    if mode == 'online':
+        providers = {'yfinance': YFinanceProvider, 'famafrench': FamaFrenchProvider}
+        if source not in providers:
+            raise ValueError(f"Unknown data source: {source}")
+        provider = providers[source]()
+    elif mode == 'local':
+        provider = LocalFileProvider(os.environ.get('DATA_DIR', DEFAULT_DATA_DIR), source)
+    elif mode == 'http':
+        provider = HTTPProvider(os.environ.get('DATA_URL', DEFAULT_URL), source)
+    else:
+        raise ValueError(f"Unknown DATA_PROVIDER mode: {mode}")
+
+    if cache_dir is None:
+        cache_dir = os.environ.get('DATA_CACHE_DIR', DEFAULT_CACHE_DIR)
+    return CachedProvider(provider, cache_dir) if cache_dir else provider
+
+
+def export_fixture(frame, source, symbol, directory=DEFAULT_DATA_DIR):
+    """Write a normalized frame in the layout read by the local and HTTP providers."""
+    path = LocalFileProvider(directory, source).path_for(symbol)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    frame.to_csv(path)
+    return path
+
+
+def make_fixture_server(directory=DEFAULT_DATA_DIR, host='127.0.0.1', port=8765):
+    """HTTP server exposing fixture files; port=0 picks a free port (see server.server_address)."""
+    handler = partial(SimpleHTTPRequestHandler, directory=directory)
+    return ThreadingHTTPServer((host, port), handler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Data provider utilities.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    serve = sub.add_parser('serve', help="Serve fixture files as a local stand-in for the data sources")
+    serve.add_argument('directory', nargs='?', default=DEFAULT_DATA_DIR)
+    serve.add_argument('--port', type=int, default=8765)
+
+    export = sub.add_parser('export', help="Download a symbol and save it as a fixture")
+    export.add_argument('source', choices=['yfinance', 'famafrench'])
+    export.add_argument('symbol')
+    export.add_argument('--start', default=None)
+    export.add_argument('--directory', default=DEFAULT_DATA_DIR)
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        server = make_fixture_server(args.directory, port=args.port)
+        print(f"Serving {args.directory} on http://127.0.0.1:{args.port}")
+        server.serve_forever()
+    else:
+        frame = get_provider(args.source, mode='online').fetch(args.symbol, start=args.start)
+        print(f"Saved {len(frame)} rows to {export_fixture(frame, args.source, args.symbol, args.directory)}")
@@ -1,7 +1,7 @@
-
-import yfinance as yf
-print("yfinance version:", yf.__version__)
-data = yf.download("^GSPC", start="1950-01-01", progress=False)
+from data_providers import get_provider
+provider = get_provider('yfinance')
+print("Provider:", type(provider).__name__, provider.source)
+data = provider.fetch("^GSPC", start="1950-01-01")
 print("Data shape:", data.shape)
 print("Columns:", data.columns)
 print("Head:", data.head())
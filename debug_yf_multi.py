@@ -1,11 +1,13 @@
-
-import yfinance as yf
+import datetime
+from data_providers import get_provider
 print("Testing various tickers...")
+provider = get_provider('yfinance')
+start = (datetime.date.today() - datetime.timedelta(days=31)).isoformat()
 tickers = ["SPY", "AAPL", "^GSPC"]
 for t in tickers:
     print(f"\nDownloading {t}...")
     try:
-        data = yf.download(t, period="1mo", progress=False)
+        data = provider.fetch(t, start=start)
         print(f"Shape: {data.shape}")
         if len(data) > 0:
             print("Success")
@@ -0,0 +1,150 @@
+"""
+Drawdown analytics for many equity curves at once.
+
+Curves are rows of a (curves x days) array of wealth levels (a DataFrame is
+taken as days x curves, like the backtester's equity output). One running
+maximum gives the underwater series; episodes are the runs of days below the
+prior peak, found from the edges of the underwater mask over the flattened
+array, and their depth/trough come from segment reductions (np.*.reduceat),
+so there is no per-curve Python loop.
+
+An episode runs from its peak (last day at the running maximum) through its
+trough to the recovery day (first day back at the peak); episodes still
+under water at the end of the sample have no recovery.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _as_curves(curves, index=None, names=None):
+    if isinstance(curves, pd.Series):
+        curves = curves.to_frame()
+    if isinstance(curves, pd.DataFrame):
+        index = curves.index if index is None else index
+        names = list(curves.columns) if names is None else names
+        curves = curves.to_numpy(dtype=np.float64).T
+    values = np.atleast_2d(np.asarray(curves, dtype=np.float64))
+    names = names if names is not None else [f"C{i}" for i in range(len(values))]
+    return values, index, names
+
+
+def underwater(curves):
+    """Drawdown from the running peak (<= 0) for each curve, same shape as the input."""
+    values = np.asarray(curves, dtype=np.float64)
+    return values / np.maximum.accumulate(values, axis=-1) - 1.0
+
+
+def max_drawdown(curves):
+    """Maximum drawdown (negative fraction) per curve; a scalar for a single curve."""
+    depth = underwater(curves).min(axis=-1)
+    return float(depth) if np.ndim(depth) == 0 else depth
+
+
+def _episodes(dd):
+    # Flattened (row-major) episode boundaries of a (curves x days) underwater array
+    n_curves, n_days = dd.shape
+    wet = dd < 0
+    padded = np.zeros((n_curves, n_days + 2), dtype=np.int8)
+    padded[:, 1:-1] = wet
+    edges = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    if len(rows) == 0:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, empty, empty, np.array([])
+
+    # Segment reductions over [start, end) of each episode; odd segments are the gaps
+    flat = np.append(dd.ravel(), 0.0)
+    bounds = np.column_stack([rows * n_days + starts, rows * n_days + ends]).ravel()
+    depth = np.minimum.reduceat(flat, bounds)[::2]
+
+    # First day of each episode that hits its depth
+    label = np.zeros(flat.shape, dtype=np.int64)
+    np.add.at(label, rows * n_days + starts, np.arange(1, len(rows) + 1))
+    np.subtract.at(label, rows * n_days + ends, np.arange(1, len(rows) + 1))
+    label = np.cumsum(label)
+    position = np.arange(flat.size)
+    hit = (label > 0) & (flat == np.append(depth, 0.0)[label - 1])
+    trough = np.minimum.reduceat(np.where(hit, position, flat.size), bounds)[::2] - rows * n_days
+    return rows, starts, trough, ends, depth
+
+
+def drawdown_stats(curves, index=None, names=None, top_n=5, chunk_size=256):
+    """
+    Drawdown profile of every curve plus its top_n deepest episodes.
+
+    Returns (summary, episodes). summary has one row per curve: max depth,
+    its peak/trough/recovery, duration and recovery time, the longest time
+    under water and the share of days under water. episodes lists up to top_n
+    episodes per curve, deepest first. Durations are in trading days; dates
+    are index labels when an index is given, positions otherwise.
+    """
+    values, index, names = _as_curves(curves, index, names)
+    n_curves, n_days = values.shape
+    labels = np.asarray(index) if index is not None else np.arange(n_days)
+
+    summary_parts, episode_parts = [], []
+    for start in range(0, n_curves, chunk_size):
+        block = values[start:start + chunk_size]
+        dd = underwater(block)
+        rows, begin, trough, end, depth = _episodes(dd)
+        recovered = end < n_days
+        peak = begin - 1
+
+        episodes = pd.DataFrame({
+            'row': rows + start,
+            'Depth (%)': depth * 100,
+            'peak': peak,
+            'trough': trough,
+            'end': end,
+            'Recovered': recovered,
+            'Duration (days)': end - peak,
+            'Decline (days)': trough - peak,
+            'Recovery (days)': np.where(recovered, end - trough, -1),
+        })
+        episodes = episodes.sort_values(['row', 'Depth (%)'], kind='stable')
+        episodes['Rank'] = episodes.groupby('row').cumcount() + 1
+
+        worst = episodes[episodes['Rank'] == 1].set_index('row')
+        longest = episodes.groupby('row')['Duration (days)'].max()
+        summary = pd.DataFrame(index=pd.RangeIndex(start, start + len(block)))
+        summary['Max DD (%)'] = dd.min(axis=1) * 100
+        for column in ('peak', 'trough', 'end', 'Recovered', 'Duration (days)', 'Recovery (days)'):
+            summary[column] = worst[column]
+        summary['Longest Underwater (days)'] = longest
+        summary['Time Underwater (%)'] = (dd < 0).mean(axis=1) * 100
+        summary_parts.append(summary)
+        episode_parts.append(episodes[episodes['Rank'] <= top_n])
+
+    def dated(frame):
+        for column, name in (('peak', 'Peak'), ('trough', 'Trough'), ('end', 'Recovery')):
+            pos = frame.pop(column)
+            ok = pos.notna() & (pos < n_days)
+            frame[name] = pd.Series(labels[pos[ok].astype(int)], index=pos[ok].index).reindex(frame.index)
+        return frame
+
+    summary = dated(pd.concat(summary_parts))
+    summary['Recovered'] = summary['Recovered'].fillna(True).astype(bool)
+    for column in ('Duration (days)', 'Recovery (days)', 'Longest Underwater (days)'):
+        summary[column] = summary[column].fillna(0).astype(np.int64)
+    summary.index = pd.Index(names, name='Curve')
+    summary = summary[['Max DD (%)', 'Peak', 'Trough', 'Recovery', 'Recovered', 'Duration (days)',
+                       'Recovery (days)', 'Longest Underwater (days)', 'Time Underwater (%)']]
+
+    episodes = dated(pd.concat(episode_parts, ignore_index=True))
+    episodes.insert(0, 'Curve', np.asarray(names, dtype=object)[episodes.pop('row').to_numpy()])
+    columns = ['Curve', 'Rank', 'Depth (%)', 'Peak', 'Trough', 'Recovery', 'Recovered',
+               'Duration (days)', 'Decline (days)', 'Recovery (days)']
+    return summary, episodes[columns].reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    from backtest import phase_subset_masks, run_backtest
+    from column_store import load_dataset
+
+    df = load_dataset()
+    masks, names = phase_subset_masks(df['Cycle_Year'])
+    _, curves = run_backtest(df['SP500_Ret'], masks, names, return_curves=True)
+    summary, episodes = drawdown_stats(curves.T, index=df.index, names=names, top_n=3)
+    print(summary.sort_values('Max DD (%)', ascending=False).to_string(float_format='%.2f'))
+    print(episodes[episodes['Curve'].isin(['Y1+Y2+Y3+Y4', 'Y3'])].to_string(index=False, float_format='%.2f'))
@@ -1,11 +1,15 @@
 
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from scipy import stats
 from tabulate import tabulate
 import datetime
 
+from data_providers import get_provider, price_series
+from drawdown import max_drawdown
+from profiling import stage
+from results_artifact import update_results
+
 def get_election_year_cycle(year):
     """
     Returns the cycle year:
@@ -38,15 +42,19 @@ def analyze_election_cycle():
     # Start from 1950
     # Try ^GSPC first, fallback to SPY
     ticker = "^GSPC"
-    try:
-        data = yf.download(ticker, start="1950-01-01", progress=False)
-        if len(data) == 0:
-            raise Exception("Empty data")
-    except Exception as e:
-        print(f"Warning: Failed to download {ticker}: {e}")
-        print("Falling back to SPY (S&P 500 ETF) - Note: Data starts from 1993")
-        ticker = "SPY"
-        data = yf.download(ticker, start="1950-01-01", progress=False)
+    provider = get_provider('yfinance')
+    with stage('download', source='yfinance') as record:
+        try:
+            data = provider.fetch(ticker, start="1950-01-01")
+            if len(data) == 0:
+                raise Exception("Empty data")
+        except Exception as e:
+            print(f"Warning: Failed to download {ticker}: {e}")
+            print("Falling back to SPY (S&P 500 ETF) - Note: Data starts from 1993")
+            ticker = "SPY"
+            data = provider.fetch(ticker, start="1950-01-01")
+        record['symbol'] = ticker
+        record['rows'] = len(data)
         
     print(f"Using Data Source: {ticker}")
 
@@ -56,11 +64,8 @@ def analyze_election_cycle():
     # Let's use 'A' for compatibility or 'YE' if that fails.
     # Calculating returns based on Close price
     
-    # Handle MultiIndex column in recent yfinance
-    if isinstance(data.columns, pd.MultiIndex):
-        close_prices = data['Close'][ticker]
-    else:
-        close_prices = data['Close']
+    # Provider output is already flattened to one column per field
+    close_prices = price_series(data, prefer=('Close',))
 
     # Resample to Annual
     annual_data = close_prices.resample('YE').last()
@@ -131,6 +136,11 @@ def analyze_election_cycle():
     log("\n--- Performance Metrics: Year 3 vs Rest ---")
     log(tabulate(metrics_df, headers='keys', tablefmt='github', floatfmt=".2f"))
 
+    phase_df = pd.DataFrame([calculate_metrics(df[df['Cycle'] == cycle]['Return'], name)
+                             for cycle, name in cycle_names.items()])
+    log("\n--- Performance Metrics by Cycle Phase ---")
+    log(tabulate(phase_df, headers='keys', tablefmt='github', floatfmt=".2f"))
+
     # Statistical Significance (One-tailed T-test)
     # H0: Year 3 Mean <= Other Mean
     # H1: Year 3 Mean > Other Mean
@@ -156,19 +166,13 @@ def analyze_election_cycle():
     # --- Strategy Simulation ---
     # Strategy: Long Year 3, Cash Others (Isolating the Alpha)
     
-    df['Alpha_Strategy_Return'] = df.apply(lambda row: row['Return'] if row['Cycle'] == 3 else 0.0, axis=1)
+    df['Alpha_Strategy_Return'] = np.where(df['Cycle'] == 3, df['Return'], 0.0)
     
     df['BuyHold_Index'] = (1 + df['Return']).cumprod() * 100
     df['Alpha_Startegy_Index'] = (1 + df['Alpha_Strategy_Return']).cumprod() * 100
     
     # Calculate Max Drawdown for Strategies
-    def max_drawdown(equity_curve):
-        peak = equity_curve.cummax()
-        drawdown = (equity_curve - peak) / peak
-        return drawdown.min() * 100
-
-    dd_bh = max_drawdown(df['BuyHold_Index'])
-    dd_alpha = max_drawdown(df['Alpha_Startegy_Index'])
+    dd_bh, dd_alpha = max_drawdown(df[['BuyHold_Index', 'Alpha_Startegy_Index']].to_numpy().T) * 100
 
     log("\n--- Strategy Simulation (Base 100) ---")
     log(f"Start Year: {df['Year'].iloc[0]}")
@@ -182,6 +186,22 @@ def analyze_election_cycle():
     with open("analysis_report.txt", "w", encoding="utf-8") as f:
         f.write("\n".join(report))
 
+    update_results('annual', {
+        'source': ticker,
+        'start_year': df['Year'].iloc[0],
+        'end_year': df['Year'].iloc[-1],
+        'metrics': metrics_df,
+        'phases': phase_df,
+        'ttest': {'t_stat': t_stat, 'p_value': p_val_1tailed},
+        'strategy': {
+            'buy_hold_final': df['BuyHold_Index'].iloc[-1],
+            'year3_final': df['Alpha_Startegy_Index'].iloc[-1],
+            'buy_hold_max_dd': dd_bh,
+            'year3_max_dd': dd_alpha,
+        },
+    })
+    print("Saved annual results to results.json")
+
 if __name__ == "__main__":
     analyze_election_cycle()
 
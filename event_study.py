@@ -0,0 +1,262 @@
+"""
+Event study around US election days.
+
+The cycle analysis buckets returns by calendar year (Year % 4). This module
+aligns them on the elections themselves: cumulative abnormal returns (CAR)
+for -N..+N trading days around every presidential and midterm election
+(the Tuesday after the first Monday in November of even years; day 0 is the
+first trading day on or after it, as the exchange was closed on election
+days until 1980).
+
+Abnormal returns are excess returns minus the institutional_analysis model
+(const + Mkt_RF + SMB + HML + Is_Year3), fitted per asset on the full sample
+with batch_regression.batch_ols. They are never materialized for the whole
+history: sliding_window_view turns the daily excess returns (days x assets)
+and the design (days x terms) into (days x assets x 2N+1) window views
+without copying, and only one block of events x assets is gathered at a time
+(sized by max_chunk_mb), so hundreds of events x thousands of assets need
+memory for one block, not one DataFrame per event.
+
+Per asset and event type the study reports the mean CAR path, its
+cross-event t-statistic (mean / (std / sqrt(events)), t distribution) and
+percentile bands from resampling events with replacement.
+
+    python event_study.py                          # S&P 500 from the dataset, writes results.json
+    python event_study.py --window 10 --boot 5000
+    python event_study.py --tickers SPY QQQ IWM     # prices through data_providers
+    python event_study.py --synthetic --years 250 --assets 2000
+"""
+import argparse
+import datetime
+import time
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy import stats
+
+from profiling import stage
+
+DATA_FILE = "institutional_data.pkl"
+WINDOW = 20
+BOOT_SIMS = 2000
+BOOTSTRAP_SEED = 42
+CONFIDENCE = 0.95
+KINDS = ('presidential', 'midterm')
+DESIGN_SPEC = 'FF3+year3'
+
+
+def election_dates(start_year, end_year, kinds=KINDS):
+    """Election days (Tuesday after the first Monday in November) of even years in [start_year, end_year]."""
+    rows = []
+    for year in range(start_year + start_year % 2, end_year + 1, 2):
+        kind = 'presidential' if year % 4 == 0 else 'midterm'
+        if kind in kinds:
+            first = datetime.date(year, 11, 1)
+            monday = first + datetime.timedelta(days=-first.weekday() % 7)
+            rows.append((pd.Timestamp(monday + datetime.timedelta(days=1)), kind))
+    return pd.DataFrame(rows, columns=['Election', 'Kind'])
+
+
+def align_events(index, events, window):
+    """Events with their day-0 position in index; events whose window runs off the data are dropped."""
+    positions = index.searchsorted(events['Election'].to_numpy().astype(index.dtype))
+    keep = (positions - window >= 0) & (positions + window < len(index))
+    aligned = events[keep].reset_index(drop=True)
+    aligned['Position'] = positions[keep]
+    aligned['Event_Day'] = index[aligned['Position']]
+    return aligned
+
+
+def fit_model(excess, factors):
+    """Design (days x terms) and FF3 + Year 3 coefficients (terms x assets) of every excess-return column."""
+    from batch_regression import batch_ols, build_designs
+    X = build_designs(factors, factor_sets=('FF3',), phase_modes=('year3',))[DESIGN_SPEC]
+    grid = batch_ols(excess, {DESIGN_SPEC: X}, hac_lags=(0,))
+    coef = grid.pivot(index='term', columns='response', values='coef')
+    # Assets without enough data to fit keep NaN coefficients and drop out as invalid events
+    coef = coef.reindex(index=X.columns, columns=excess.columns)
+    return X.to_numpy(dtype=np.float64), coef.to_numpy(dtype=np.float64)
+
+
+def event_windows(values, window):
+    """(days - 2N) x ... x (2N + 1) strided view: row s holds days s..s+2N of every column (no copy)."""
+    return sliding_window_view(values, 2 * window + 1, axis=0)
+
+
+def _event_counts(n_events, n_boot, seed):
+    # Resampling events with replacement = how often each event is drawn per replicate
+    from bootstrap import resample_indices
+    idx = resample_indices(np.random.default_rng(seed), n_events, n_boot).astype(np.int64)
+    rows = np.arange(n_boot)[:, None] * n_events
+    return np.bincount((idx + rows).ravel(), minlength=n_boot * n_events).reshape(n_boot, n_events).astype(np.float64)
+
+
+def car_statistics(Y, X, coef, positions, window, n_boot=BOOT_SIMS, seed=BOOTSTRAP_SEED,
+                   confidence=CONFIDENCE, max_chunk_mb=64):
+    """
+    Cross-event CAR statistics for every asset.
+
+    Y: excess returns (days x assets), X: design (days x terms), coef: terms x
+    assets, positions: day-0 row of each event. An event counts for an asset
+    only if the asset has returns over its whole window. Returns arrays of
+    shape (assets, 2N + 1) for mean, std, t_stat, p_value, lower and upper,
+    plus the per-asset event count n.
+    """
+    n_events, n_assets, length = len(positions), Y.shape[1], 2 * window + 1
+    starts = np.asarray(positions) - window
+    y_windows = event_windows(Y, window)
+    x_events = event_windows(X, window)[starts]  # events x terms x days, small
+    counts = _event_counts(n_events, n_boot, seed) if n_boot else None
+
+    # Peak float64 arrays per asset: ar, car, dev and the car - mean temporary (events x days each),
+    # then sums, boot_mean and np.quantile's sorted copy (replicates x days each)
+    per_asset = 8 * length * (4 * n_events + 3 * n_boot)
+    block = max(1, int(max_chunk_mb * 2 ** 20 // per_asset))
+    alpha = (1 - confidence) / 2
+    out = {name: np.full((n_assets, length), np.nan) for name in ('mean', 'std', 't_stat', 'p_value', 'lower', 'upper')}
+    out['n'] = np.zeros(n_assets, dtype=np.int64)
+    for a0 in range(0, n_assets, block):
+        a1 = min(a0 + block, n_assets)
+        # The only copy: events x block x days
+        ar = y_windows[starts, a0:a1] - np.einsum('ekl,ka->eal', x_events, coef[:, a0:a1])
+        car = np.cumsum(ar, axis=2)
+        valid = np.isfinite(car[:, :, -1])
+        car[~valid] = 0.0
+
+        n = valid.sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = car.sum(axis=0) / n[:, None]
+            dev = np.where(valid[:, :, None], car - mean, 0.0)
+            std = np.sqrt(np.einsum('eal,eal->al', dev, dev) / (n[:, None] - 1))
+            t_stat = mean / (std / np.sqrt(n[:, None]))
+            out['p_value'][a0:a1] = 2 * stats.t.sf(np.abs(t_stat), np.maximum(n[:, None] - 1, 1))
+            if counts is not None:
+                sums = (counts @ car.reshape(n_events, -1)).reshape(n_boot, a1 - a0, length)
+                boot_mean = sums / (counts @ valid)[:, :, None]
+                bands = np.quantile(boot_mean, [alpha, 1 - alpha], axis=0)
+                # Replicates that drew none of an asset's valid events are NaN; nanquantile is slow, so only there
+                partial = np.isnan(boot_mean[:, :, -1]).any(axis=0) & (n > 0)
+                if partial.any():
+                    bands[:, partial] = np.nanquantile(boot_mean[:, partial], [alpha, 1 - alpha], axis=0)
+                out['lower'][a0:a1], out['upper'][a0:a1] = bands
+        out['mean'][a0:a1], out['std'][a0:a1], out['t_stat'][a0:a1], out['n'][a0:a1] = mean, std, t_stat, n
+    out['p_value'][out['n'] < 2] = np.nan
+    return out
+
+
+def event_study(excess, factors, window=WINDOW, kinds=KINDS, n_boot=BOOT_SIMS, seed=BOOTSTRAP_SEED,
+                confidence=CONFIDENCE, max_chunk_mb=64):
+    """
+    CAR study of every excess-return column around the elections in factors' date range.
+
+    excess: DataFrame (days x assets); factors: frame with Mkt_RF, SMB, HML and
+    Cycle_Year on the same index. Returns {'offsets', 'assets', 'events',
+    kind: car_statistics(...)} with one entry per kind plus 'all'.
+    """
+    excess = excess.loc[factors.index].astype(np.float64)
+    with stage('event_fit', rows=len(excess), assets=excess.shape[1]):
+        X, coef = fit_model(excess, factors)
+    index = factors.index
+    events = align_events(index, election_dates(index[0].year, index[-1].year, kinds), window)
+
+    study = {'offsets': np.arange(-window, window + 1), 'assets': list(excess.columns), 'events': events}
+    Y = excess.to_numpy()
+    for kind in list(kinds) + ['all']:
+        subset = events if kind == 'all' else events[events['Kind'] == kind]
+        if subset.empty:
+            continue
+        with stage('event_car', rows=len(subset), kind=kind):
+            study[kind] = car_statistics(Y, X, coef, subset['Position'].to_numpy(), window, n_boot=n_boot,
+                                         seed=seed, confidence=confidence, max_chunk_mb=max_chunk_mb)
+    return study
+
+
+def car_table(study, kind='all', asset=0):
+    """Mean CAR path of one asset (name or position) as a frame indexed by event-day offset."""
+    i = study['assets'].index(asset) if not isinstance(asset, int) else asset
+    result = study[kind]
+    table = pd.DataFrame({name: result[name][i] for name in ('mean', 'std', 't_stat', 'p_value', 'lower', 'upper')},
+                         index=pd.Index(study['offsets'], name='Offset'))
+    table.insert(0, 'Events', result['n'][i])
+    return table
+
+
+def load_excess(tickers=None, data_file=DATA_FILE):
+    """Daily excess returns (the dataset's S&P 500, or tickers via data_providers) and the dataset's factors."""
+    from column_store import load_dataset
+    factors = load_dataset(data_file, columns=['SP500_Ret', 'Mkt_RF', 'SMB', 'HML', 'RF', 'Cycle_Year'])
+    if not tickers:
+        excess = (factors['SP500_Ret'] - factors['RF']).to_frame('SP500')
+    else:
+        from universe_analysis import load_price_panel
+        prices = load_price_panel(tickers, start=str(factors.index[0].date()))
+        returns = prices.pct_change(fill_method=None).reindex(factors.index)
+        excess = returns.sub(factors['RF'], axis=0)
+    return excess, factors
+
+
+def summary_payload(study, asset=0):
+    """results.json section: events and the mean CAR path of one asset per kind."""
+    events = study['events']
+    payload = {'window': int(study['offsets'][-1]), 'asset': study['assets'][asset] if isinstance(asset, int) else asset,
+               'events': events[['Election', 'Kind', 'Event_Day']]}
+    for kind in list(KINDS) + ['all']:
+        if kind in study:
+            payload[kind] = car_table(study, kind, asset)
+    return payload
+
+
+def print_study(study, top=10):
+    offsets = study['offsets']
+    window = int(offsets[-1])
+    print(f"{len(study['events'])} elections, window -{window}..+{window} trading days, "
+          f"{len(study['assets'])} assets")
+    for kind in list(KINDS) + ['all']:
+        if kind not in study:
+            continue
+        result = study[kind]
+        print(f"\n--- {kind.title()} elections: CAR(-{window}, +{window}) ---")
+        if len(study['assets']) == 1:
+            table = car_table(study, kind)
+            picks = [o for o in (-window, -window // 2, -1, 0, 1, window // 2, window) if o in table.index]
+            print(table.loc[sorted(set(picks))].to_string(float_format=lambda v: f"{v:.4f}"))
+            continue
+        # Many assets: the full-window CAR per asset, strongest first
+        final = pd.DataFrame({'Events': result['n'], 'CAR': result['mean'][:, -1], 't_stat': result['t_stat'][:, -1],
+                              'p_value': result['p_value'][:, -1], 'lower': result['lower'][:, -1],
+                              'upper': result['upper'][:, -1]}, index=study['assets']).dropna(subset=['CAR'])
+        print(f"Mean CAR across assets {final['CAR'].mean():.4f}, "
+              f"significant at 5%: {(final['p_value'] < 0.05).mean():.1%} of {len(final)} assets")
+        print(final.sort_values('t_stat', ascending=False).head(top).to_string(float_format=lambda v: f"{v:.4f}"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cumulative abnormal returns around US election days.")
+    parser.add_argument('--tickers', nargs='+', help="Study these tickers instead of the dataset's S&P 500")
+    parser.add_argument('--window', type=int, default=WINDOW, help="Trading days on each side of day 0")
+    parser.add_argument('--kinds', nargs='+', choices=KINDS, default=list(KINDS))
+    parser.add_argument('--boot', type=int, default=BOOT_SIMS, help="Event-bootstrap replicates (0 to skip)")
+    parser.add_argument('--seed', type=int, default=BOOTSTRAP_SEED)
+    parser.add_argument('--chunk-mb', type=float, default=64, help="Memory budget for one gathered block")
+    parser.add_argument('--synthetic', action='store_true', help="Use benchmarks' synthetic dataset and panel")
+    parser.add_argument('--years', type=int, default=250, help="synthetic: years of business days")
+    parser.add_argument('--assets', type=int, default=1000, help="synthetic: number of assets")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        from benchmarks import synthetic_dataset, synthetic_panel
+        factors = synthetic_dataset(args.years)
+        excess = synthetic_panel(factors, args.assets).sub(factors['RF'], axis=0)
+    else:
+        excess, factors = load_excess(args.tickers)
+
+    started = time.perf_counter()
+    study = event_study(excess, factors, window=args.window, kinds=args.kinds, n_boot=args.boot, seed=args.seed,
+                        max_chunk_mb=args.chunk_mb)
+    print(f"Event study in {time.perf_counter() - started:.2f}s")
+    print_study(study)
+    if not args.synthetic and not args.tickers:
+        from results_artifact import update_results
+        update_results('event_study', summary_payload(study))
+        print("\nSaved the 'event_study' section of results.json")
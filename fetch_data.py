@@ -1,54 +1,72 @@
-import yfinance as yf
 import pandas as pd
-import pandas_datareader.data as web
+import argparse
 import datetime
 import os
 
+from column_store import build_store
+from data_providers import get_provider, price_series
+from profiling import stage
+from year_index import INDEX_FILE, build_year_index, save_year_index, update_year_index
+
 CACHE_FILE = "institutional_data.pkl"
+START_DATE = "1950-01-01"
+
+def _fetch_prices(start):
+    with stage('download', source='yfinance', symbol='^GSPC') as record:
+        frame = get_provider('yfinance').fetch("^GSPC", start=start)
+        record['rows'] = len(frame)
+    print("Columns (After Cleanup):", list(frame.columns))
+    try:
+        return price_series(frame)
+    except KeyError as e:
+        print(f"Error: {e}")
+        return None
+
+def _fetch_ff_factors(start):
+    # F-F Research Data Factors (Daily), already converted to decimals by the provider
+    with stage('download', source='famafrench', symbol='F-F_Research_Data_Factors_daily') as record:
+        factors = get_provider('famafrench').fetch('F-F_Research_Data_Factors_daily', start=start)
+        record['rows'] = len(factors)
+    return factors
+
+def _merge(returns, ff_data):
+    with stage('merge', rows=len(returns)) as record:
+        merged = pd.merge(returns.to_frame(name='Return'), ff_data, left_index=True, right_index=True, how='inner')
+        merged.rename(columns={'Return': 'SP500_Ret', 'Mkt-RF': 'Mkt_RF'}, inplace=True)
+        record['rows_out'] = len(merged)
+    return merged
+
+def add_cycle_columns(df):
+    # Add Cycle Logic (Year 3 Dummy)
+    # Logic: Year 3 is when (Year % 4) == 3.
+    # E.g., 2023 % 4 = 3 (Pre-Election). 2020 % 4 = 0 (Election).
+    df['Year'] = df.index.year
+    df['Cycle_Year'] = df['Year'] % 4
+    # Note: 0 is Election, 1 is Post-Election, 2 is Midterm, 3 is Pre-Election
+
+    df['Is_Year3'] = (df['Cycle_Year'] == 3).astype(int)
+    df['Is_Election'] = (df['Cycle_Year'] == 0).astype(int)
+    return df
+
+def _save_atomic(df, path):
+    # Write next to the target and swap in, so readers never see a partial file
+    tmp_path = f"{path}.tmp"
+    df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
 
 def fetch_data():
     print("Fetching Daily S&P 500 Data (^GSPC)...")
-    sp500 = yf.download("^GSPC", start="1950-01-01", progress=False)
-    
-    print("Columns (Before Cleanup):", sp500.columns)
-    
-    # Handle MultiIndex columns (common in new yfinance)
-    if isinstance(sp500.columns, pd.MultiIndex):
-        try:
-            # Try to get 'Adj Close' level if it exists, else just drop the ticker level
-            if 'Adj Close' in sp500.columns.get_level_values(0):
-                sp500 = sp500['Adj Close']
-            else:
-                sp500.columns = sp500.columns.get_level_values(0)
-        except Exception as e:
-            print(f"Error handling MultiIndex: {e}")
-            
-    # Check if 'Adj Close' exists, else use 'Close'
-    if 'Adj Close' in sp500.columns:
-        price_col = 'Adj Close'
-    elif 'Close' in sp500.columns:
-        price_col = 'Close'
-        print("Warning: 'Adj Close' not found. Using 'Close'.")
-    elif isinstance(sp500, pd.Series):
-         # If it became a Series (single column), rename to have a name we use
-         sp500 = sp500.to_frame(name='Adj Close')
-         price_col = 'Adj Close'
-    else:
-        # If sp500 is a dataframe but has no close column...
-        print(f"Error: Could not find price column. Available: {sp500.columns}")
+    prices = _fetch_prices(START_DATE)
+    if prices is None:
         return
 
     # Calculate Daily Returns
-    sp500['Return'] = sp500[price_col].pct_change()
-    sp500 = sp500.dropna()
-    print(f"S&P 500 Data Cleaned: {len(sp500)} daily observations")
+    returns = prices.pct_change().dropna()
+    print(f"S&P 500 Data Cleaned: {len(returns)} daily observations")
 
     print("Fetching Fama-French 3-Factor Data...")
     try:
-        # F-F Research Data Factors (Daily)
-        ff_data = web.DataReader('F-F_Research_Data_Factors_daily', 'famafrench', start="1950-01-01")[0]
-        # FF data is in percent (e.g., 0.5 for 0.5%), convert to decimal
-        ff_data = ff_data / 100.0
+        ff_data = _fetch_ff_factors(START_DATE)
         print(f"Fama-French Data Fetched: {len(ff_data)} daily observations")
     except Exception as e:
         print(f"Error fetching Fama-French data: {e}")
@@ -56,29 +74,75 @@ def fetch_data():
 
     # Merge Data
     print("Merging Datasets...")
-    # FF data index is usually just Date, ensure both are datetime
-    sp500.index = pd.to_datetime(sp500.index)
-    ff_data.index = pd.to_datetime(ff_data.index)
+    merged = add_cycle_columns(_merge(returns, ff_data))
 
-    merged = pd.merge(sp500[['Return']], ff_data, left_index=True, right_index=True, how='inner')
-    merged.rename(columns={'Return': 'SP500_Ret', 'Mkt-RF': 'Mkt_RF'}, inplace=True)
-    
-    # Add Cycle Logic (Year 3 Dummy)
-    # Logic: Year 3 is when (Year % 4) == 3. 
-    # E.g., 2023 % 4 = 3 (Pre-Election). 2020 % 4 = 0 (Election).
-    merged['Year'] = merged.index.year
-    merged['Cycle_Year'] = merged['Year'] % 4
-    # Note: 0 is Election, 1 is Post-Election, 2 is Midterm, 3 is Pre-Election
-    
-    merged['Is_Year3'] = (merged['Cycle_Year'] == 3).astype(int)
-    merged['Is_Election'] = (merged['Cycle_Year'] == 0).astype(int)
-    
     print(f"Final Merged Dataset: {len(merged)} rows")
-    merged.to_pickle(CACHE_FILE)
+    _save_atomic(merged, CACHE_FILE)
     print(f"Data saved to {CACHE_FILE}")
+    print(f"Column store saved to {build_store(CACHE_FILE)}")
+    save_year_index(build_year_index(merged), INDEX_FILE)
+    print(f"Per-year index saved to {INDEX_FILE}")
     print(merged.head())
     print(merged.tail())
     return merged
 
+def refresh_data():
+    """
+    Incremental refresh: append only the days after the last cached date.
+
+    Downloads a short tail of ^GSPC (starting a week before the last cached
+    date, so the first new return has its previous close) and the Fama-French
+    factors after the last cached date, then appends the merged rows.
+    Falls back to a full fetch_data() when there is no cache yet.
+    """
+    if not os.path.exists(CACHE_FILE):
+        print(f"{CACHE_FILE} not found. Running full download.")
+        return fetch_data()
+
+    cached = pd.read_pickle(CACHE_FILE)
+    last_date = cached.index[-1]
+    print(f"Cached data ends {last_date.date()} ({len(cached)} rows)")
+
+    print("Fetching ^GSPC tail...")
+    tail_start = last_date - datetime.timedelta(days=7)
+    prices = _fetch_prices(tail_start.strftime("%Y-%m-%d"))
+    if prices is None:
+        return cached
+
+    # Returns are only recomputed across the join boundary
+    returns = prices.pct_change().dropna()
+    returns = returns[returns.index > last_date]
+
+    print("Fetching Fama-French tail...")
+    try:
+        ff_data = _fetch_ff_factors((last_date + datetime.timedelta(days=1)).strftime("%Y-%m-%d"))
+    except Exception as e:
+        print(f"Error fetching Fama-French data: {e}")
+        return cached
+    ff_data = ff_data[ff_data.index > last_date]
+
+    new_rows = _merge(returns, ff_data)
+    if new_rows.empty:
+        # FF factors are published with a lag; unmatched price days are picked up next run
+        print("No new rows with both price and factor data. Cache is up to date.")
+        return cached
+
+    new_rows = add_cycle_columns(new_rows)[cached.columns].astype(cached.dtypes.to_dict())
+    merged = pd.concat([cached, new_rows])
+    _save_atomic(merged, CACHE_FILE)
+    build_store(CACHE_FILE)
+    # Only the years touched by the new rows are re-aggregated
+    update_year_index(merged, INDEX_FILE)
+    print(f"Appended {len(new_rows)} rows ({new_rows.index[0].date()} to {new_rows.index[-1].date()}). Total: {len(merged)}")
+    return merged
+
 if __name__ == "__main__":
-    fetch_data()
+    parser = argparse.ArgumentParser(description="Download S&P 500 and Fama-French daily data.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Append only the days missing from the cache instead of re-downloading since 1950")
+    args = parser.parse_args()
+
+    if args.incremental:
+        refresh_data()
+    else:
+        fetch_data()
@@ -5,41 +5,90 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_JUSTIFY, TA_CENTER, TA_LEFT
 
-def create_pdf(filename):
-    doc = SimpleDocTemplate(filename, pagesize=letter,
-                            rightMargin=54, leftMargin=54,
-                            topMargin=54, bottomMargin=54)
-    Story = []
-    
+from profiling import stage
+from results_artifact import RESULTS_FILE, load_results, phase_rank, report_date, row, significance
+
+def build_styles():
+    """Report paragraph styles; build once and reuse for every document."""
     styles = getSampleStyleSheet()
-    
+
     # Custom Styles
     styles.add(ParagraphStyle(name='QuantTitle', parent=styles['Heading1'], fontSize=18, leading=22, alignment=TA_LEFT, textColor=colors.darkblue))
     styles.add(ParagraphStyle(name='QuantSubtitle', parent=styles['Normal'], fontSize=10, leading=12, alignment=TA_LEFT, textColor=colors.grey))
     styles.add(ParagraphStyle(name='QuantBody', parent=styles['Normal'], fontSize=10, leading=14, alignment=TA_JUSTIFY))
     styles.add(ParagraphStyle(name='QuantHeader', parent=styles['Heading2'], fontSize=12, leading=14, spaceBefore=12, spaceAfter=6, textColor=colors.darkblue))
     styles.add(ParagraphStyle(name='Caption', parent=styles['Italic'], fontSize=9, alignment=TA_CENTER, textColor=colors.grey))
+    styles.add(ParagraphStyle(name='Disc', parent=styles['Normal'], fontSize=8, textColor=colors.grey))
+    return styles
+
+
+def phase_findings(annual, y3, bh):
+    """What the annual table says about Year 3 relative to the other phases and Buy & Hold."""
+    rank, best = phase_rank(annual['phases'], "Pre-Election (Year 3)")
+    if rank == 1:
+        text = "In this sample Year 3 has the highest mean annual return of the four cycle phases"
+    else:
+        text = f"In this sample Year 3 ranks {rank} of 4 by mean annual return (highest: {best['Name']})"
+    side = 'below' if y3['Vol (%)'] < bh['Vol (%)'] else 'above'
+    return f"{text}, with volatility of {y3['Vol (%)']:.2f}%, {side} Buy & Hold's {bh['Vol (%)']:.2f}%."
+
+
+def conclusion(reg, boot, y3, bh, dd, asset=None):
+    """Conclusion and recommendation from the regression, bootstrap and drawdown results."""
+    p_alpha = reg['pvalues']['Is_Year3']
+    sign = 'positive' if reg['params']['Is_Year3'] > 0 else 'negative'
+    text = (f"After Fama-French adjustment the Year 3 alpha is {sign} (HAC t = {reg['tvalues']['Is_Year3']:.2f}, "
+            f"p = {p_alpha:.4f}; {significance(p_alpha).lower()}).")
+    supported = sign == 'positive' and p_alpha < 0.05
+    if boot:
+        text += f" The Sharpe-difference bootstrap gives p = {boot['p_iid']:.4f} ({significance(boot['p_iid']).lower()})"
+        if boot.get('p_block') is not None:
+            text += f", the stationary block bootstrap p = {boot['p_block']:.4f}"
+        text += "."
+        supported = supported and boot['p_iid'] < 0.05
+    text += (f" Year 3 has an annual Sharpe Ratio of {y3['Sharpe']:.2f} versus {bh['Sharpe']:.2f} for Buy & Hold, "
+             f"and the Year 3 strategy a daily maximum drawdown of {dd['Strategy_Curve']['Max DD (%)']:.2f}% versus "
+             f"{dd['BuyHold_Curve']['Max DD (%)']:.2f}%.")
+    if supported:
+        advice = f"Systematic Overweight to {asset or 'US Equities'} in Year 3."
+    else:
+        advice = "No Year 3 tilt; the premium does not clear the 5% level on every test."
+    return f"{text}<br/><br/><b>Recommendation:</b> {advice}"
+
+
+def build_story(results, styles):
+    """Flowables for one report from a results dict laid out like results.json."""
+    annual, inst = results['annual'], results['institutional']
+    y3 = row(annual['phases'], "Pre-Election (Year 3)")
+    bh = row(annual['metrics'], "Buy & Hold (All)")
+    reg = inst['regression']
+    boot = inst.get('sharpe_bootstrap')
+    dd = {entry['Curve']: entry for entry in inst['drawdown']['summary']}
+    period = f"{annual['start_year']}-{annual['end_year']}"
+    asset = inst.get('asset')
+    Story = []
 
     # --- PAGE 1: Executive Summary ---
     Story.append(Paragraph("INSTITUTIONAL EQUITY RESEARCH", styles['QuantSubtitle']))
-    Story.append(Paragraph("The Presidential Pump: Factor Analysis of the Pre-Election Year", styles['QuantTitle']))
-    Story.append(Paragraph("<b>Author:</b> Gabriel Bengo (Quantitative Research) &nbsp;|&nbsp; <b>Date:</b> December 2024", styles['QuantSubtitle']))
+    title = "The Presidential Pump: Factor Analysis of the Pre-Election Year"
+    Story.append(Paragraph(f"{title} ({asset})" if asset else title, styles['QuantTitle']))
+    Story.append(Paragraph(f"<b>Author:</b> Gabriel Bengo (Quantitative Research) &nbsp;|&nbsp; <b>Date:</b> {report_date(inst)}", styles['QuantSubtitle']))
     Story.append(Spacer(1, 24))
     
     Story.append(Paragraph("<b>ABSTRACT</b>", styles['QuantHeader']))
-    abstract = """
-    We rigorously test the 'Presidential Election Cycle' hypothesis using 75 years of daily S&P 500 data and the Fama-French 3-Factor model. Our analysis isolates a statistically significant alpha in the <b>Pre-Election Year (Year 3)</b> that cannot be explained by Market Risk (Beta), Size (SMB), or Value (HML) factors.
+    abstract = f"""
+    We rigorously test the 'Presidential Election Cycle' hypothesis using {annual['end_year'] - annual['start_year'] + 1} years of daily {asset or 'S&P 500'} data and the Fama-French 3-Factor model, measuring the <b>Pre-Election Year (Year 3)</b> premium after Market Risk (Beta), Size (SMB), and Value (HML) factors.
     <br/><br/>
-    We report a robust Alpha t-statistic of >3.0, a Bootstrap P-Value of 0.0067, and a significantly superior risk-adjusted return profile compared to the 'Election Year' itself.
+    We report an annual Welch t-statistic of {annual['ttest']['t_stat']:.2f}, a factor-adjusted Year 3 alpha t-statistic of {reg['tvalues']['Is_Year3']:.2f} (HAC){f", a Sharpe-difference Bootstrap P-Value of {boot['p_iid']:.4f}" if boot else ""}, and the risk-adjusted return profile compared to the 'Election Year' itself.
     """
     Story.append(Paragraph(abstract, styles['QuantBody']))
     Story.append(Spacer(1, 24))
     
     Story.append(Paragraph("<b>1. INVESTMENT THESIS</b>", styles['QuantHeader']))
-    thesis = """
+    thesis = f"""
     The 'Political Business Cycle' literature suggests incumbent politicians manipulate economic levers to maximize re-election odds. Our thesis is that this stimulus is 'front-loaded' into Year 3.
     <br/><br/>
-    Contrary to the 'Election Year' myth, Year 3 is the engine of cycle returns. Volatility suppression in Year 3 is structural, likely due to accommodative monetary conditions.
+    {phase_findings(annual, y3, bh)}
     """
     Story.append(Paragraph(thesis, styles['QuantBody']))
     Story.append(Spacer(1, 12))
@@ -47,11 +96,11 @@ def create_pdf(filename):
     # Core Comparison Table
     data = [
         ['Metric', 'Year 3 (Pre-Election)', 'Buy & Hold (Benchmark)'],
-        ['Mean Annual Return', '17.18%', '9.41%'],
-        ['Daily Volatility (Ann.)', '10.86%', '16.57%'],
-        ['Sharpe Ratio (Rf=0)', '1.58', '0.57'],
-        ['Max Drawdown (Daily)', '-33.51%', '-56.78%'],
-        ['Win Rate', '89%', '73%']
+        ['Mean Annual Return', f"{y3['Mean (%)']:.2f}%", f"{bh['Mean (%)']:.2f}%"],
+        ['Annual Volatility', f"{y3['Vol (%)']:.2f}%", f"{bh['Vol (%)']:.2f}%"],
+        ['Sharpe Ratio (Rf=0)', f"{y3['Sharpe']:.2f}", f"{bh['Sharpe']:.2f}"],
+        ['Max Drawdown (Daily)', f"{dd['Strategy_Curve']['Max DD (%)']:.2f}%", f"{dd['BuyHold_Curve']['Max DD (%)']:.2f}%"],
+        ['Win Rate', f"{y3['Win Rate']:.0%}", f"{bh['Win Rate']:.0%}"]
     ]
     t = Table(data, colWidths=[200, 150, 150])
     t.setStyle(TableStyle([
@@ -64,7 +113,7 @@ def create_pdf(filename):
         ('BACKGROUND', (1,0), (1,-1), colors.lightyellow), # Highlight Year 3
     ]))
     Story.append(t)
-    Story.append(Paragraph("Table 1: Summary Statistics (1950-2024)", styles['Caption']))
+    Story.append(Paragraph(f"Table 1: Summary Statistics ({period})", styles['Caption']))
     
     Story.append(PageBreak())
 
@@ -82,21 +131,25 @@ def create_pdf(filename):
     Story.append(Spacer(1, 12))
     
     Story.append(Paragraph("<b>3. REGRESSION RESULTS</b>", styles['QuantHeader']))
-    reg_text = """
-    Controlling for the Fama-French factors, the <b>Year 3 Alpha ($\gamma$)</b> remains positive and statistically significant.
+    reg_text = f"""
+    Controlling for the Fama-French factors ({reg['nobs']:,.0f} daily observations, R-squared {reg['rsquared']:.3f}), the <b>Year 3 Alpha ($\gamma$)</b> is estimated at {reg['params']['Is_Year3']:.6f} per day.
     <br/><br/>
-    &bull; <b>Market Beta:</b> ~0.98 (Strategy is essentially market-neutral in exposure, but time-varying)<br/>
-    &bull; <b>Year 3 Alpha T-Stat:</b> > 3.0 (Highly Significant)<br/>
-    &bull; <b>Newey-West (HAC) P-Value:</b> < 0.01
+    &bull; <b>Market Beta:</b> {reg['params']['Mkt_RF']:.2f}<br/>
+    &bull; <b>Year 3 Alpha T-Stat:</b> {reg['tvalues']['Is_Year3']:.2f} ({significance(reg['pvalues']['Is_Year3'])})<br/>
+    &bull; <b>Newey-West (HAC) P-Value:</b> {reg['pvalues']['Is_Year3']:.4f}
     """
     Story.append(Paragraph(reg_text, styles['QuantBody']))
     
     # Embed Rolling Alpha Plot
     try:
         Story.append(Spacer(1, 12))
-        img = Image("rolling_alpha.png", width=450, height=225)
+        img = Image(inst['charts']['rolling_alpha'], width=450, height=225)
         Story.append(img)
-        Story.append(Paragraph("Figure 1: 5-Year Rolling Alpha Coefficient. Note the persistence of positive alpha (above red line).", styles['Caption']))
+        caption = "Figure 1: 5-Year Rolling Alpha Coefficient."
+        rolling = inst.get('rolling', {}).get('1260')
+        if rolling:
+            caption += f" Alpha is positive (above red line) in {rolling['share_positive']:.0%} of windows."
+        Story.append(Paragraph(caption, styles['Caption']))
     except:
         Story.append(Paragraph("[Error: rolling_alpha.png not found]", styles['Caption']))
 
@@ -105,37 +158,51 @@ def create_pdf(filename):
     # --- PAGE 3: Robustness & Risk ---
     Story.append(Paragraph("<b>4. ROBUSTNESS CHECKS</b>", styles['QuantHeader']))
     
-    robust_text = """
-    <b>Bootstrap Validation:</b> We resampled returns 10,000 times. The probability of the Year 3 Sharpe Ratio arising from random chance is <b>0.67% (p=0.0067)</b>.
-    <br/><br/>
-    <b>Drawdown Analysis:</b> Using daily data reveals the true risk. While annual data suggests a -0.73% drawdown, daily data shows a <b>-33.51%</b> maximum drawdown (occurring during the 2020 COVID crash, which happened in a Year 4 but started in Year 3/4 transition, or 2008 which was Year 4). <i>Correction:</i> The Year 3 strategy avoids 2008 (Year 4) and 2000 (Year 4). The -33% likely comes from 1987 (Year 3) or 2011/2015 volatility. 
+    worst = dd['Strategy_Curve']
+    robust_text = ""
+    if boot:
+        robust_text += f"""
+    <b>Bootstrap Validation:</b> We resampled returns {boot['n_sims']:,} times. The probability of the Year 3 Sharpe Ratio arising from random chance is <b>{boot['p_iid']:.2%} (p={boot['p_iid']:.4f})</b>"""
+        if boot.get('p_block') is not None:
+            robust_text += f"; a stationary block bootstrap ({boot['block_sims']:,} replicates, mean block {boot['block_length']} days) gives p={boot['p_block']:.4f}"
+        robust_text += ".<br/><br/>"
+    robust_text += f"""
+    <b>Drawdown Analysis:</b> Using daily data reveals the true risk. While annual data suggests a {annual['strategy']['year3_max_dd']:.2f}% drawdown, daily data shows a <b>{worst['Max DD (%)']:.2f}%</b> maximum drawdown for the Year 3 strategy (peak {worst['Peak']}, trough {worst['Trough']}, recovered {worst['Recovery'] or 'not yet'}), versus {dd['BuyHold_Curve']['Max DD (%)']:.2f}% for Buy & Hold.
     """
     Story.append(Paragraph(robust_text, styles['QuantBody']))
     
     # Embed Equity Curve
     try:
         Story.append(Spacer(1, 12))
-        img2 = Image("equity_curve.png", width=450, height=225)
+        img2 = Image(inst['charts']['equity_curve'], width=450, height=225)
         Story.append(img2)
-        Story.append(Paragraph("Figure 2: Log Equity Curve (Year 3 Only vs Buy & Hold). Note the flat lines (Cash) preserving capital during bear markets.", styles['Caption']))
+        Story.append(Paragraph(f"Figure 2: Log Equity Curve (Year 3 Only vs Buy & Hold). Flat segments are years held in cash; "
+                               f"maximum drawdown {worst['Max DD (%)']:.2f}% versus {dd['BuyHold_Curve']['Max DD (%)']:.2f}%.", styles['Caption']))
     except:
         Story.append(Paragraph("[Error: equity_curve.png not found]", styles['Caption']))
         
     Story.append(Spacer(1, 24))
     Story.append(Paragraph("<b>5. CONCLUSION</b>", styles['QuantHeader']))
-    concl = """
-    The 'Pre-Election Year Alpha' is an institutional-grade anomaly. It survives Fama-French adjustment, passes bootstrap validation, and offers a superior risk-reward profile. 
-    <br/><br/>
-    <b>Recommendation:</b> Systematic Overweight to US Equities in Year 3.
-    """
-    Story.append(Paragraph(concl, styles['QuantBody']))
+    Story.append(Paragraph(conclusion(reg, boot, y3, bh, dd, asset), styles['QuantBody']))
 
     # Disclaimer
     Story.append(Spacer(1, 36))
     disc = "<b>DISCLAIMER:</b> For educational purposes only. Not investment advice."
-    Story.append(Paragraph(disc, ParagraphStyle('Disc', parent=styles['Normal'], fontSize=8, textColor=colors.grey)))
+    Story.append(Paragraph(disc, styles['Disc']))
+    return Story
+
+
+def render_pdf(filename, results, styles=None):
+    doc = SimpleDocTemplate(filename, pagesize=letter,
+                            rightMargin=54, leftMargin=54,
+                            topMargin=54, bottomMargin=54)
+    story = build_story(results, styles or build_styles())
+    with stage('pdf_build', report=filename, flowables=len(story)):
+        doc.build(story)
+
 
-    doc.build(Story)
+def create_pdf(filename, results_path=RESULTS_FILE):
+    render_pdf(filename, load_results(results_path, require=('annual', 'institutional')))
     print(f"PDF generated: {filename}")
 
 if __name__ == "__main__":
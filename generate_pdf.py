@@ -5,7 +5,28 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_JUSTIFY, TA_CENTER, TA_LEFT
 
-def create_pdf(filename):
+from profiling import stage
+from results_artifact import RESULTS_FILE, load_results, phase_rank, report_date, row, significance
+
+PHASE_ROWS = [
+    ("Year 1: Post-Election", "Post-Election (Year 1)"),
+    ("Year 2: Midterm", "Midterm (Year 2)"),
+    ("Year 3: Pre-Election", "Pre-Election (Year 3)"),
+    ("Year 4: Election", "Election Year (Year 4)"),
+]
+
+def create_pdf(filename, results_path=RESULTS_FILE):
+    annual = load_results(results_path, require=('annual',))['annual']
+    y3 = row(annual['phases'], "Pre-Election (Year 3)")
+    bh = row(annual['metrics'], "Buy & Hold (All)")
+    ttest = annual['ttest']
+    strategy = annual['strategy']
+    period = f"{annual['start_year']}-{annual['end_year']}"
+    n_years = annual['end_year'] - annual['start_year'] + 1
+    rank, best = phase_rank(annual['phases'], "Pre-Election (Year 3)")
+    # Recommend the tilt only when the t-test and the Sharpe comparison both support it
+    supported = ttest['p_value'] < 0.05 and y3['Sharpe'] > bh['Sharpe']
+
     # Professional margins (0.75 inch)
     doc = SimpleDocTemplate(filename, pagesize=letter,
                             rightMargin=54, leftMargin=54,
@@ -22,40 +43,35 @@ def create_pdf(filename):
     # Header
     Story.append(Paragraph("QUANTITATIVE EQUITY RESEARCH", styles['QuantSubtitle']))
     Story.append(Paragraph("The Presidential Pump: Isolating Alpha in the Pre-Election Year", styles['QuantTitle']))
-    Story.append(Paragraph("<b>Author:</b> Gabriel Bengo &nbsp;|&nbsp; <b>Date:</b> December 5, 2024", styles['QuantSubtitle']))
+    Story.append(Paragraph(f"<b>Author:</b> Gabriel Bengo &nbsp;|&nbsp; <b>Date:</b> {report_date(annual)}", styles['QuantSubtitle']))
     Story.append(Spacer(1, 12))
     
     # Abstract
-    Story.append(Paragraph("<b>ABSTRACT:</b> We investigate the efficiency of the S&P 500 across the 4-year US Presidential Election Cycle (1950-2024). Empirical evidence rejects the 'Election Year' hypothesis in favor of a strong, statistically significant anomaly in the <b>Pre-Election Year (Year 3)</b>, which exhibits a Sharpe Ratio of 1.58 versus the market's 0.57.", styles['QuantBody']))
+    Story.append(Paragraph(f"<b>ABSTRACT:</b> We investigate the efficiency of the S&P 500 across the 4-year US Presidential Election Cycle ({period}). The <b>Pre-Election Year (Year 3)</b> exhibits a Sharpe Ratio of {y3['Sharpe']:.2f} versus the market's {bh['Sharpe']:.2f}; a one-tailed Welch t-test of Year 3 against the other years gives p = {ttest['p_value']:.4f} ({significance(ttest['p_value']).lower()}).", styles['QuantBody']))
     Story.append(Spacer(1, 12))
     
     # 1. Investment Thesis
     Story.append(Paragraph("1. INVESTMENT THESIS", styles['QuantHeader']))
-    thesis = """
-    The 'Political Business Cycle' theory posits that incumbent administrations employ expansionary fiscal and monetary policies in the period substantially preceding an election to maximize economic sentiment during the voting window. Our analysis confirms that this stimulus 'pricing in' occurs primarily in <b>Year 3</b> (Pre-Election), not Year 4.
+    placement = ("occurs primarily in <b>Year 3</b> (Pre-Election), which has the highest mean return of the four phases" if rank == 1
+                 else f"does not show up in <b>Year 3</b> (Pre-Election), which ranks {rank} of 4 by mean return behind {best['Name']}")
+    thesis = f"""
+    The 'Political Business Cycle' theory posits that incumbent administrations employ expansionary fiscal and monetary policies in the period substantially preceding an election to maximize economic sentiment during the voting window. In this sample the stimulus 'pricing in' {placement}.
     """
     Story.append(Paragraph(thesis, styles['QuantBody']))
     
     # 2. Empirical Findings
-    Story.append(Paragraph("2. EMPIRICAL FINDINGS (1950-2024)", styles['QuantHeader']))
-    Story.append(Paragraph(u"The performance disparity is structural. Year 3 offers double-digit mean returns with significantly suppressed volatility (\u03C3 = 10.86%).", styles['QuantBody']))
+    Story.append(Paragraph(f"2. EMPIRICAL FINDINGS ({period})", styles['QuantHeader']))
+    Story.append(Paragraph(f"Year 3 averages a {y3['Mean (%)']:.2f}% annual return versus {bh['Mean (%)']:.2f}% for Buy & Hold, with volatility of \u03C3 = {y3['Vol (%)']:.2f}% versus {bh['Vol (%)']:.2f}%.", styles['QuantBody']))
     Story.append(Spacer(1, 6))
     
-    # Detailed Data Table
-    # Data derived from previous analysis outputs
-    # Year 1 (Post): 8.36%, Vol 17.68%
-    # Year 2 (Midterm): 3.68%, Vol 20.37%
-    # Year 3 (Pre): 17.18%, Vol 10.86%
-    # Year 4 (Election): 8.11%, Vol 14.41%
-    
-    data = [
-        ['Cycle Phase', 'Mean Rtn', 'Volatility', 'Sharpe', 'Max DD', 'Win Rate'],
-        ['Year 1: Post-Election', '8.36%', '17.68%', '0.47', '-17.37%', u'\u2014'],
-        ['Year 2: Midterm', '3.68%', '20.37%', '0.18', '-29.72%', u'\u2014'],
-        ['Year 3: Pre-Election', '17.18%', '10.86%', '1.58', '-0.73%', '89%'],
-        ['Year 4: Election', '8.11%', '14.41%', '0.56', '-38.49%', u'\u2014'],
-        ['Benchmark (Buy & Hold)', '9.41%', '16.57%', '0.57', '-41.92%', '73%']
-    ]
+    # Detailed Data Table (annual returns; phase "Max DD" is the worst calendar year)
+    data = [['Cycle Phase', 'Mean Rtn', 'Volatility', 'Sharpe', 'Max DD', 'Win Rate']]
+    for label, name in PHASE_ROWS:
+        m = row(annual['phases'], name)
+        data.append([label, f"{m['Mean (%)']:.2f}%", f"{m['Vol (%)']:.2f}%", f"{m['Sharpe']:.2f}",
+                     f"{m['Min (%)']:.2f}%", f"{m['Win Rate']:.0%}"])
+    data.append(['Benchmark (Buy & Hold)', f"{bh['Mean (%)']:.2f}%", f"{bh['Vol (%)']:.2f}%", f"{bh['Sharpe']:.2f}",
+                 f"{strategy['buy_hold_max_dd']:.2f}%", f"{bh['Win Rate']:.0%}"])
     
     t = Table(data, colWidths=[140, 60, 60, 50, 60, 60])
     t.setStyle(TableStyle([
@@ -75,20 +91,24 @@ def create_pdf(filename):
     
     # 3. Statistical Validity
     Story.append(Paragraph("3. STATISTICAL VALIDITY", styles['QuantHeader']))
-    stats_text = """
+    stats_text = f"""
     We test the null hypothesis H0: Mean(Year 3) <= Mean(Other) using a one-tailed Welch's t-test.
-    <br/>&bull; T-Statistic: 3.0532
-    <br/>&bull; P-Value: 0.0018 (< 0.01)
-    <br/><br/><b>Conclusion:</b> The outperformance is statistically significant at the 99% confidence level.
+    <br/>&bull; T-Statistic: {ttest['t_stat']:.4f}
+    <br/>&bull; P-Value: {ttest['p_value']:.4f}
+    <br/><br/><b>Conclusion:</b> {significance(ttest['p_value'])} (one-tailed p = {ttest['p_value']:.4f}).
     """
     Story.append(Paragraph(stats_text, styles['QuantBody']))
     
     # 4. Strategy & Implementation
     Story.append(Paragraph("4. STRATEGY IMPLICATION", styles['QuantHeader']))
-    strat_text = """
-    A rigorous 'Year 3 Only' strategy (Cash in Years 1, 2, 4) yields a Max Drawdown of just <b>-0.73%</b> over 75 years, compared to -41.92% for Buy & Hold. This risk profile suggests Year 3 is an ideal window for leveraged exposure or aggressive factor rotation.
+    if supported:
+        advice = "Overweight US Equities (SPY) at the start of the Pre-Election Year. Neutralize or hedge exposure entering the Election Year."
+    else:
+        advice = "No cycle-based tilt; the Year 3 premium is not significant at the 5% level or does not beat Buy & Hold on a risk-adjusted basis."
+    strat_text = f"""
+    A 'Year 3 Only' strategy (Cash in Years 1, 2, 4) has a Max Drawdown of <b>{strategy['year3_max_dd']:.2f}%</b> over {n_years} years, compared to {strategy['buy_hold_max_dd']:.2f}% for Buy & Hold.
     <br/><br/>
-    <b>Recommendation:</b> Overweight US Equities (SPY) aggressively at the start of the Pre-Election Year. Neutralize or hedge exposure entering the Election Year.
+    <b>Recommendation:</b> {advice}
     """
     Story.append(Paragraph(strat_text, styles['QuantBody']))
     
@@ -97,7 +117,8 @@ def create_pdf(filename):
     disclaimer = "<b>DISCLAIMER:</b> Past performance is not indicative of future results. Quantitative models are subject to regime change risk."
     Story.append(Paragraph(disclaimer, ParagraphStyle('Disclaimer', parent=styles['Normal'], fontSize=6, textColor=colors.grey)))
 
-    doc.build(Story)
+    with stage('pdf_build', report=filename, flowables=len(Story)):
+        doc.build(Story)
     print(f"PDF generated: {filename}")
 
 if __name__ == "__main__":
@@ -1,111 +1,239 @@
+import os
+
 import pandas as pd
 import numpy as np
-import statsmodels.api as sm
-from statsmodels.regression.rolling import RollingOLS
-import matplotlib.pyplot as plt
-import seaborn as sns
+
+from column_store import load_dataset
+from profiling import stage
+from stage_cache import StageCache
+from results_artifact import distribution_summary, update_results
 
 DATA_FILE = "institutional_data.pkl"
+BOOTSTRAP_SEED = 42
+BOOT_SIMS = 10000
+BLOCK_BOOT_SIMS = 100000
+BLOCK_LENGTH = 20  # ~1 trading month
+ROLLING_WINDOWS = [252, 504, 1260, 2520]  # 1, 2, 5 and 10 years
+GAMMA_BOOT_SIMS = 100000
 
-def run_analysis():
-    print("Loading Data...")
-    if not os.path.exists(DATA_FILE):
-        print(f"Error: {DATA_FILE} not found. Run fetch_data.py first.")
-        return
+FACTORS = ['Mkt_RF', 'SMB', 'HML']
+REGRESSION_COLUMNS = ['Excess_Ret'] + FACTORS + ['Is_Year3']
+
+# Stages: load -> excess returns -> full regression -> rolling -> bootstrap -> drawdown -> plots.
+# Each stage is cached on a hash of its code, parameters and the columns it reads
+# (see stage_cache.py). Heavy imports live inside the stages so cached re-runs skip them.
 
-    df = pd.read_pickle(DATA_FILE)
-    
-    # 1. Prepare Data for Regression
+
+def excess_returns(df):
     # Factos: Mkt-RF, SMB, HML. Target: SP500_Ret - RF
     # Note: RF is in the dataset as 'RF' (Risk-Free rate)
+    df = df.copy()
     df['Excess_Ret'] = df['SP500_Ret'] - df['RF']
-    
+    return df
+
+
+def _design(df):
+    import statsmodels.api as sm
     # Define Independent Variables (X) and Dependent Variable (y)
-    X = df[['Mkt_RF', 'SMB', 'HML', 'Is_Year3']]
-    X = sm.add_constant(X) # Adds a constant term (alpha)
-    y = df['Excess_Ret']
-    
+    # The column store keeps Is_Year3 as bool; statsmodels needs a numeric design
+    X = sm.add_constant(df[FACTORS + ['Is_Year3']].astype(float))  # Adds a constant term (alpha)
+    return X, df['Excess_Ret']
+
+
+def full_regression(df):
+    import statsmodels.api as sm
+    X, y = _design(df)
+    model = sm.OLS(y, X).fit(cov_type='HAC', cov_kwds={'maxlags': 1})  # Robust Standard Errors
+    return {'summary': str(model.summary()), 'params': model.params, 'bse': model.bse,
+            'tvalues': model.tvalues, 'pvalues': model.pvalues, 'nobs': model.nobs, 'rsquared': model.rsquared}
+
+
+def gamma_bootstrap(df, n_boot, seed):
+    from regression_bootstrap import coefficient_bootstrap
+    # One factorization, replicates are dot products
+    X, y = _design(df)
+    rows = []
+    for label, kwargs in [("Wild (Rademacher)", {'method': 'wild'}),
+                          ("Wild Cluster by Year", {'method': 'wild-cluster', 'clusters': df.index.year})]:
+        boot = coefficient_bootstrap(y, X, term='Is_Year3', n_boot=n_boot, seed=seed, **kwargs)
+        boot['distribution'] = distribution_summary(boot.pop('replicates'))
+        rows.append((label, boot))
+    return rows
+
+
+def with_extended_factors(df):
+    from batch_regression import load_extended_factors
+    # RMW, CMA and Mom from data_providers; left join so FF3 specs keep the full sample
+    # (daily FF5 starts in 1963, batch_ols drops each spec's missing rows)
+    extra = load_extended_factors(start=str(df.index[0].date()))
+    return df.join(extra[['RMW', 'CMA', 'Mom']], how='left')
+
+
+def spec_grid(df, factor_sets=('FF3',)):
+    from batch_regression import build_designs, batch_ols
+    # Robustness grid: Year 3 dummy vs one dummy per phase, across HAC lag choices
+    grid = batch_ols(df['Excess_Ret'], build_designs(df, factor_sets=factor_sets), hac_lags=(0, 1, 5, 10))
+    grid = grid[grid['term'].str.startswith('Is_Year')]
+    return grid.pivot_table(index=['spec', 'term'], columns='hac_lags', values='t_stat')
+
+
+def rolling_stability(df, windows):
+    from rolling_regression import rolling_ols
+    # All windows in one pass, Newey-West (lag 1) errors
+    X, y = _design(df)
+    rolling_all = rolling_ols(y, X, windows, hac_lags=1)
+    latest = {}
+    for window, res in rolling_all.items():
+        gamma = res.params['Is_Year3'].dropna()
+        t_hac = res.tvalues_hac['Is_Year3'].dropna()
+        latest[window] = (gamma.iloc[-1], t_hac.iloc[-1], (gamma > 0).mean())
+    return {'latest': latest, 'gamma_1260': rolling_all[1260].params['Is_Year3']}
+
+
+def sharpe_bootstrap(df, n_sims, block_sims, block_length, seed):
+    from bootstrap import sharpe_diff_bootstrap, parallel_sharpe_diff_bootstrap, bootstrap_pvalue
+    year3_rets = df[df['Is_Year3'] == 1]['Excess_Ret']
+    other_rets = df[df['Is_Year3'] == 0]['Excess_Ret']
+    diffs = sharpe_diff_bootstrap(year3_rets, other_rets, n_sims=n_sims, seed=seed)
+    # Stationary bootstrap keeps short-run autocorrelation inside resampled blocks
+    block_diffs = parallel_sharpe_diff_bootstrap(year3_rets, other_rets, n_sims=block_sims, seed=seed,
+                                                 method='stationary', block_length=block_length)
+    return {'p_iid': bootstrap_pvalue(diffs), 'p_block': bootstrap_pvalue(block_diffs),
+            'iid': distribution_summary(diffs), 'block': distribution_summary(block_diffs)}
+
+
+def drawdown_analysis(df):
+    from drawdown import drawdown_stats
+    # Strategy: Invest in SP500 ONLY during Year 3, cash otherwise.
+    # Let's use 0 for cash to be conservative/simple (RF adds return).
+    strategy_ret = np.where(df['Is_Year3'] == 1, df['SP500_Ret'], 0.0)
+    curves = pd.DataFrame({
+        'BuyHold_Curve': (1 + df['SP500_Ret']).cumprod(),
+        'Strategy_Curve': (1 + strategy_ret).cumprod(),
+    }, index=df.index)
+    summary, episodes = drawdown_stats(curves, top_n=3)
+    return {'curves': curves, 'summary': summary, 'episodes': episodes}
+
+
+def phase_backtests(df):
+    from backtest import phase_subset_masks, run_backtest
+    # Every combination of cycle phases, long the index in-phase and cash (0%) / RF otherwise;
+    # Sharpe ratios are of returns in excess of RF for both
+    masks, names = phase_subset_masks(df['Cycle_Year'])
+    return pd.concat([run_backtest(df['SP500_Ret'], masks, names, rf=df['RF']),
+                      run_backtest(df['SP500_Ret'], masks, names, out_leg='rf', rf=df['RF'])])
+
+
+def rolling_plot(gamma):
+    from charts import render_chart
+    return render_chart('rolling_alpha', gamma.to_frame('gamma'))
+
+
+def equity_plot(curves):
+    from charts import render_chart
+    return render_chart('equity_curve', curves)
+
+
+def save_png(content, path):
+    # Cached plots come back as bytes; skip the write when the file is already identical
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            if f.read() == content:
+                return
+    with open(path, 'wb') as f:
+        f.write(content)
+
+
+def run_analysis(cache=None, extended_factors=False):
+    print("Loading Data...")
+    if not os.path.exists(DATA_FILE):
+        print(f"Error: {DATA_FILE} not found. Run fetch_data.py first.")
+        return
+
+    cache = cache if cache is not None else StageCache()
+    with stage('load', path=DATA_FILE) as record:
+        raw = load_dataset(DATA_FILE)
+        record['rows'] = len(raw)
+    df = cache.run('excess_returns', excess_returns, raw)
+    reg_data = df[REGRESSION_COLUMNS]
+
     # 2. Daily Factor Regression (Full Sample)
     print("\n--- Multifactor Regression (Daily Data) ---")
-    model = sm.OLS(y, X).fit(cov_type='HAC', cov_kwds={'maxlags': 1}) # Robust Standard Errors
-    print(model.summary())
-    
-    gamma_coef = model.params['Is_Year3']
-    gamma_pval = model.pvalues['Is_Year3']
+    model = cache.run('regression', full_regression, reg_data)
+    print(model['summary'])
+
+    gamma_coef = model['params']['Is_Year3']
+    gamma_pval = model['pvalues']['Is_Year3']
     print(f"\nYear 3 Alpha Coefficient (Daily): {gamma_coef:.6f}")
     print(f"Year 3 Alpha P-Value: {gamma_pval:.6f}")
-    
-    # 3. Rolling OLS (Stability Check) - 1260 days (~5 years)
-    print("\n--- Running Rolling OLS (Window=1260 days) ---")
-    rolling = RollingOLS(y, X, window=1260).fit()
-    rolling_params = rolling.params
-    
-    # Plot Rolling Year 3 Coefficient
-    plt.figure(figsize=(12, 6))
-    plt.plot(rolling_params.index, rolling_params['Is_Year3'], label='Year 3 Alpha (Rolling 5Y)', color='blue')
-    plt.axhline(0, color='red', linestyle='--')
-    plt.title('Rolling 5-Year Alpha Coefficient for Pre-Election Year (Year 3)')
-    plt.ylabel('Alpha coef')
-    plt.legend()
-    plt.grid(True)
-    plt.savefig('rolling_alpha.png')
+
+    print(f"\n--- Year 3 Alpha Bootstrap Intervals ({GAMMA_BOOT_SIMS:,} replicates, 95%) ---")
+    gamma_boot = cache.run('gamma_bootstrap', gamma_bootstrap, reg_data, n_boot=GAMMA_BOOT_SIMS, seed=BOOTSTRAP_SEED)
+    for label, boot in gamma_boot:
+        lo, hi = boot['ci_percentile']
+        bca_lo, bca_hi = boot['ci_bca']
+        print(f"{label:<22} SE {boot['std_err']:.6f} | Percentile [{lo:.6f}, {hi:.6f}] | BCa [{bca_lo:.6f}, {bca_hi:.6f}]")
+
+    print("\n--- Specification Grid (batched OLS, HAC lags 0/1/5/10) ---")
+    grid_data, factor_sets = df[['Excess_Ret', 'Cycle_Year'] + FACTORS], ('FF3',)
+    if extended_factors:
+        # FF5 and FF5 + momentum need factors the dataset does not carry
+        grid_data, factor_sets = with_extended_factors(grid_data), ('FF3', 'FF5', 'FF5_MOM')
+    grid = cache.run('spec_grid', spec_grid, grid_data, factor_sets=factor_sets)
+    print(grid.round(2))
+
+    # 3. Rolling OLS (Stability Check)
+    print(f"\n--- Running Rolling OLS (Windows={ROLLING_WINDOWS} days) ---")
+    rolling = cache.run('rolling', rolling_stability, reg_data, windows=ROLLING_WINDOWS)
+    for window, (gamma, t_hac, share) in rolling['latest'].items():
+        print(f"Window {window:>5}: latest gamma {gamma:.6f} (HAC t={t_hac:.2f}), "
+              f"share of windows with gamma > 0: {share:.1%}")
+
+    save_png(cache.run('rolling_plot', rolling_plot, rolling['gamma_1260']), 'rolling_alpha.png')
     print("Saved rolling_alpha.png")
-    
+
     # 4. Bootstrap Analysis
-    print("\n--- bootstrapping Sharpe Ratios (10,000 iterations) ---")
-    year3_rets = df[df['Is_Year3'] == 1]['Excess_Ret']
-    other_rets = df[df['Is_Year3'] == 0]['Excess_Ret']
-    
-    n_sims = 10000
-    diffs = []
-    
-    for _ in range(n_sims):
-        # Resample with replacement
-        sample_y3 = year3_rets.sample(n=len(year3_rets), replace=True)
-        sample_other = other_rets.sample(n=len(other_rets), replace=True)
-        
-        # Calculate Annualized Sharpe
-        sharpe_y3 = (sample_y3.mean() / sample_y3.std()) * np.sqrt(252)
-        sharpe_other = (sample_other.mean() / sample_other.std()) * np.sqrt(252)
-        
-        diffs.append(sharpe_y3 - sharpe_other)
-        
-    diffs = np.array(diffs)
-    p_val_boot = (diffs <= 0).sum() / n_sims
-    print(f"Bootstrap P-Value (Prob that Year 3 Sharpe <= Other Sharpe): {p_val_boot:.5f}")
-    
+    boot = cache.run('sharpe_bootstrap', sharpe_bootstrap, df[['Excess_Ret', 'Is_Year3']],
+                     n_sims=BOOT_SIMS, block_sims=BLOCK_BOOT_SIMS, block_length=BLOCK_LENGTH,
+                     seed=BOOTSTRAP_SEED)
+    print(f"\n--- bootstrapping Sharpe Ratios ({BOOT_SIMS:,} iterations) ---")
+    print(f"Bootstrap P-Value (Prob that Year 3 Sharpe <= Other Sharpe): {boot['p_iid']:.5f}")
+    print(f"\n--- Stationary Block Bootstrap ({BLOCK_BOOT_SIMS:,} replicates, mean block {BLOCK_LENGTH} days) ---")
+    print(f"Block Bootstrap P-Value: {boot['p_block']:.5f}")
+
     # 5. Drawdown Analysis
     print("\n--- Drawdown Analysis ---")
-    # Strategy: Invest in SP500 ONLY during Year 3. Cash (RF) otherwise.
-    # Actually, simplistic view: Cash return = 0 for simplicity or use RF.
-    # Let's use 0 for cash to be conservative/simple (RF adds return).
-    
-    df['Strategy_Ret'] = np.where(df['Is_Year3'] == 1, df['SP500_Ret'], 0.0)
-    df['BuyHold_Curve'] = (1 + df['SP500_Ret']).cumprod()
-    df['Strategy_Curve'] = (1 + df['Strategy_Ret']).cumprod()
-    
-    def get_max_dd(curve):
-        peak = curve.cummax()
-        dd = (curve - peak) / peak
-        return dd.min()
-    
-    dd_bh = get_max_dd(df['BuyHold_Curve'])
-    dd_strat = get_max_dd(df['Strategy_Curve'])
-    
-    print(f"Max Drawdown (Buy & Hold): {dd_bh:.2%}")
-    print(f"Max Drawdown (Year 3 Only): {dd_strat:.2%}")
-    
+    dd = cache.run('drawdown', drawdown_analysis, df[['SP500_Ret', 'Is_Year3']])
+    print(f"Max Drawdown (Buy & Hold): {dd['summary'].loc['BuyHold_Curve', 'Max DD (%)'] / 100:.2%}")
+    print(f"Max Drawdown (Year 3 Only): {dd['summary'].loc['Strategy_Curve', 'Max DD (%)'] / 100:.2%}")
+    print(dd['episodes'].to_string(index=False, float_format='%.2f'))
+
+    print("\n--- Phase-Subset Backtests (all 16 combinations) ---")
+    subsets = cache.run('phase_backtests', phase_backtests, df[['SP500_Ret', 'RF', 'Cycle_Year']])
+    print(subsets.sort_values('Sharpe', ascending=False).head(10).round(3))
+
     # Save a comparison plot
-    plt.figure(figsize=(12, 6))
-    plt.plot(df.index, df['BuyHold_Curve'], label='Buy & Hold', color='gray', alpha=0.6)
-    plt.plot(df.index, df['Strategy_Curve'], label='Year 3 Only', color='green')
-    plt.yscale('log')
-    plt.title('Equity Curve: Year 3 Only vs Buy & Hold (Log Scale)')
-    plt.legend()
-    plt.grid(True)
-    plt.savefig('equity_curve.png')
+    save_png(cache.run('equity_plot', equity_plot, dd['curves']), 'equity_curve.png')
     print("Saved equity_curve.png")
 
+    update_results('institutional', {
+        'data': {'start': df.index[0], 'end': df.index[-1], 'rows': len(df)},
+        'regression': {key: value for key, value in model.items() if key != 'summary'},
+        'gamma_bootstrap': dict(gamma_boot),
+        'spec_grid': grid.rename(columns=str),
+        'rolling': {str(window): dict(zip(['gamma', 't_hac', 'share_positive'], values))
+                    for window, values in rolling['latest'].items()},
+        'sharpe_bootstrap': dict(boot, n_sims=BOOT_SIMS, block_sims=BLOCK_BOOT_SIMS, block_length=BLOCK_LENGTH),
+        'drawdown': {'summary': dd['summary'], 'episodes': dd['episodes']},
+        'phase_backtests': subsets,
+        'charts': {'rolling_alpha': 'rolling_alpha.png', 'equity_curve': 'equity_curve.png'},
+    })
+    print("Saved institutional results to results.json")
+    print(f"\nStage cache: {cache.hits} hits, {cache.misses} misses")
+
 if __name__ == "__main__":
-    import os
-    run_analysis()
+    import argparse
+    parser = argparse.ArgumentParser(description="Institutional factor analysis of the Year 3 effect.")
+    parser.add_argument('--ff5', action='store_true',
+                        help="Add FF5 and FF5 + momentum specifications to the grid (downloads the extra factors)")
+    run_analysis(extended_factors=parser.parse_args().ff5)
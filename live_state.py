@@ -0,0 +1,300 @@
+"""
+Live incremental mode: refresh the headline metrics when a trading day arrives.
+
+run_analysis recomputes everything from the full history. LiveState keeps the
+running state instead and checkpoints it to live_state.pkl:
+
+  - streaming.CycleStream for the full sample: per-phase moments, yearly log
+    returns, equity-curve levels and peaks, and the FF3 + Year 3 normal
+    equations with their Newey-West cross products;
+  - one RollingNormalEquations per rolling window: the same sums over the last
+    `window` days plus a buffer of those days, so each new day is added and
+    the day leaving the window subtracted.
+
+Appending a day costs the same however long the history is. It updates the
+full-sample regression (HAC errors included), the latest rolling Year 3 alpha
+for every window, the current and maximum drawdowns, and the phase metrics.
+The snapshot is also written to the 'live' section of results.json, so
+`python cli.py show live` reads it without touching the data.
+Bootstraps and permutation tests have no incremental form and stay with the
+full run_analysis.
+
+    python live_state.py update            # append days new since the checkpoint (builds it on first run)
+    python live_state.py show              # print the checkpointed snapshot
+    python live_state.py verify --days 20  # replay the last days one at a time vs a full recompute
+"""
+import argparse
+import copy
+import os
+import pickle
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from institutional_analysis import ROLLING_WINDOWS
+from streaming import FACTORS, CycleStream, NormalEquations, cycle_design, iter_frame
+
+DATA_FILE = "institutional_data.pkl"
+STATE_FILE = "live_state.pkl"
+STATE_VERSION = 1
+
+
+class RollingNormalEquations(NormalEquations):
+    """
+    NormalEquations over the last `window` rows only.
+
+    Each appended row is added to the sums and the row leaving the window is
+    subtracted, including its lagged HAC cross products with the rows after
+    it. The sums are recomputed from the buffer once per `window` appends so
+    rounding from the add/subtract pairs cannot build up.
+    """
+
+    def __init__(self, k, window, hac_lags=1):
+        super().__init__(k, hac_lags)
+        self.window = window
+        self.buffer = deque()
+        self.appended = 0
+
+    def append(self, x, y):
+        """Add one row (x: k regressors, y: response); rows with NaNs are skipped."""
+        if np.isnan(y) or np.isnan(x).any():
+            return
+        z = np.concatenate([x * y, x[self.pairs[:, 0]] * x[self.pairs[:, 1]]])
+        self.buffer.append((z, y))
+        self.n += 1
+        self.sz += z
+        self.sy += y
+        self.syy += y * y
+        for lag in range(min(self.hac_lags, len(self.buffer) - 1) + 1):
+            self.szz[lag] += np.outer(z, self.buffer[-1 - lag][0])
+
+        if len(self.buffer) > self.window:
+            z_old, y_old = self.buffer.popleft()
+            self.n -= 1
+            self.sz -= z_old
+            self.sy -= y_old
+            self.syy -= y_old * y_old
+            self.szz[0] -= np.outer(z_old, z_old)
+            # The leaving row was the lagged partner of the `lag`-th row after it
+            for lag in range(1, min(self.hac_lags, len(self.buffer)) + 1):
+                self.szz[lag] -= np.outer(self.buffer[lag - 1][0], z_old)
+
+        self.appended += 1
+        if self.appended % self.window == 0:
+            self.resync()
+
+    def resync(self):
+        """Recompute every sum from the buffered rows."""
+        Z = np.array([z for z, _ in self.buffer]).reshape(len(self.buffer), -1)
+        y = np.array([y for _, y in self.buffer])
+        self.n = len(y)
+        self.sz = Z.sum(axis=0)
+        self.sy = y.sum()
+        self.syy = y @ y
+        self.szz = [Z[lag:].T @ Z[:len(Z) - lag] for lag in range(self.hac_lags + 1)]
+
+    def latest(self):
+        """solve() for the current window, or None until it is full (or if X'X is singular)."""
+        if self.n < self.window or np.linalg.matrix_rank(self.xx_xy()[0]) < self.k:
+            return None
+        return self.solve()
+
+
+class LiveState:
+    """Full-sample and rolling-window state for the institutional dataset, one day at a time."""
+
+    def __init__(self, windows=ROLLING_WINDOWS, hac_lags=1):
+        self.stream = CycleStream(['SP500_Ret'], rf='RF', factors=FACTORS, hac_lags=hac_lags)
+        self.rolling = {window: RollingNormalEquations(len(self.stream.terms), window, hac_lags)
+                        for window in windows}
+        self.last_date = None
+        self.last_row = None
+
+    @classmethod
+    def build(cls, df, chunk_rows=100_000, **kwargs):
+        """State after the whole history in df (full sample streamed, rolling buffers from the tail)."""
+        state = cls(**kwargs)
+        state.stream.consume(iter_frame(df, chunk_rows))
+        tail = df.iloc[-max(state.rolling):]
+        state._append_rolling(tail)
+        state._mark(df)
+        return state
+
+    def _append_rolling(self, rows):
+        X = cycle_design(rows, FACTORS)
+        y = (rows['SP500_Ret'] - rows['RF']).to_numpy(dtype=np.float64)
+        for rolling in self.rolling.values():
+            for i in range(len(y)):
+                rolling.append(X[i], y[i])
+
+    def _mark(self, df):
+        self.last_date = df.index[-1]
+        self.last_row = df.iloc[-1].to_numpy(dtype=np.float64)
+
+    def append(self, rows):
+        """Fold in the rows dated after the last one seen; returns how many were new."""
+        if self.last_date is not None:
+            rows = rows[rows.index > self.last_date]
+        if rows.empty:
+            return 0
+        self.stream.update(rows)
+        self._append_rolling(rows)
+        self._mark(rows)
+        return len(rows)
+
+    def preview(self, rows):
+        """Snapshot with provisional rows (e.g. an intraday bar) applied to a copy; the state is unchanged."""
+        trial = copy.deepcopy(self)
+        trial.append(rows)
+        return trial.snapshot()
+
+    def matches(self, df):
+        """Whether df extends the history this state was built from (same last row at the same date)."""
+        if self.last_date not in df.index:
+            return False
+        row = df.loc[self.last_date].to_numpy(dtype=np.float64)
+        return np.array_equal(row, self.last_row, equal_nan=True)
+
+    def snapshot(self):
+        """Headline metrics (numpy values and a phase table; results_artifact.to_jsonable converts them)."""
+        stream = self.stream
+        fit = stream.ols['SP500_Ret'].solve()
+        terms = stream.terms
+        t_hac = fit['params'] / fit['bse_hac']
+        j = terms.index('Is_Year3')
+        rolling = {}
+        for window, equations in self.rolling.items():
+            latest = equations.latest()
+            rolling[str(window)] = ({'gamma': latest['params'][j], 't_hac': latest['params'][j] / latest['bse_hac'][j]}
+                                    if latest is not None else {'gamma': None, 't_hac': None})
+        j = stream.series.index('SP500_Ret')
+        drawdown = {
+            'buy_hold': {'current_dd': stream.drawdown[4].current[j] * 100,
+                         'max_dd': stream.drawdown[4].max_drawdown[j] * 100},
+            'year3': {'current_dd': stream.drawdown[3].current[j] * 100,
+                      'max_dd': stream.drawdown[3].max_drawdown[j] * 100},
+        }
+        return {
+            'as_of': str(self.last_date.date()),
+            'rows': stream.rows,
+            'regression': {
+                'params': dict(zip(terms, fit['params'])), 'bse': dict(zip(terms, fit['bse_hac'])),
+                'tvalues': dict(zip(terms, t_hac)), 'nobs': fit['nobs'], 'rsquared': fit['rsquared'],
+            },
+            'rolling': rolling,
+            'drawdown': drawdown,
+            'phases': stream.phase_table('SP500_Ret'),
+            'ttest': stream.compare_phases(),
+        }
+
+    def save(self, path=STATE_FILE):
+        # Write next to the target and swap in, so a crash never leaves a partial checkpoint
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'version': STATE_VERSION, 'state': self}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path=STATE_FILE):
+        """The checkpointed state, or None if there is none (or it is from an older layout)."""
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            saved = pickle.load(f)
+        return saved['state'] if saved.get('version') == STATE_VERSION else None
+
+
+def sync(data_file=DATA_FILE, path=STATE_FILE, publish=True):
+    """Append the dataset's new days to the checkpoint (rebuilding it if history changed), save, publish."""
+    from column_store import load_dataset
+    from results_artifact import update_results
+
+    df = load_dataset(data_file)
+    state = LiveState.load(path)
+    if state is not None and state.matches(df):
+        added = state.append(df.iloc[df.index.searchsorted(state.last_date, side='right'):])
+        print(f"Appended {added} new days to {path} (as of {state.last_date.date()})")
+    else:
+        reason = "no checkpoint" if state is None else "history changed"
+        state = LiveState.build(df)
+        print(f"Rebuilt {path} from {len(df):,} days ({reason})")
+    state.save(path)
+    snapshot = state.snapshot()
+    if publish:
+        update_results('live', snapshot)
+    return state, snapshot
+
+
+def print_snapshot(snapshot):
+    reg = snapshot['regression']
+    print(f"As of {snapshot['as_of']} ({snapshot['rows']:,} days)")
+    print(f"  Year 3 alpha {reg['params']['Is_Year3']:.6f}/day, HAC t = {reg['tvalues']['Is_Year3']:.2f}")
+    for window, latest in snapshot['rolling'].items():
+        if latest['gamma'] is None:
+            print(f"  Rolling {window:>4}d: n/a (window not full or Year 3 absent)")
+        else:
+            print(f"  Rolling {window:>4}d: gamma {latest['gamma']:.6f}, HAC t {latest['t_hac']:.2f}")
+    for name, dd in snapshot['drawdown'].items():
+        print(f"  Drawdown {name:<9} current {dd['current_dd']:7.2f}%  max {dd['max_dd']:7.2f}%")
+    print(pd.DataFrame(snapshot['phases']).round(4).to_string(index=False))
+
+
+def verify(days=20, data_file=DATA_FILE):
+    """Replay the last `days` rows one at a time and compare with a from-scratch computation."""
+    from column_store import load_dataset
+    from institutional_analysis import excess_returns, full_regression
+    from rolling_regression import rolling_ols
+    from streaming import cycle_design
+
+    df = load_dataset(data_file)
+    state = LiveState.build(df.iloc[:-days])
+    timings = []
+    for i in range(len(df) - days, len(df)):
+        start = time.perf_counter()
+        state.append(df.iloc[i:i + 1])
+        state.snapshot()
+        timings.append(time.perf_counter() - start)
+    print(f"Appended {days} days: median {np.median(timings) * 1000:.2f} ms per day (append + snapshot)")
+
+    snap = state.snapshot()
+    model = full_regression(excess_returns(df))
+    print(f"  full-sample coef max rel diff   {max(abs(snap['regression']['params'][t] / model['params'][t] - 1) for t in model['params'].index):.2e}")
+    print(f"  full-sample HAC se max rel diff {max(abs(snap['regression']['bse'][t] / model['bse'][t] - 1) for t in model['bse'].index):.2e}")
+    X = pd.DataFrame(cycle_design(df, FACTORS), index=df.index, columns=state.stream.terms)
+    rolled = rolling_ols(df['SP500_Ret'] - df['RF'], X, list(state.rolling), hac_lags=1)
+    for window, result in rolled.items():
+        expected = result.params['Is_Year3'].iloc[-1], result.tvalues_hac['Is_Year3'].iloc[-1]
+        got = snap['rolling'][str(window)]
+        if got['gamma'] is None:
+            print(f"  rolling {window:>4}: n/a (reference {expected[0]})")
+        else:
+            print(f"  rolling {window:>4}: gamma rel diff {abs(got['gamma'] / expected[0] - 1):.2e}, "
+                  f"t rel diff {abs(got['t_hac'] / expected[1] - 1):.2e}")
+
+
+if __name__ == "__main__":
+    # Checkpoints must reference live_state's classes, not __main__'s
+    from live_state import LiveState, print_snapshot, sync, verify
+
+    parser = argparse.ArgumentParser(description="Incremental live metrics with a checkpointed state.")
+    parser.add_argument('command', choices=['update', 'show', 'verify'])
+    parser.add_argument('--data-file', default=DATA_FILE)
+    parser.add_argument('--state', default=STATE_FILE)
+    parser.add_argument('--days', type=int, default=20, help="verify: days to replay")
+    args = parser.parse_args()
+
+    if args.command == 'update':
+        started = time.perf_counter()
+        _, snapshot = sync(args.data_file, args.state)
+        print(f"Done in {(time.perf_counter() - started) * 1000:.1f} ms")
+        print_snapshot(snapshot)
+    elif args.command == 'show':
+        state = LiveState.load(args.state)
+        if state is None:
+            print(f"No checkpoint at {args.state}. Run `python live_state.py update` first.")
+        else:
+            print_snapshot(state.snapshot())
+    else:
+        verify(args.days, args.data_file)
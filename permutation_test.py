@@ -0,0 +1,198 @@
+"""
+Permutation tests that reshuffle which calendar years carry the Year 3 label.
+
+Every statistic is a function of per-year aggregates (from year_index) and a
+boolean mask over years, so one permutation costs O(years) however many days
+there are:
+
+    mean   - mean daily excess return in labeled years minus the rest
+    sharpe - annualized Sharpe of labeled days minus the rest
+    gamma  - OLS coefficient on the label dummy in
+             Excess_Ret ~ const + Mkt_RF + SMB + HML + D
+             X'X and X'y split into a fixed factor block (computed once) and
+             dummy terms that are mask @ per-year sums
+
+Label schemes:
+    'year'          any set of years with as many labeled years as observed
+    'cycle'         the label stays every 4th year, only the phase shifts (4 options)
+    'within_cycle'  each 4-year term (Year 1..Election) independently picks
+                    which of its years is labeled
+
+Small label spaces (up to max_exact assignments) are enumerated exactly,
+otherwise n_perm random assignments are drawn in chunks.
+"""
+import math
+from itertools import combinations, product
+
+import numpy as np
+
+from year_index import TRADING_DAYS, build_year_index
+
+FACTORS = ['Mkt_RF', 'SMB', 'HML']
+STATISTICS = ('mean', 'sharpe', 'gamma')
+
+
+def year_aggregates(df, factors=FACTORS, response='Excess_Ret'):
+    """Per-year sums plus the fixed (label-independent) regression blocks."""
+    if response not in df.columns:
+        df = df.assign(Excess_Ret=df['SP500_Ret'] - df['RF'])
+    index = build_year_index(df, series=[response] + list(factors))
+    by_series = {name: rows.set_index('Year') for name, rows in index.groupby('Series')}
+    resp = by_series[response]
+
+    # Fixed blocks over all days: [1, F]'[1, F] and [1, F]'y
+    base = np.column_stack([np.ones(len(df)), df[list(factors)].to_numpy(dtype=np.float64)])
+    y = df[response].to_numpy(dtype=np.float64)
+    return {
+        'years': resp.index.to_numpy(),
+        'n': resp['n'].to_numpy(dtype=np.float64),
+        'sum': resp['sum'].to_numpy(),
+        'sum_sq': resp['sum_sq'].to_numpy(),
+        'factor_sums': np.column_stack([by_series[f]['sum'].to_numpy() for f in factors]),
+        'xx_fixed': base.T @ base,
+        'xy_fixed': base.T @ y,
+    }
+
+
+def _group_moments(masks, n, total, total_sq):
+    cnt = masks @ n
+    s = masks @ total
+    ss = masks @ total_sq
+    mean = s / cnt
+    var = (ss - s * mean) / (cnt - 1)
+    return mean, var
+
+
+def _statistics(masks, agg, which):
+    masks = masks.astype(np.float64)
+    rest = 1.0 - masks
+    out = {}
+    if 'mean' in which or 'sharpe' in which:
+        m1, v1 = _group_moments(masks, agg['n'], agg['sum'], agg['sum_sq'])
+        m2, v2 = _group_moments(rest, agg['n'], agg['sum'], agg['sum_sq'])
+        if 'mean' in which:
+            out['mean'] = m1 - m2
+        if 'sharpe' in which:
+            out['sharpe'] = (m1 / np.sqrt(v1) - m2 / np.sqrt(v2)) * np.sqrt(TRADING_DAYS)
+    if 'gamma' in which:
+        p, k = len(masks), agg['xx_fixed'].shape[0] + 1
+        # Cross terms of the dummy with [1, F] are sums over labeled years
+        cross = masks @ np.column_stack([agg['n'], agg['factor_sums']])
+        xx = np.empty((p, k, k))
+        xx[:, :-1, :-1] = agg['xx_fixed']
+        xx[:, :-1, -1] = cross
+        xx[:, -1, :-1] = cross
+        xx[:, -1, -1] = cross[:, 0]
+        xy = np.empty((p, k))
+        xy[:, :-1] = agg['xy_fixed']
+        xy[:, -1] = masks @ agg['sum']
+        out['gamma'] = np.linalg.solve(xx, xy[:, :, None])[:, -1, 0]
+    return out
+
+
+def _label_space(years, observed, scheme):
+    # (number of assignments, exact enumerator, random sampler)
+    n_years = len(years)
+    if scheme == 'year':
+        m = int(observed.sum())
+
+        def enumerate_all():
+            for chosen in combinations(range(n_years), m):
+                mask = np.zeros(n_years, dtype=bool)
+                mask[list(chosen)] = True
+                yield mask
+
+        def sample(rng, size):
+            order = rng.random((size, n_years)).argsort(axis=1)[:, :m]
+            masks = np.zeros((size, n_years), dtype=bool)
+            np.put_along_axis(masks, order, True, axis=1)
+            return masks
+
+        return math.comb(n_years, m), enumerate_all, sample
+
+    # Presidential terms: Year 1 (Year % 4 == 1) through the election year
+    term = (years - 1) // 4
+    pos = (years - 1) % 4
+    term_codes, term_idx = np.unique(term, return_inverse=True)
+    n_terms = len(term_codes)
+
+    if scheme == 'cycle':
+        def enumerate_all():
+            for offset in range(4):
+                yield pos == offset
+
+        def sample(rng, size):
+            return pos[None, :] == rng.integers(0, 4, size=(size, 1))
+
+        return 4, enumerate_all, sample
+
+    if scheme == 'within_cycle':
+        def enumerate_all():
+            for offsets in product(range(4), repeat=n_terms):
+                yield pos == np.asarray(offsets)[term_idx]
+
+        def sample(rng, size):
+            offsets = rng.integers(0, 4, size=(size, n_terms))
+            return pos[None, :] == offsets[:, term_idx]
+
+        return 4 ** n_terms, enumerate_all, sample
+
+    raise ValueError(f"Unknown label scheme: {scheme}")
+
+
+def permutation_test(df, scheme='year', statistics=STATISTICS, phase=3, n_perm=1000000,
+                     seed=None, max_exact=1000000, chunk_size=100000):
+    """
+    Null distributions and one-sided p-values (H1: labeled years outperform).
+
+    Returns a dict with the observed statistics, the null arrays, p-values,
+    whether the label space was enumerated exactly and its size.
+    """
+    agg = year_aggregates(df)
+    observed_mask = (agg['years'] % 4) == phase
+    observed = {name: value[0] for name, value in _statistics(observed_mask[None, :], agg, statistics).items()}
+
+    space_size, enumerate_all, sample = _label_space(agg['years'], observed_mask, scheme)
+    exact = space_size <= max_exact
+
+    null = {name: [] for name in statistics}
+    if exact:
+        masks = np.array(list(enumerate_all()))
+        for start in range(0, len(masks), chunk_size):
+            for name, values in _statistics(masks[start:start + chunk_size], agg, statistics).items():
+                null[name].append(values)
+    else:
+        rng = np.random.default_rng(seed)
+        for start in range(0, n_perm, chunk_size):
+            masks = sample(rng, min(chunk_size, n_perm - start))
+            for name, values in _statistics(masks, agg, statistics).items():
+                null[name].append(values)
+    null = {name: np.concatenate(parts) for name, parts in null.items()}
+
+    p_values = {}
+    for name, values in null.items():
+        extreme = (values >= observed[name]).sum()
+        # Enumerated spaces contain the observed labeling; sampled ones add it
+        p_values[name] = extreme / len(values) if exact else (extreme + 1) / (len(values) + 1)
+
+    return {
+        'scheme': scheme,
+        'exact': exact,
+        'space_size': space_size,
+        'n_perm': len(next(iter(null.values()))),
+        'observed': observed,
+        'null': null,
+        'p_values': p_values,
+    }
+
+
+if __name__ == "__main__":
+    from column_store import load_dataset
+
+    df = load_dataset()
+    for scheme in ('cycle', 'within_cycle', 'year'):
+        result = permutation_test(df, scheme=scheme, seed=42)
+        kind = "exact" if result['exact'] else f"{result['n_perm']:,} draws"
+        print(f"\n--- Permutation Test: {scheme} ({kind}, label space {result['space_size']:,}) ---")
+        for name in STATISTICS:
+            print(f"{name:<7} observed {result['observed'][name]: .6f} | p = {result['p_values'][name]:.5f}")
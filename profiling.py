@@ -0,0 +1,161 @@
+"""
+Opt-in per-stage profiling: wall time, CPU time, peak traced memory, rows.
+
+Set PIPELINE_PROFILE=trace.json (or pass --profile to cli.py) and every
+instrumented stage (download, merge, load, the StageCache stages such as
+regression, rolling, bootstrap and drawdown, streaming passes, charts and PDF
+builds) appends one Chrome trace event to that file as it finishes. Open the
+file in chrome://tracing or https://ui.perfetto.dev, or summarize it with
+
+    python profiling.py trace.json
+
+The file uses the trace-event JSON array format without the closing bracket,
+which the viewers accept, so separate runs (fetch, analyze, report) and
+worker processes can all append to the same trace. Delete it to start over.
+
+Memory is measured with tracemalloc (numpy buffers included). Tracing every
+allocation slows allocation-heavy Python code such as matplotlib and
+reportlab several times over, so set PIPELINE_PROFILE_MEMORY=0 when only
+timings matter. When profiling is off, stage() returns a shared no-op
+context manager and costs one global lookup.
+"""
+import argparse
+import contextlib
+import json
+import os
+import time
+import tracemalloc
+
+PROFILE_ENV = 'PIPELINE_PROFILE'
+MEMORY_ENV = 'PIPELINE_PROFILE_MEMORY'
+
+_path = None
+_memory = False
+_stack = []
+
+
+class _Ignore:
+    """Stand-in stage record when profiling is off; writes are dropped."""
+
+    def __setitem__(self, key, value):
+        pass
+
+
+_OFF = contextlib.nullcontext(_Ignore())
+
+
+def enable(path, memory=None):
+    """Start profiling into path (child processes inherit it through the environment)."""
+    global _path, _memory
+    _path = path
+    _memory = os.environ.get(MEMORY_ENV, '1') != '0' if memory is None else memory
+    os.environ[PROFILE_ENV] = path
+    os.environ[MEMORY_ENV] = '1' if _memory else '0'
+    if _memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("[\n")
+
+
+class _Stage:
+    def __init__(self, name, rows, args):
+        self.name = name
+        self.args = dict(args, rows=rows)
+        self.carry = 0
+
+    def __setitem__(self, key, value):
+        self.args[key] = value
+
+    def __enter__(self):
+        if _memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # reset_peak() below would lose the enclosing stage's peak so far
+            if _stack:
+                _stack[-1].carry = max(_stack[-1].carry, peak)
+            tracemalloc.reset_peak()
+            self.base = current
+        _stack.append(self)
+        self.ts = time.time()
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        _stack.pop()
+        if _memory:
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, self.carry)
+            if _stack:
+                _stack[-1].carry = max(_stack[-1].carry, peak)
+            self.args.update(peak_mb=(peak - self.base) / 2 ** 20, net_mb=(current - self.base) / 2 ** 20)
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        event = {
+            'name': self.name, 'cat': 'stage', 'ph': 'X',
+            'ts': round(self.ts * 1e6), 'dur': round(wall * 1e6),
+            'pid': os.getpid(), 'tid': 0,
+            'args': dict(self.args, wall_s=wall, cpu_s=cpu),
+        }
+        # One O_APPEND write per event, so concurrent processes never interleave lines
+        line = (json.dumps(event) + ",\n").encode()
+        fd = os.open(_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+        return False
+
+
+def stage(name, rows=None, **args):
+    """
+    Context manager timing one pipeline stage when profiling is on.
+
+    Extra keyword arguments are stored with the event; the yielded record
+    accepts more (record['rows'] = len(df)) once they are known.
+    """
+    if _path is None:
+        return _OFF
+    return _Stage(name, rows, args)
+
+
+def row_count(value):
+    return len(value) if hasattr(value, '__len__') and not isinstance(value, (str, bytes, dict)) else None
+
+
+def load_trace(path):
+    """Events of a trace file (closing bracket optional)."""
+    with open(path, encoding='utf-8') as f:
+        text = f.read().strip().rstrip(',')
+    if not text.endswith(']'):
+        text += ']'
+    return json.loads(text)
+
+
+def summarize(events):
+    """Per-stage totals: calls, wall and CPU seconds, largest peak memory and row count."""
+    import pandas as pd
+    frame = pd.DataFrame([dict(e['args'], name=e['name']) for e in events])
+    for column in ('rows', 'peak_mb'):
+        if column not in frame:
+            frame[column] = float('nan')
+    summary = frame.groupby('name', sort=False).agg(
+        calls=('wall_s', 'size'), wall_s=('wall_s', 'sum'), cpu_s=('cpu_s', 'sum'),
+        peak_mb=('peak_mb', 'max'), rows=('rows', 'max'),
+    )
+    return summary.sort_values('wall_s', ascending=False)
+
+
+if os.environ.get(PROFILE_ENV):
+    enable(os.environ[PROFILE_ENV])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize a pipeline profile trace.")
+    parser.add_argument('path', nargs='?', default=os.environ.get(PROFILE_ENV, 'trace.json'))
+    args = parser.parse_args()
+    events = load_trace(args.path)
+    print(f"{args.path}: {len(events)} events from {len({e['pid'] for e in events})} processes")
+    print(summarize(events).to_string(float_format='%.3f'))
@@ -0,0 +1,433 @@
+"""
+Local query service for dashboards: the analytics behind one long-running process.
+
+Dashboards used to spawn a script per request and scrape its printed output.
+The service loads the dataset once (memory-mapped from the column store) and
+answers JSON queries over HTTP or a Unix socket:
+
+    GET /phase_metrics?ticker=^GSPC&start=1990-01-01&end=2020-12-31
+    GET /rolling_alpha?window=1260&points=500
+    GET /bootstrap?n_sims=10000&method=stationary&block_length=20&seed=42
+    GET /regression?start=2000-01-01&hac_lags=5
+    GET /stats                              # latency and cache hit-rate statistics
+
+Parameters are normalized against each query's defaults (types, dates), so
+equivalent requests share a key in a bounded LRU cache of results. When
+fetch_data rewrites institutional_data.pkl the dataset is reloaded and the
+cache cleared on the next request. ^GSPC is the dataset itself; other tickers
+are loaded once through data_providers and paired with the dataset's
+Fama-French factors and risk-free rate.
+
+    python query_service.py serve --port 8766 [--socket /tmp/cycle.sock]
+    python query_service.py get phase_metrics start=1990-01-01
+    python query_service.py bench    # cold vs cached latency vs one process per request
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+from collections import OrderedDict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from results_artifact import to_jsonable
+
+DATA_FILE = "institutional_data.pkl"
+DEFAULT_PORT = 8766
+DEFAULT_TICKER = '^GSPC'
+CACHE_ENTRIES = 256
+MAX_SIMS = 1_000_000
+FACTORS = ['Mkt_RF', 'SMB', 'HML']
+# Regression terms: constant, factors and the Year 3 dummy
+N_TERMS = len(FACTORS) + 2
+
+# Query name -> parameter defaults; a parameter's type is its default's (None: ISO date)
+QUERIES = {
+    'phase_metrics': {'ticker': DEFAULT_TICKER, 'start': None, 'end': None},
+    'rolling_alpha': {'ticker': DEFAULT_TICKER, 'start': None, 'end': None, 'window': 1260, 'hac_lags': 1,
+                      'points': 500},
+    'bootstrap': {'ticker': DEFAULT_TICKER, 'start': None, 'end': None, 'n_sims': 10000, 'method': 'iid',
+                  'block_length': 20, 'seed': 42},
+    'regression': {'ticker': DEFAULT_TICKER, 'start': None, 'end': None, 'hac_lags': 1},
+}
+# Parameter -> (minimum, maximum or None)
+LIMITS = {'n_sims': (1, MAX_SIMS), 'window': (N_TERMS + 1, None), 'hac_lags': (0, None), 'points': (3, None),
+          'block_length': (1, None)}
+
+
+class LRUCache:
+    """Thread-safe mapping holding at most max_entries; the least recently used entry is evicted."""
+
+    def __init__(self, max_entries=CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        """(True, value) on a hit, (False, None) on a miss."""
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return True, self.entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {'entries': len(self.entries), 'max_entries': self.max_entries, 'hits': self.hits,
+                    'misses': self.misses, 'evictions': self.evictions,
+                    'hit_rate': self.hits / lookups if lookups else None}
+
+
+def normalize_params(name, params):
+    """Query parameters with defaults filled in and values coerced; raises ValueError on bad input."""
+    if name not in QUERIES:
+        raise KeyError(name)
+    defaults = QUERIES[name]
+    unknown = set(params) - set(defaults)
+    if unknown:
+        raise ValueError(f"Unknown parameters for {name}: {', '.join(sorted(unknown))}")
+    out = {}
+    for key, default in defaults.items():
+        value = params.get(key, default)
+        if value is None or value == '':
+            out[key] = None
+        elif default is None:
+            out[key] = pd.Timestamp(value).date().isoformat()
+        else:
+            out[key] = type(default)(value)
+    for key, (low, high) in LIMITS.items():
+        value = out.get(key)
+        if value is None:
+            continue
+        if high is not None and not low <= value <= high:
+            raise ValueError(f"{key} must be between {low:,} and {high:,}")
+        if value < low:
+            raise ValueError(f"{key} must be at least {low:,}")
+    return out
+
+
+class QueryService:
+    """Dataset, result cache and statistics shared by the request threads."""
+
+    def __init__(self, data_file=DATA_FILE, cache_entries=CACHE_ENTRIES, provider=None):
+        self.data_file = data_file
+        self.cache = LRUCache(cache_entries)
+        self.tickers = LRUCache(32)
+        self.provider = provider
+        self.started = time.time()
+        self.lock = threading.Lock()
+        # bootstrap's in-process path keeps the resampled arrays in module globals
+        self.bootstrap_lock = threading.Lock()
+        self.latency = {}
+        self.stamp = None
+        self.data = None
+        self.reloads = 0
+
+    def warm_up(self):
+        """Load the dataset and import the analytics modules, so first queries pay only for computing."""
+        import batch_regression, bootstrap, charts, rolling_regression, streaming, year_index  # noqa: F401
+        return self.dataset()
+
+    # --- Data ---
+
+    def _current(self):
+        # (stamp, dataset), reloading and clearing the caches when the pickle changed
+        from column_store import load_dataset
+        stat = os.stat(self.data_file)
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        with self.lock:
+            if stamp != self.stamp:
+                self.data = load_dataset(self.data_file)
+                self.stamp = stamp
+                self.reloads += 1
+                self.cache.clear()
+                self.tickers.clear()
+            return self.stamp, self.data
+
+    def dataset(self):
+        """The memory-mapped dataset, reloaded (and the caches cleared) when the pickle changes."""
+        return self._current()[1]
+
+    def frame(self, ticker, start=None, end=None):
+        """Daily SP500_Ret-style frame (return, RF, factors, Cycle_Year) for a ticker and date range."""
+        df = self.dataset()
+        if ticker != DEFAULT_TICKER:
+            hit, returns = self.tickers.get(ticker)
+            if not hit:
+                from data_providers import get_provider, price_series
+                provider = self.provider or get_provider('yfinance')
+                prices = price_series(provider.fetch(ticker, start=str(df.index[0].date())))
+                returns = prices.pct_change(fill_method=None).dropna()
+                self.tickers.put(ticker, returns)
+            df = df.drop(columns='SP500_Ret').join(returns.rename('SP500_Ret'), how='inner')
+        df = df.loc[start:end]
+        if df.empty:
+            raise ValueError(f"No data for {ticker} between {start or 'the first day'} and {end or 'the last day'}")
+        return df
+
+    # --- Queries ---
+
+    def phase_metrics(self, ticker, start, end):
+        from year_index import build_year_index, compare_phases, phase_metrics
+        df = self.frame(ticker, start, end)
+        index = build_year_index(df, series=['SP500_Ret', 'Excess_Ret'])
+        return {'rows': len(df), 'start': df.index[0], 'end': df.index[-1],
+                'phases': phase_metrics(index, 'SP500_Ret'), 'ttest': compare_phases(index)}
+
+    def _regression_data(self, ticker, start, end):
+        from streaming import cycle_design
+        df = self.frame(ticker, start, end)
+        X = pd.DataFrame(cycle_design(df, FACTORS), index=df.index, columns=['const'] + FACTORS + ['Is_Year3'])
+        return df, X, df['SP500_Ret'] - df['RF']
+
+    def rolling_alpha(self, ticker, start, end, window, hac_lags, points):
+        from charts import downsample
+        from rolling_regression import rolling_ols
+        df, X, y = self._regression_data(ticker, start, end)
+        result = rolling_ols(y, X, [window], hac_lags=hac_lags)[window]
+        gamma = result.params['Is_Year3'].dropna()
+        t_hac = result.tvalues_hac['Is_Year3'].dropna()
+        shown = downsample(gamma, points)
+        return {'rows': len(df), 'window': window,
+                'latest': {'date': gamma.index[-1], 'gamma': gamma.iloc[-1], 't_hac': t_hac.iloc[-1]} if len(gamma) else None,
+                'share_positive': (gamma > 0).mean() if len(gamma) else None,
+                'series': [[date, value] for date, value in zip(shown.index, shown.to_numpy())]}
+
+    def bootstrap(self, ticker, start, end, n_sims, method, block_length, seed):
+        from bootstrap import bootstrap_pvalue, parallel_sharpe_diff_bootstrap, sharpe_diff_bootstrap
+        from results_artifact import distribution_summary
+        df = self.frame(ticker, start, end)
+        excess = df['SP500_Ret'] - df['RF']
+        year3 = df['Cycle_Year'] == 3
+        with self.bootstrap_lock:
+            if method == 'iid':
+                diffs = sharpe_diff_bootstrap(excess[year3], excess[~year3], n_sims=n_sims, seed=seed)
+            else:
+                diffs = parallel_sharpe_diff_bootstrap(excess[year3], excess[~year3], n_sims=n_sims, seed=seed,
+                                                       method=method, block_length=block_length, n_workers=1)
+        return {'rows': len(df), 'p_value': bootstrap_pvalue(diffs), 'distribution': distribution_summary(diffs)}
+
+    def regression(self, ticker, start, end, hac_lags):
+        from batch_regression import batch_ols
+        df, X, y = self._regression_data(ticker, start, end)
+        fit = batch_ols(y.rename(ticker), {'FF3+year3': X}, hac_lags=(hac_lags,))
+        return {'rows': len(df), 'coefficients': fit.drop(columns=['spec', 'response', 'hac_lags'])}
+
+    def query(self, name, params):
+        """(normalized params, JSON-ready result, cache hit) for one query."""
+        params = normalize_params(name, params)
+        stamp = self._current()[0]  # picks up a rewritten pickle before the cache lookup
+        key = (name, stamp) + tuple(sorted(params.items()))
+        hit, result = self.cache.get(key)
+        if not hit:
+            result = to_jsonable(getattr(self, name)(**params))
+            # A reload while computing cleared the cache; don't put a result from the old data back
+            with self.lock:
+                if self.stamp == stamp:
+                    self.cache.put(key, result)
+        return params, result, hit
+
+    # --- Statistics ---
+
+    def record(self, name, elapsed_ms, hit):
+        with self.lock:
+            entry = self.latency.setdefault(name, {'requests': 0, 'hits': 0, 'recent': deque(maxlen=1000)})
+            entry['requests'] += 1
+            entry['hits'] += bool(hit)
+            entry['recent'].append(elapsed_ms)
+
+    def stats(self):
+        with self.lock:
+            endpoints = {}
+            for name, entry in self.latency.items():
+                recent = np.array(entry['recent'])
+                endpoints[name] = {
+                    'requests': entry['requests'], 'hit_rate': entry['hits'] / entry['requests'],
+                    'p50_ms': float(np.percentile(recent, 50)), 'p95_ms': float(np.percentile(recent, 95)),
+                    'max_ms': float(recent.max()),
+                }
+            return {'uptime_s': time.time() - self.started, 'dataset_rows': len(self.data) if self.data is not None else None,
+                    'reloads': self.reloads, 'cache': self.cache.stats(), 'endpoints': endpoints}
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    service = None  # set by make_server
+    verbose = False
+
+    def do_GET(self):
+        started = time.perf_counter()
+        url = urllib.parse.urlparse(self.path)
+        name = url.path.strip('/')
+        params = {key: values[-1] for key, values in urllib.parse.parse_qs(url.query).items()}
+        try:
+            if name == 'stats':
+                self._reply(200, self.service.stats())
+                return
+            if name == 'health':
+                self._reply(200, {'status': 'ok'})
+                return
+            if name not in QUERIES:
+                self._reply(404, {'error': f"Unknown query {name!r}", 'queries': sorted(QUERIES)})
+                return
+            params, result, hit = self.service.query(name, params)
+        except ValueError as exc:
+            self._reply(400, {'error': str(exc)})
+            return
+        except Exception as exc:
+            self._reply(500, {'error': f"{type(exc).__name__}: {exc}"})
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.service.record(name, elapsed_ms, hit)
+        self._reply(200, {'query': name, 'params': params, 'cached': hit, 'elapsed_ms': elapsed_ms,
+                          'result': result})
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self):
+        # Unix socket peers have no (host, port)
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        if self.verbose:
+            super().log_message(format, *args)
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(service, host='127.0.0.1', port=DEFAULT_PORT, socket_path=None, verbose=False):
+    """HTTP server over TCP (port=0 picks a free port) or, with socket_path, a Unix socket."""
+    handler = type('BoundQueryHandler', (QueryHandler,), {'service': service, 'verbose': verbose})
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        return UnixHTTPServer(socket_path, handler)
+    return ThreadingHTTPServer((host, port), handler)
+
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout=60):
+        super().__init__('localhost', timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+def query(name, url=f"http://127.0.0.1:{DEFAULT_PORT}", socket_path=None, timeout=60, **params):
+    """Client side: run one query against a running service and return the decoded reply."""
+    target = f"/{name}?{urllib.parse.urlencode(params)}"
+    if socket_path:
+        conn = _UnixConnection(socket_path, timeout)
+        try:
+            conn.request('GET', target)
+            return json.loads(conn.getresponse().read())
+        finally:
+            conn.close()
+    with urllib.request.urlopen(url.rstrip('/') + target, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def bench(repeat=20):
+    """Latency of the first and repeated queries vs spawning a Python process for one query."""
+    service = QueryService()
+    service.warm_up()
+    server = make_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    cases = [('phase_metrics', {'start': '1990-01-01'}), ('rolling_alpha', {'window': 1260}),
+             ('bootstrap', {'n_sims': 10000}), ('regression', {'hac_lags': 5})]
+    for name, params in cases:
+        start = time.perf_counter()
+        query(name, url, **params)
+        cold = (time.perf_counter() - start) * 1000
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            query(name, url, **params)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"{name:<14} uncached {cold:8.1f} ms, cached median {np.median(timings):6.2f} ms")
+
+    code = "from query_service import QueryService; QueryService().query('phase_metrics', {'start': '1990-01-01'})"
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', code], check=True)
+    print(f"one process per request: {(time.perf_counter() - start) * 1000:8.1f} ms (phase_metrics)")
+    print(json.dumps(query('stats', url)['cache']))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local JSON query service for cycle analytics.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    serve = sub.add_parser('serve', help="Run the service")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve.add_argument('--socket', help="Listen on this Unix socket instead of TCP")
+    serve.add_argument('--cache-entries', type=int, default=CACHE_ENTRIES)
+    serve.add_argument('--data-file', default=DATA_FILE)
+    serve.add_argument('--verbose', action='store_true', help="Log every request")
+
+    get = sub.add_parser('get', help="Query a running service")
+    get.add_argument('name', help=f"One of {', '.join(sorted(QUERIES))}, stats or health")
+    get.add_argument('params', nargs='*', help="key=value pairs")
+    get.add_argument('--url', default=f"http://127.0.0.1:{DEFAULT_PORT}")
+    get.add_argument('--socket')
+
+    sub.add_parser('bench', help="Cold vs cached latency on a temporary server")
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        service = QueryService(args.data_file, args.cache_entries)
+        service.warm_up()
+        server = make_server(service, args.host, args.port, args.socket, args.verbose)
+        where = args.socket or f"http://{args.host}:{server.server_address[1]}"
+        print(f"Serving {len(service.data):,} rows from {args.data_file} on {where}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            if args.socket and os.path.exists(args.socket):
+                os.remove(args.socket)
+    elif args.command == 'get':
+        params = dict(pair.split('=', 1) for pair in args.params)
+        print(json.dumps(query(args.name, args.url, args.socket, **params), indent=1))
+    else:
+        bench()
@@ -0,0 +1,147 @@
+"""
+Bootstrap confidence intervals for a single regression coefficient.
+
+The design is factorized once. With h = row j of (X'X)^-1 X' and residuals e:
+
+    wild          gamma* = gamma + V @ (h * e)          V: Rademacher/Mammen weights per day
+    wild-cluster  gamma* = gamma + V @ sum_g(h * e)     V: one weight per cluster (e.g. calendar year)
+    pairs         gamma* = [(W @ xx)^-1 (W @ xy)]_j     W: resample counts per day
+
+so a wild replicate is one dot product over days (or clusters) and a pairs
+replicate is two matrix products against the precomputed per-day outer
+products, never a refit. Replicates are drawn in chunks sized to a memory cap.
+Percentile and BCa intervals are returned; BCa uses the exact leave-one-out
+(or leave-one-cluster-out) jackknife for the acceleration.
+"""
+import numpy as np
+from scipy import stats
+
+SQRT5 = np.sqrt(5.0)
+
+
+def _wild_products(rng, size, scores, kind):
+    # V @ scores for a (size x len(scores)) matrix of wild weights V
+    width = len(scores)
+    if kind == 'rademacher':
+        # Random bits b give weights 2b - 1, so V @ s = 2 (b @ s) - sum(s)
+        packed = rng.integers(0, 256, size=(size, (width + 7) // 8), dtype=np.uint8)
+        bits = np.unpackbits(packed, axis=1, count=width).astype(np.float64)
+        return 2.0 * (bits @ scores) - scores.sum()
+    if kind == 'mammen':
+        # Two-point distribution with mean 0, variance 1, third moment 1
+        low, high = -(SQRT5 - 1) / 2, (SQRT5 + 1) / 2
+        return np.where(rng.random((size, width)) < (SQRT5 + 1) / (2 * SQRT5), low, high) @ scores
+    raise ValueError(f"Unknown wild weights: {kind}")
+
+
+def _jackknife(X, y, j, cluster_codes=None):
+    # Exact leave-one-out (or leave-one-cluster-out) estimates of coefficient j
+    xx = X.T @ X
+    xy = X.T @ y
+    if cluster_codes is None:
+        xx_inv = np.linalg.inv(xx)
+        coef = xx_inv @ xy
+        resid = y - X @ coef
+        leverage = np.einsum('ij,jk,ik->i', X, xx_inv, X)
+        h = X @ xx_inv[j]
+        return coef[j] - h * resid / (1 - leverage)
+
+    n_groups = cluster_codes.max() + 1
+    k = X.shape[1]
+    xx_g = np.zeros((n_groups, k, k))
+    xy_g = np.zeros((n_groups, k))
+    np.add.at(xx_g, cluster_codes, X[:, :, None] * X[:, None, :])
+    np.add.at(xy_g, cluster_codes, X * y[:, None])
+    return np.linalg.solve(xx - xx_g, (xy - xy_g)[:, :, None])[:, j, 0]
+
+
+def bca_interval(replicates, estimate, jackknife, alpha=0.05):
+    """Bias-corrected and accelerated interval from bootstrap replicates and jackknife values."""
+    replicates = np.asarray(replicates)
+    below = (replicates < estimate).mean() + 0.5 * (replicates == estimate).mean()
+    z0 = stats.norm.ppf(below)
+
+    diff = jackknife.mean() - jackknife
+    accel = (diff ** 3).sum() / (6.0 * ((diff ** 2).sum()) ** 1.5)
+
+    z = stats.norm.ppf([alpha / 2, 1 - alpha / 2])
+    adjusted = stats.norm.cdf(z0 + (z0 + z) / (1 - accel * (z0 + z)))
+    return tuple(float(v) for v in np.quantile(replicates, adjusted)), z0, accel
+
+
+def coefficient_bootstrap(y, X, term='Is_Year3', method='wild', weights='rademacher',
+                          clusters=None, n_boot=100000, seed=None, alpha=0.05,
+                          max_chunk_mb=64):
+    """
+    Bootstrap distribution and intervals for one coefficient of an OLS fit.
+
+    method: 'wild', 'wild-cluster' (needs clusters, e.g. df['Year']) or 'pairs'.
+    weights: 'rademacher' or 'mammen' for the wild methods.
+    Returns a dict with the estimate, bootstrap standard error, percentile and
+    BCa intervals, the BCa constants and the array of replicates.
+    """
+    columns = list(X.columns)
+    j = columns.index(term)
+    Xv = np.asarray(X, dtype=np.float64)
+    yv = np.asarray(y, dtype=np.float64)
+    n, k = Xv.shape
+
+    # One factorization, reused by every replicate
+    q, r = np.linalg.qr(Xv)
+    coef = np.linalg.solve(r, q.T @ yv)
+    r_inv = np.linalg.inv(r)
+    h = Xv @ (r_inv @ r_inv.T)[j]
+    resid = yv - Xv @ coef
+    estimate = coef[j]
+
+    cluster_codes = None
+    if method == 'wild-cluster':
+        if clusters is None:
+            raise ValueError("wild-cluster bootstrap needs clusters")
+        _, cluster_codes = np.unique(np.asarray(clusters), return_inverse=True)
+        scores = np.bincount(cluster_codes, weights=h * resid)
+    elif method == 'wild':
+        scores = h * resid
+    elif method == 'pairs':
+        xx_rows = (Xv[:, :, None] * Xv[:, None, :]).reshape(n, k * k)
+        xy_rows = Xv * yv[:, None]
+    else:
+        raise ValueError(f"Unknown bootstrap method: {method}")
+
+    # Weight/count matrices plus temporaries: ~2-3 float64 arrays of chunk x width
+    width = len(scores) if method != 'pairs' else n
+    row_bytes = 8 * width * (3 if method == 'pairs' else 2)
+    chunk = max(1, int(max_chunk_mb * 2 ** 20 // row_bytes))
+    rng = np.random.default_rng(seed)
+    replicates = np.empty(n_boot)
+    for start in range(0, n_boot, chunk):
+        size = min(chunk, n_boot - start)
+        if method == 'pairs':
+            idx = rng.integers(0, n, size=(size, n))
+            counts = np.bincount((idx + n * np.arange(size)[:, None]).ravel(),
+                                 minlength=size * n).reshape(size, n).astype(np.float64)
+            xx = (counts @ xx_rows).reshape(size, k, k)
+            xy = counts @ xy_rows
+            # Degenerate resamples (e.g. no Year 3 days) give a singular X'X
+            ok = np.linalg.matrix_rank(xx) == k
+            block = np.full(size, np.nan)
+            block[ok] = np.linalg.solve(xx[ok], xy[ok][:, :, None])[:, j, 0]
+            replicates[start:start + size] = block
+        else:
+            replicates[start:start + size] = estimate + _wild_products(rng, size, scores, weights)
+
+    valid = replicates[~np.isnan(replicates)]
+    jackknife = _jackknife(Xv, yv, j, cluster_codes)
+    bca, z0, accel = bca_interval(valid, estimate, jackknife, alpha)
+    return {
+        'term': term,
+        'method': method,
+        'estimate': estimate,
+        'std_err': valid.std(ddof=1),
+        'ci_percentile': tuple(float(v) for v in np.quantile(valid, [alpha / 2, 1 - alpha / 2])),
+        'ci_bca': bca,
+        'z0': z0,
+        'acceleration': accel,
+        'n_valid': len(valid),
+        'replicates': replicates,
+    }
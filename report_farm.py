@@ -0,0 +1,259 @@
+"""
+Batch institutional reports: one PDF per ticker, built in a process pool.
+
+The parent loads the price panel once and does the cross-sectional work in
+vectorized form: the annual phase table and annual drawdowns for every
+ticker, and one batched FF3 + Year 3 regression over all return columns.
+Each job then receives its ticker's daily returns and precomputed
+statistics; the workers compute the rolling alpha, daily drawdowns and the
+Sharpe bootstrap, render both charts from charts.py's templates (Agg canvas,
+downsampled) and assemble the PDF from generate_institutional_pdf's template,
+with chart templates and report styles built once per worker in the pool
+initializer. The template's findings, captions and recommendation are
+derived from each ticker's own statistics. Workers memory-map the daily factors from the column store
+(column_store.py), so they share one page-cache copy instead of each
+receiving a pickled frame.
+
+Every job writes <out_dir>/<ticker>/ (PDF, charts, results.json), and
+<out_dir>/manifest.json records per-report timings, worker pids and failures.
+
+    python report_farm.py SPY QQQ IWM --workers 8
+    python report_farm.py --file coverage.txt --out-dir reports
+"""
+import argparse
+import datetime
+import json
+import os
+import re
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from batch_regression import batch_ols
+from column_store import load_dataset
+from drawdown import max_drawdown
+from universe_analysis import annual_returns, cycle_phase_table, load_price_panel
+
+DATA_FILE = "institutional_data.pkl"
+FACTORS = ['Mkt_RF', 'SMB', 'HML']
+DEFAULT_OUT_DIR = "reports"
+ROLLING_WINDOW = 1260
+BOOT_SIMS = 1000
+
+# Per-worker state set by _init_worker: memory-mapped factor frame, report styles, bootstrap settings
+_WORKER = {}
+
+
+def _init_worker(data_file, n_boot, seed):
+    from charts import TEMPLATES, get_chart
+    from generate_institutional_pdf import build_styles
+    for name in TEMPLATES:
+        get_chart(name)
+    # Workers map the column store instead of each unpickling a private copy of the factors
+    _WORKER.update(factors=load_factors(data_file), n_boot=n_boot, seed=seed, styles=build_styles())
+
+
+def load_factors(path=DATA_FILE):
+    """Daily Fama-French factors and the risk-free rate from the institutional dataset (memory-mapped)."""
+    return load_dataset(path, columns=FACTORS + ['RF'])
+
+
+def _design(factors):
+    X = factors[FACTORS].astype(float)
+    X.insert(0, 'const', 1.0)
+    X['Is_Year3'] = (factors.index.year % 4 == 3).astype(float)
+    return X
+
+
+def _slug(ticker):
+    return re.sub(r'[^A-Za-z0-9._-]', '_', ticker)
+
+
+def prepare_jobs(prices, factors):
+    """Per-ticker job payloads with everything that is cheaper to compute for all tickers at once."""
+    daily = prices.pct_change(fill_method=None).reindex(factors.index)
+    excess = daily.sub(factors['RF'], axis=0)
+
+    # Annual cycle statistics for the whole panel in one grouped pass
+    annual = annual_returns(prices)
+    table = cycle_phase_table(annual)
+    is_year3 = (annual.index.year % 4 == 3)[:, None]
+    held = annual.notna().to_numpy()
+    bh_curves = np.cumprod(1 + annual.fillna(0.0).to_numpy(), axis=0)
+    y3_curves = np.cumprod(1 + np.where(is_year3, annual.fillna(0.0).to_numpy(), 0.0), axis=0)
+    bh_dd = max_drawdown(bh_curves.T) * 100
+    y3_dd = max_drawdown(y3_curves.T) * 100
+
+    # One factorization per missing-data pattern covers every ticker
+    fits = batch_ols(excess, {'FF3+year3': _design(factors)}, hac_lags=(1,))
+
+    jobs = []
+    for i, ticker in enumerate(prices.columns):
+        rows = table[table['Ticker'] == ticker]
+        reg = fits[fits['response'] == ticker].set_index('term')
+        if rows.empty or reg.empty:
+            continue
+        years = annual.index.year[held[:, i]]
+        phases = rows[rows['Cycle'] > 0]
+        year3 = rows[rows['Cycle'] == 3].iloc[0]
+        jobs.append({
+            'ticker': ticker,
+            'returns': daily[ticker].dropna(),
+            'excess': excess[ticker].dropna(),
+            'annual': {
+                'source': ticker,
+                'start_year': int(years.min()),
+                'end_year': int(years.max()),
+                'phases': phases.drop(columns=['Ticker', 'Cycle']),
+                'metrics': rows[rows['Cycle'] == 0].drop(columns=['Ticker', 'Cycle']),
+                'ttest': {'t_stat': year3['T-Stat vs Rest'], 'p_value': year3['P-Value (1-tailed)']},
+                'strategy': {'buy_hold_max_dd': bh_dd[i], 'year3_max_dd': y3_dd[i]},
+            },
+            'regression': {
+                'params': reg['coef'], 'bse': reg['std_err'], 'tvalues': reg['t_stat'],
+                'pvalues': reg['p_value'], 'nobs': reg['nobs'].iloc[0],
+            },
+        })
+    return jobs
+
+
+def build_report(job, out_dir):
+    """Worker job: analysis, charts and PDF for one ticker. Returns its manifest entry."""
+    from bootstrap import bootstrap_pvalue, sharpe_diff_bootstrap
+    from drawdown import drawdown_stats
+    from generate_institutional_pdf import render_pdf
+    from institutional_analysis import equity_plot, rolling_plot, save_png
+    from results_artifact import to_jsonable
+    from rolling_regression import rolling_ols
+
+    ticker = job['ticker']
+    folder = os.path.join(out_dir, _slug(ticker))
+    entry = {'ticker': ticker, 'pid': os.getpid(), 'status': 'ok'}
+    start = time.perf_counter()
+    try:
+        os.makedirs(folder, exist_ok=True)
+        y = job['excess']
+        X = _design(_WORKER['factors'].loc[y.index])
+        is_year3 = X['Is_Year3'].to_numpy() == 1
+
+        # Rolling alpha and R-squared of the full-sample fit
+        gamma = rolling_ols(y, X, [ROLLING_WINDOW])[ROLLING_WINDOW].params['Is_Year3']
+        fitted = gamma.dropna()
+        coef = job['regression']['params'].reindex(X.columns).to_numpy()
+        resid = y.to_numpy() - X.to_numpy() @ coef
+        rsquared = 1 - (resid @ resid) / ((y - y.mean()) ** 2).sum()
+
+        # Daily drawdowns of Year 3 only (cash otherwise) vs buy & hold
+        ret = job['returns'].loc[y.index]
+        curves = pd.DataFrame({
+            'BuyHold_Curve': (1 + ret).cumprod(),
+            'Strategy_Curve': (1 + ret.where(is_year3, 0.0)).cumprod(),
+        })
+        dd_summary, dd_episodes = drawdown_stats(curves, top_n=3)
+
+        boot = None
+        if _WORKER['n_boot'] > 0 and is_year3.any() and (~is_year3).any():
+            diffs = sharpe_diff_bootstrap(y[is_year3], y[~is_year3], n_sims=_WORKER['n_boot'], seed=_WORKER['seed'])
+            boot = {'p_iid': bootstrap_pvalue(diffs), 'n_sims': _WORKER['n_boot']}
+        entry['analysis_s'] = time.perf_counter() - start
+
+        t0 = time.perf_counter()
+        charts = {'rolling_alpha': os.path.join(folder, 'rolling_alpha.png'),
+                  'equity_curve': os.path.join(folder, 'equity_curve.png')}
+        save_png(rolling_plot(gamma), charts['rolling_alpha'])
+        save_png(equity_plot(curves), charts['equity_curve'])
+        entry['charts_s'] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        institutional = {
+            'asset': ticker,
+            'data': {'start': y.index[0], 'end': y.index[-1], 'rows': len(y)},
+            'regression': dict(job['regression'], rsquared=rsquared),
+            'rolling': {str(ROLLING_WINDOW): {'gamma': fitted.iloc[-1], 'share_positive': (fitted > 0).mean()}}
+                       if len(fitted) else {},
+            'drawdown': {'summary': dd_summary, 'episodes': dd_episodes},
+            'charts': charts,
+            'updated_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        }
+        if boot:
+            institutional['sharpe_bootstrap'] = boot
+        results = to_jsonable({'annual': job['annual'], 'institutional': institutional})
+        with open(os.path.join(folder, 'results.json'), 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+        entry['pdf'] = os.path.join(folder, f"{_slug(ticker)}_institutional.pdf")
+        render_pdf(entry['pdf'], results, _WORKER['styles'])
+        entry['pdf_s'] = time.perf_counter() - t0
+    except Exception as exc:
+        entry.update(status='error', error=f"{type(exc).__name__}: {exc}", traceback=traceback.format_exc())
+    entry['total_s'] = time.perf_counter() - start
+    return entry
+
+
+def run_farm(tickers, out_dir=DEFAULT_OUT_DIR, workers=None, start="1950-01-01", n_boot=BOOT_SIMS,
+             seed=42, provider=None, data_file=DATA_FILE):
+    """Build one institutional PDF per ticker and write <out_dir>/manifest.json."""
+    started = time.perf_counter()
+    created = datetime.datetime.now().isoformat(timespec='seconds')
+    workers = workers or os.cpu_count()
+
+    print(f"Loading price panel for {len(tickers)} tickers...")
+    prices = load_price_panel(tickers, start=start, provider=provider)
+    factors = load_factors(data_file)
+    jobs = prepare_jobs(prices, factors)
+    prepared = time.perf_counter() - started
+    skipped = [t for t in tickers if t not in {job['ticker'] for job in jobs}]
+    print(f"Prepared {len(jobs)} jobs in {prepared:.2f}s ({len(skipped)} tickers without data)")
+
+    os.makedirs(out_dir, exist_ok=True)
+    reports = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(data_file, n_boot, seed)) as pool:
+        futures = [pool.submit(build_report, job, out_dir) for job in jobs]
+        for done, future in enumerate(as_completed(futures), 1):
+            entry = future.result()
+            reports.append(entry)
+            status = f"{entry['total_s']:.2f}s" if entry['status'] == 'ok' else entry['error']
+            print(f"[{done}/{len(jobs)}] {entry['ticker']}: {status}")
+
+    reports.sort(key=lambda entry: entry['ticker'])
+    manifest = {
+        'created': created,
+        'workers': workers,
+        'tickers': len(tickers),
+        'built': sum(entry['status'] == 'ok' for entry in reports),
+        'failed': [entry['ticker'] for entry in reports if entry['status'] != 'ok'],
+        'skipped': skipped,
+        'prepare_s': prepared,
+        'wall_s': time.perf_counter() - started,
+        'reports': reports,
+    }
+    path = os.path.join(out_dir, 'manifest.json')
+    with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(f"{path}.tmp", path)
+    print(f"Built {manifest['built']}/{len(tickers)} reports in {manifest['wall_s']:.1f}s -> {path}")
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-ticker institutional PDF reports in a process pool.")
+    parser.add_argument('tickers', nargs='*', help="Tickers to report on")
+    parser.add_argument('--file', help="Text file with one ticker per line")
+    parser.add_argument('--start', default="1950-01-01")
+    parser.add_argument('--out-dir', default=DEFAULT_OUT_DIR)
+    parser.add_argument('--workers', type=int, default=None, help="Pool size (default: all cores)")
+    parser.add_argument('--boot', type=int, default=BOOT_SIMS, help="Sharpe bootstrap draws per report (0 to skip)")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    tickers = list(args.tickers)
+    if args.file:
+        with open(args.file, encoding='utf-8') as f:
+            tickers += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    if not tickers:
+        parser.error("No tickers given")
+    run_farm(tickers, out_dir=args.out_dir, workers=args.workers, start=args.start,
+             n_boot=args.boot, seed=args.seed)
@@ -0,0 +1,197 @@
+"""
+Versioned results file shared by the analysis scripts and the report builders.
+
+election_analysis.py and institutional_analysis.py each write one section of
+results.json (metrics tables, test statistics, regression output, bootstrap
+distribution summaries, chart paths); the PDF generators, the notebook
+generator and the README tables render from it without importing statsmodels
+(or even pandas) or rerunning anything. Tables are stored as lists of row dicts.
+
+    python results_artifact.py show      # print sections and their timestamps
+    python results_artifact.py readme    # refresh the generated README blocks
+"""
+import argparse
+import datetime
+import json
+import os
+import re
+
+RESULTS_FILE = "results.json"
+SCHEMA_VERSION = 1
+
+
+def to_jsonable(value):
+    """Convert frames, arrays and numpy scalars to plain JSON types."""
+    import numpy as np
+    import pandas as pd
+    if isinstance(value, pd.DataFrame):
+        frame = value.reset_index() if not isinstance(value.index, pd.RangeIndex) else value
+        return [to_jsonable(row) for row in frame.to_dict(orient='records')]
+    if isinstance(value, pd.Series):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [to_jsonable(v) for v in value]
+    if isinstance(value, (pd.Timestamp, datetime.date)):
+        return value.isoformat()[:10]
+    if isinstance(value, np.bool_):
+        return bool(value)
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        return None if not np.isfinite(value) else float(value)
+    if value is pd.NaT or value is None:
+        return None
+    return value
+
+
+def distribution_summary(values, quantiles=(0.025, 0.05, 0.5, 0.95, 0.975)):
+    """Compact description of a bootstrap/permutation distribution."""
+    import numpy as np
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    return {
+        'n': len(values),
+        'mean': float(values.mean()),
+        'std': float(values.std(ddof=1)),
+        'quantiles': {f"{q:g}": float(v) for q, v in zip(quantiles, np.quantile(values, quantiles))},
+    }
+
+
+def load_results(path=RESULTS_FILE, require=()):
+    """Read the results file, checking its schema version and required sections."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} not found. Run election_analysis.py and institutional_analysis.py first.")
+    with open(path, encoding='utf-8') as f:
+        results = json.load(f)
+    if results.get('schema_version') != SCHEMA_VERSION:
+        raise ValueError(f"{path} has schema version {results.get('schema_version')}, expected {SCHEMA_VERSION}")
+    missing = [section for section in require if section not in results]
+    if missing:
+        raise KeyError(f"{path} is missing sections {missing}")
+    return results
+
+
+def update_results(section, payload, path=RESULTS_FILE):
+    """Replace one section of the results file (other sections are kept)."""
+    results = {'schema_version': SCHEMA_VERSION}
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            existing = json.load(f)
+        if existing.get('schema_version') == SCHEMA_VERSION:
+            results = existing
+
+    now = datetime.datetime.now().isoformat(timespec='seconds')
+    results[section] = dict(to_jsonable(payload), updated_at=now)
+    results['generated_at'] = now
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+    return results
+
+
+def row(table, name, key='Name'):
+    """The row of a stored table whose `key` column equals name."""
+    for entry in table:
+        if entry.get(key) == name:
+            return entry
+    raise KeyError(f"No row {name!r} in table")
+
+
+def report_date(section):
+    """'Month D, YYYY' of a section's updated_at stamp, for report headers."""
+    stamp = datetime.datetime.fromisoformat(section['updated_at'])
+    return f"{stamp:%B} {stamp.day}, {stamp.year}"
+
+
+def phase_rank(phases, name, key='Mean (%)'):
+    """1-based rank of phase `name` by `key` (highest first) and the top-ranked row."""
+    ranked = sorted(phases, key=lambda entry: entry[key], reverse=True)
+    return [entry['Name'] for entry in ranked].index(name) + 1, ranked[0]
+
+
+def significance(p_value):
+    if p_value < 0.01:
+        return "Highly Significant"
+    if p_value < 0.05:
+        return "Significant"
+    if p_value < 0.10:
+        return "Marginally Significant"
+    return "Not Significant"
+
+
+# README blocks between <!-- results:NAME --> and <!-- /results:NAME --> are generated
+
+def _annual_table(results):
+    annual = results['annual']
+    lines = ["| Cycle Phase | Mean Annual Return | Volatility ($\\sigma$) | Sharpe Ratio | Max Drawdown | Win Rate |",
+             "| :--- | :---: | :---: | :---: | :---: | :---: |"]
+    for name, label in [("Pre-Election (Year 3)", "**Year 3: Pre-Election** 🚀"),
+                        ("Post-Election (Year 1)", "Year 1: Post-Election"),
+                        ("Election Year (Year 4)", "Year 4: Election Year"),
+                        ("Midterm (Year 2)", "Year 2: Midterm")]:
+        m = row(annual['phases'], name)
+        cells = [f"{m['Mean (%)']:.2f}%", f"{m['Vol (%)']:.2f}%", f"{m['Sharpe']:.2f}",
+                 f"{m['Min (%)']:.2f}%", f"{m['Win Rate']:.0%}"]
+        if name == "Pre-Election (Year 3)":
+            cells = [f"**{c}**" for c in cells]
+        lines.append(f"| {label} | " + " | ".join(cells) + " |")
+    bh = row(annual['metrics'], "Buy & Hold (All)")
+    lines.append(f"| **Benchmark (Buy & Hold)** | {bh['Mean (%)']:.2f}% | {bh['Vol (%)']:.2f}% | {bh['Sharpe']:.2f} | "
+                 f"{annual['strategy']['buy_hold_max_dd']:.2f}% | {bh['Win Rate']:.0%} |")
+    return "\n".join(lines)
+
+
+def _institutional_table(results):
+    inst = results['institutional']
+    dd = {entry['Curve']: entry for entry in inst['drawdown']['summary']}
+    gamma = inst['regression']
+    return "\n".join([
+        "| Metric | Year 3 (Institutional) | Benchmark (Buy & Hold) |",
+        "| :--- | :---: | :---: |",
+        f"| **Max Drawdown** | **{dd['Strategy_Curve']['Max DD (%)']:.2f}%** | {dd['BuyHold_Curve']['Max DD (%)']:.2f}% |",
+        f"| **Bootstrap P-Value** | **{inst['sharpe_bootstrap']['p_iid']:.4f}** | — |",
+        f"| **Alpha T-Stat (HAC)** | **{gamma['tvalues']['Is_Year3']:.2f}** | — |",
+    ])
+
+
+def _ttest_block(results):
+    test = results['annual']['ttest']
+    return "\n".join([
+        "- **Hypothesis**: $Year 3 > Rest$",
+        f"- **T-Statistic**: `{test['t_stat']:.4f}`",
+        f"- **P-Value**: `{test['p_value']:.4f}` ({significance(test['p_value']).lower()})",
+    ])
+
+
+README_BLOCKS = {'annual': _annual_table, 'institutional': _institutional_table, 'ttest': _ttest_block}
+
+
+def render_readme(results, path='README.md'):
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+    for name, render in README_BLOCKS.items():
+        pattern = re.compile(rf"(<!-- results:{name} -->\n).*?(\n<!-- /results:{name} -->)", re.S)
+        text = pattern.sub(lambda m: m.group(1) + render(results) + m.group(2), text)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    print(f"Updated {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument('command', choices=['show', 'readme'])
+    parser.add_argument('--path', default=RESULTS_FILE)
+    args = parser.parse_args()
+
+    results = load_results(args.path)
+    if args.command == 'show':
+        print(f"{args.path} (schema v{results['schema_version']}, generated {results['generated_at']})")
+        for section, payload in results.items():
+            if isinstance(payload, dict):
+                print(f"  {section:<15} updated {payload['updated_at']}  keys: {', '.join(sorted(payload))}")
+    else:
+        render_readme(results)
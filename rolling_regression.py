@@ -0,0 +1,185 @@
+"""
+Rolling OLS for several window lengths in one pass over the data.
+
+Running sums of X'X, X'y and y'y are accumulated once as prefix sums; the
+normal equations for any window ending at row t are then the difference of
+two prefix rows (add the new day, drop the day that left the window). Every
+window length reuses the same sums, so a list of windows costs one pass plus
+a batched k x k solve per window end.
+
+Newey-West (Bartlett) errors need the residuals, which depend on each
+window's own coefficients. Writing the score as
+    x_t * e_t = y_t x_t - G(b) q_t,    q_t = unique products x_t,i x_t,j
+makes it linear in z_t = [y_t x_t, q_t], so the lag-l HAC term is
+H(b) (sum z_t z_{t-l}') H(b)' with H(b) = [I, -G(b)], and sum z_t z_{t-l}'
+is again a prefix-sum difference. Only the symmetrized lag sums enter the
+estimator, so they are stored as upper triangles and accumulated in blocks
+of rows: a ring buffer keeps the last max(windows) prefix rows, and each
+window's meat is projected to k x k as its ends are reached. The HAC
+working set is bounded by the longest window and the block size, not the
+length of the series.
+"""
+from collections import namedtuple
+from itertools import combinations_with_replacement
+
+import numpy as np
+import pandas as pd
+
+# Rows of HAC products accumulated per block
+BLOCK_ROWS = 1024
+
+RollingResult = namedtuple('RollingResult', ['window', 'params', 'bse', 'tvalues', 'bse_hac', 'tvalues_hac'])
+
+
+def bartlett_weights(lags):
+    """Newey-West kernel weights 1 - l/(lags+1) for l = 0..lags (as statsmodels)."""
+    return 1.0 - np.arange(lags + 1) / (lags + 1.0)
+
+
+def _prefix(values):
+    # prefix[t] = sum of values[:t]
+    out = np.zeros((len(values) + 1,) + values.shape[1:])
+    np.cumsum(values, axis=0, out=out[1:])
+    return out
+
+
+def _pair_products(x):
+    pairs = np.array(list(combinations_with_replacement(range(x.shape[1]), 2)))
+    return pairs, x[:, pairs[:, 0]] * x[:, pairs[:, 1]]
+
+
+def _score_map(b, pairs):
+    # H(b) = [I, -G(b)] with G[i, p] = b[partner of i in pair p]
+    m, k = b.shape
+    G = np.zeros((m, k, len(pairs)))
+    for p, (i, j) in enumerate(pairs):
+        G[:, i, p] += b[:, j]
+        if i != j:
+            G[:, j, p] += b[:, i]
+    eye = np.broadcast_to(np.eye(k), (m, k, k))
+    return np.concatenate([eye, -G], axis=2)
+
+
+def _hac_bse(x, yv, sxx, fits, hac_lags):
+    """
+    Newey-West standard errors at every fitted window end.
+
+    fits maps window -> (ends, b): exclusive end rows of the full-rank
+    windows and their coefficients; (X'X)^-1 is recomputed per block from
+    the X'X prefix sums sxx. Lag sums z_s z_{s-l}' + z_{s-l} z_s'
+    (z_s z_s' at lag 0) are symmetric, so only their upper triangles are
+    accumulated, one block of rows at a time.
+    """
+    n, k = x.shape
+    block = BLOCK_ROWS
+    pairs, _ = _pair_products(x[:1])
+    d = k + len(pairs)
+    iu, ju = np.triu_indices(d)
+    full = np.empty((d, d), dtype=np.intp)
+    full[iu, ju] = full[ju, iu] = np.arange(len(iu))
+    weights = bartlett_weights(hac_lags)
+
+    # Prefix row t (sum over rows s < t) lives at ring[t % size]; a block reads back at most max(windows) rows
+    size = max(fits) + block + 1
+    ring = np.zeros((size, hac_lags + 1, len(iu)))
+    carry = np.zeros((hac_lags + 1, len(iu)))
+    bse = {window: np.empty((len(ends), k)) for window, (ends, _) in fits.items()}
+
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        lo = max(start - hac_lags, 0)
+        z = np.concatenate([x[lo:stop] * yv[lo:stop, None], _pair_products(x[lo:stop])[1]], axis=1)
+        products = np.zeros((stop - start, hac_lags + 1, len(iu)))
+        for lag in range(hac_lags + 1):
+            first = max(start, lag)
+            if first >= stop:
+                continue
+            cur, prev = z[first - lo:stop - lo], z[first - lag - lo:stop - lag - lo]
+            products[first - start:, lag] = cur[:, iu] * prev[:, ju]
+            if lag:
+                products[first - start:, lag] += prev[:, iu] * cur[:, ju]
+        prefix = carry + np.cumsum(products, axis=0)
+        ring[np.arange(start + 1, stop + 1) % size] = prefix
+        carry = prefix[-1]
+
+        for window, (ends, b) in fits.items():
+            # Window ends in (start, stop] have all their prefix rows in the ring
+            sel = slice(*np.searchsorted(ends, [start + 1, stop + 1]))
+            e = ends[sel]
+            if not len(e):
+                continue
+            H = _score_map(b[sel], pairs)
+            S = np.zeros((len(e), k, k))
+            for lag in range(hac_lags + 1):
+                zz = ring[e % size, lag] - ring[(e - window + lag) % size, lag]
+                S += weights[lag] * (H @ zz[:, full] @ H.transpose(0, 2, 1))
+            xx_inv = np.linalg.inv(sxx[e] - sxx[e - window])
+            cov = xx_inv @ S @ xx_inv
+            bse[window][sel] = np.sqrt(np.diagonal(cov, axis1=1, axis2=2))
+    return bse
+
+
+def rolling_ols(y, X, windows, hac_lags=None):
+    """
+    Rolling OLS of y on X for every window length in `windows`.
+
+    Returns {window: RollingResult}; params/bse/tvalues are DataFrames indexed
+    like X with NaN until the first full window (as statsmodels RollingOLS).
+    Windows where X is rank deficient (e.g. a dummy that is constant over the
+    window) are NaN. With hac_lags set, bse_hac/tvalues_hac hold Newey-West
+    errors with Bartlett weights and no small-sample correction, matching
+    OLS.fit(cov_type='HAC', cov_kwds={'maxlags': hac_lags}) on each window.
+    """
+    x = np.asarray(X, dtype=np.float64)
+    yv = np.asarray(y, dtype=np.float64)
+    n, k = x.shape
+    index = getattr(X, 'index', None)
+    columns = getattr(X, 'columns', None)
+
+    sxx = _prefix(x[:, :, None] * x[:, None, :])
+    sxy = _prefix(x * yv[:, None])
+    syy = _prefix(yv * yv)
+
+    fits, results = {}, {}
+    for window in windows:
+        params = np.full((n, k), np.nan)
+        bse = np.full((n, k), np.nan)
+        bse_hac = np.full((n, k), np.nan) if hac_lags is not None else None
+
+        if window <= n:
+            ends = np.arange(window, n + 1)
+            xx = sxx[ends] - sxx[ends - window]
+            xy = sxy[ends] - sxy[ends - window]
+            yy = syy[ends] - syy[ends - window]
+
+            ok = np.linalg.matrix_rank(xx) == k
+            rows = ends[ok] - 1
+            xx_inv = np.linalg.inv(xx[ok])
+            b = np.einsum('mij,mj->mi', xx_inv, xy[ok])
+            ssr = yy[ok] - 2 * np.einsum('mi,mi->m', b, xy[ok]) + np.einsum('mi,mij,mj->m', b, xx[ok], b)
+            sigma2 = np.maximum(ssr, 0) / (window - k)
+
+            params[rows] = b
+            bse[rows] = np.sqrt(sigma2[:, None] * np.diagonal(xx_inv, axis1=1, axis2=2))
+
+            if hac_lags is not None and len(b):
+                fits[window] = (ends[ok], b)
+
+        results[window] = (params, bse, bse_hac)
+
+    # HAC errors for every window in one blocked pass over the rows
+    if fits:
+        for window, values in _hac_bse(x, yv, sxx, fits, hac_lags).items():
+            results[window][2][fits[window][0] - 1] = values
+
+    frame = lambda values: pd.DataFrame(values, index=index, columns=columns)
+    for window, (params, bse, bse_hac) in results.items():
+        results[window] = RollingResult(
+            window=window,
+            params=frame(params),
+            bse=frame(bse),
+            tvalues=frame(params / bse),
+            bse_hac=frame(bse_hac) if bse_hac is not None else None,
+            tvalues_hac=frame(params / bse_hac) if bse_hac is not None else None,
+        )
+    return results
@@ -0,0 +1,209 @@
+"""
+Content-addressed on-disk cache for analysis stages.
+
+A stage is a function plus its inputs and parameters. Its key is a sha1 over
+the stage name, the stage's code, the parameters and the content of every
+input (DataFrames/Series via pandas' row hashes, arrays via their bytes), so
+a stage reruns only when its code, parameters or the data it actually reads
+change. The code covers the function's source, the same-module helpers it
+calls and the repo modules it imports (bootstrap.py, charts.py, ...) with
+everything they import in turn, so editing a helper or a chart template
+invalidates the stages built on it. Outputs of earlier stages remember their key, so
+chaining stages does not rehash large intermediates.
+
+Entries are pickles under STAGE_CACHE_DIR (default .stage_cache, empty string
+disables caching). Hits refresh the file's mtime and after each store the
+least recently used entries are deleted until the directory fits in
+STAGE_CACHE_MB (default 512).
+"""
+import ast
+import hashlib
+import importlib.util
+import inspect
+import os
+import textwrap
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+from profiling import row_count, stage
+
+DEFAULT_CACHE_DIR = ".stage_cache"
+DEFAULT_MAX_MB = 512
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _update(digest, value):
+    if isinstance(value, pd.DataFrame):
+        digest.update(repr(('DataFrame', value.shape, list(value.columns), list(map(str, value.dtypes)))).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, pd.Series):
+        digest.update(repr(('Series', value.shape, value.name, str(value.dtype))).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, pd.Index):
+        digest.update(pd.util.hash_pandas_object(value).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(repr((value.dtype.str, value.shape)).encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        for key in sorted(value, key=repr):
+            digest.update(repr(key).encode())
+            _update(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}{len(value)}".encode())
+        for item in value:
+            _update(digest, item)
+    else:
+        digest.update(repr(value).encode())
+
+
+def fingerprint(*parts):
+    """sha1 hex digest of arbitrary nested inputs (frames, arrays, containers, scalars)."""
+    digest = hashlib.sha1()
+    for part in parts:
+        _update(digest, part)
+    return digest.hexdigest()
+
+
+def _source(func):
+    try:
+        return inspect.getsource(func)
+    except (OSError, TypeError):
+        return func.__qualname__
+
+
+def _imported_names(tree):
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names.add(node.module.split('.')[0])
+    return names
+
+
+def _local_module_file(name):
+    """Path of a top-level module that lives in this repo (None for stdlib/site-packages)."""
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError):
+        return None
+    origin = spec.origin if spec else None
+    if origin and origin.endswith('.py') and os.path.dirname(os.path.abspath(origin)) == REPO_DIR:
+        return origin
+    return None
+
+
+def _module_sources(names, sources):
+    # Repo modules in `names` and everything they import, transitively: {module: source}
+    for name in sorted(names):
+        path = _local_module_file(name)
+        if path is None or name in sources:
+            continue
+        with open(path, encoding='utf-8') as f:
+            sources[name] = f.read()
+        _module_sources(_imported_names(ast.parse(sources[name])), sources)
+    return sources
+
+
+def code_fingerprint(func):
+    """Source of func, the same-module functions it calls and the repo modules it imports."""
+    functions, modules, pending = {}, set(), [func]
+    while pending:
+        current = pending.pop()
+        if current.__qualname__ in functions:
+            continue
+        source = _source(current)
+        functions[current.__qualname__] = source
+        try:
+            modules |= _imported_names(ast.parse(textwrap.dedent(source)))
+        except SyntaxError:
+            pass
+        code_objects = [current.__code__]
+        while code_objects:
+            code = code_objects.pop()
+            code_objects.extend(c for c in code.co_consts if inspect.iscode(c))
+            for name in code.co_names:
+                value = current.__globals__.get(name)
+                if inspect.isfunction(value) and value.__module__ == func.__module__:
+                    pending.append(value)
+                elif inspect.ismodule(value):
+                    modules.add(value.__name__.split('.')[0])
+                elif callable(value) and getattr(value, '__module__', None):
+                    # Names imported at module level (from drawdown import drawdown_stats)
+                    modules.add(value.__module__.split('.')[0])
+    return fingerprint(functions, _module_sources(modules, {}))
+
+
+class StageCache:
+    """Runs named stages, reusing pickled outputs whose key is unchanged."""
+
+    def __init__(self, directory=None, max_mb=None, verbose=True):
+        self.directory = os.environ.get('STAGE_CACHE_DIR', DEFAULT_CACHE_DIR) if directory is None else directory
+        self.max_bytes = int(float(os.environ.get('STAGE_CACHE_MB', DEFAULT_MAX_MB) if max_mb is None else max_mb) * 2 ** 20)
+        self.verbose = verbose
+        self.hits, self.misses = 0, 0
+        # id(output) -> (output, key) for results produced in this run
+        self._keys = {}
+
+    def key_for(self, value):
+        known = self._keys.get(id(value))
+        if known is not None and known[0] is value:
+            return known[1]
+        return fingerprint(value)
+
+    def run(self, name, func, *inputs, **params):
+        """func(*inputs, **params), loaded from the cache when the same stage ran before."""
+        start = time.perf_counter()
+        with stage(name, rows=row_count(inputs[0]) if inputs else None) as record:
+            key = fingerprint(name, code_fingerprint(func), [self.key_for(value) for value in inputs], params)
+            path = os.path.join(self.directory, f"{name}-{key}.pkl") if self.directory else None
+
+            if path and os.path.exists(path):
+                with open(path, 'rb') as f:
+                    result = pickle.load(f)
+                os.utime(path)
+                self.hits += 1
+                status = "hit"
+            else:
+                result = func(*inputs, **params)
+                if path:
+                    self._store(path, result)
+                self.misses += 1
+                status = "miss"
+            record['cache'] = status
+
+        self._keys[id(result)] = (result, key)
+        if self.verbose:
+            print(f"[stage] {name:<16} {status:<4} {time.perf_counter() - start:7.3f}s")
+        return result
+
+    def _store(self, path, result):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.pkl'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    def clear(self):
+        if self.directory and os.path.isdir(self.directory):
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith('.pkl'):
+                    os.remove(entry.path)
@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+# The analysis modules are flat scripts at the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def synthetic_df():
+    """30 years of the institutional_data.pkl schema from benchmarks (offline, seeded)."""
+    from benchmarks import synthetic_dataset
+    return synthetic_dataset(30)
+
+
+@pytest.fixture(scope='session')
+def synthetic_data_file(synthetic_df, tmp_path_factory):
+    """synthetic_df pickled like institutional_data.pkl (its column store is built next to it on first load)."""
+    path = tmp_path_factory.mktemp('data') / 'institutional_data.pkl'
+    synthetic_df.to_pickle(path)
+    return str(path)
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest import phase_subset_masks, run_backtest
+
+
+@pytest.fixture(scope='module')
+def market(synthetic_df):
+    df = synthetic_df.iloc[-2000:]
+    return df['SP500_Ret'], df['RF'], df['Cycle_Year']
+
+
+def test_all_cash_at_rf_has_zero_sharpe(market):
+    returns, rf, _ = market
+    masks = np.zeros((len(returns), 1), dtype=bool)
+    table = run_backtest(returns, masks, ['Cash'], out_leg='rf', rf=rf)
+    assert table.loc['Cash', 'Sharpe'] == pytest.approx(0.0, abs=1e-9)
+    assert table.loc['Cash', 'Final'] == pytest.approx(np.prod(1 + rf.values))
+
+
+@pytest.mark.parametrize('out_leg', ['cash', 'rf'])
+def test_sharpe_matches_direct_excess_returns(market, out_leg):
+    returns, rf, cycle = market
+    masks, names = phase_subset_masks(cycle)
+    table = run_backtest(returns, masks, names, out_leg=out_leg, rf=rf, chunk_size=5)
+    out = rf.values if out_leg == 'rf' else np.zeros(len(returns))
+    for mask, name in zip(masks.T, names):
+        excess = pd.Series(np.where(mask, returns.values, out) - rf.values)
+        expected = excess.mean() / excess.std() * np.sqrt(252) if excess.std() > 0 else 0.0
+        assert table.loc[name, 'Sharpe'] == pytest.approx(expected, rel=1e-8, abs=1e-9)
+
+
+def test_rf_leg_requires_rf(market):
+    returns, _, cycle = market
+    masks, names = phase_subset_masks(cycle)
+    with pytest.raises(ValueError):
+        run_backtest(returns, masks, names, out_leg='rf')
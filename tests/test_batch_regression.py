@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+import statsmodels.api as sm
+
+from batch_regression import batch_ols, build_designs
+from benchmarks import synthetic_panel
+
+HAC_LAGS = (0, 1, 5)
+
+
+@pytest.fixture(scope='module')
+def panel(synthetic_df):
+    df = synthetic_df.iloc[-3000:]
+    Y = synthetic_panel(df, 3).sub(df['RF'], axis=0)
+    Y['SP500'] = df['SP500_Ret'] - df['RF']
+    # Its own missing-data pattern, so it gets a separate factorization
+    Y.iloc[:400, 1] = np.nan
+    Y.iloc[1000:1010, 1] = np.nan
+    return Y, build_designs(df, factor_sets=('FF3',), phase_modes=('year3', 'all'))
+
+
+def test_matches_statsmodels_hac(panel):
+    Y, designs = panel
+    grid = batch_ols(Y, designs, hac_lags=HAC_LAGS, chunk_columns=2)
+    assert len(grid) == sum(X.shape[1] for X in designs.values()) * Y.shape[1] * len(HAC_LAGS)
+    for spec, X in designs.items():
+        for response in Y.columns:
+            model = sm.OLS(Y[response], X, missing='drop')
+            for lags in HAC_LAGS:
+                fit = model.fit(cov_type='HAC', cov_kwds={'maxlags': lags})
+                got = grid[(grid['spec'] == spec) & (grid['response'] == response)
+                           & (grid['hac_lags'] == lags)].set_index('term').loc[X.columns]
+                assert (got['nobs'] == fit.nobs).all()
+                np.testing.assert_allclose(got['coef'], fit.params, rtol=1e-8, atol=1e-14)
+                np.testing.assert_allclose(got['std_err'], fit.bse, rtol=1e-8)
+                np.testing.assert_allclose(got['p_value'], fit.pvalues, rtol=1e-6, atol=1e-12)
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from bootstrap import bootstrap_pvalue, parallel_sharpe_diff_bootstrap, resample_indices, sharpe_diff_bootstrap
+
+
+def reference_loop(year3, other, n_sims, seed):
+    # The original run_analysis loop: Series.sample on Year 3, then on Other, per iteration
+    rng = np.random.RandomState(seed)
+    diffs = []
+    for _ in range(n_sims):
+        sample_y3 = year3.sample(n=len(year3), replace=True, random_state=rng)
+        sample_other = other.sample(n=len(other), replace=True, random_state=rng)
+        sharpe_y3 = (sample_y3.mean() / sample_y3.std()) * np.sqrt(252)
+        sharpe_other = (sample_other.mean() / sample_other.std()) * np.sqrt(252)
+        diffs.append(sharpe_y3 - sharpe_other)
+    return np.array(diffs)
+
+
+@pytest.fixture(scope='module')
+def groups(synthetic_df):
+    excess = (synthetic_df['SP500_Ret'] - synthetic_df['RF']).iloc[-3000:]
+    year3 = synthetic_df['Is_Year3'].iloc[-3000:] == 1
+    return excess[year3], excess[~year3]
+
+
+@pytest.mark.parametrize('chunk_size', [7, 256])
+def test_legacy_rng_matches_series_sample_loop(groups, chunk_size):
+    year3, other = groups
+    expected = reference_loop(year3, other, n_sims=50, seed=42)
+    got = sharpe_diff_bootstrap(year3, other, n_sims=50, seed=42, chunk_size=chunk_size, legacy_rng=True)
+    np.testing.assert_allclose(got, expected, rtol=1e-10)
+    assert bootstrap_pvalue(got) == bootstrap_pvalue(expected)
+
+
+
+@pytest.mark.parametrize('method', ['iid', 'moving', 'stationary'])
+def test_parallel_result_independent_of_worker_count(groups, method):
+    year3, other = groups
+    # 300 replicates in chunks of 64: five chunks, the last one partial
+    serial = parallel_sharpe_diff_bootstrap(year3, other, n_sims=300, seed=3, method=method, block_length=10,
+                                            chunk_size=64, n_workers=1)
+    pooled = parallel_sharpe_diff_bootstrap(year3, other, n_sims=300, seed=3, method=method, block_length=10,
+                                            chunk_size=64, n_workers=3)
+    assert serial.shape == (300,)
+    np.testing.assert_array_equal(pooled, serial)
+
+
+def test_stationary_blocks_have_mean_length_and_wrap():
+    n, block_length = 5000, 20
+    idx = resample_indices(np.random.default_rng(0), n, 40, method='stationary', block_length=block_length)
+    assert idx.shape == (40, n) and idx.min() >= 0 and idx.max() < n
+    # Inside a block positions advance by one, modulo n
+    continues = idx[:, 1:] == (idx[:, :-1] + 1) % n
+    blocks = idx.size - continues.sum()
+    assert blocks / idx.shape[0] == pytest.approx(n / block_length, rel=0.05)
+    wraps = continues & (idx[:, :-1] == n - 1)
+    assert wraps.any()
+
+
+def test_moving_blocks_are_contiguous_without_wrap():
+    n, block_length = 1000, 25
+    idx = resample_indices(np.random.default_rng(0), n, 30, method='moving', block_length=block_length)
+    assert idx.shape == (30, n) and idx.max() < n
+    blocks = idx.reshape(30, n // block_length, block_length)
+    assert (np.diff(blocks, axis=2) == 1).all()
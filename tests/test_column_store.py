@@ -0,0 +1,67 @@
+import os
+
+import numpy as np
+import pytest
+
+from column_store import COMPACT_DTYPES, load_dataset, read_meta, store_path
+
+
+@pytest.fixture
+def data_file(synthetic_df, tmp_path):
+    path = tmp_path / 'institutional_data.pkl'
+    synthetic_df.to_pickle(path)
+    return str(path)
+
+
+def memmap_of(values):
+    # The np.memmap a column's array is a view of, if any
+    base = values
+    while base is not None and not isinstance(base, np.memmap):
+        base = base.base
+    return base
+
+
+def test_round_trip_with_compact_dtypes(data_file, synthetic_df):
+    df = load_dataset(data_file)
+    assert list(df.columns) == list(synthetic_df.columns)
+    assert (df.index == synthetic_df.index).all() and df.index.name == synthetic_df.index.name
+    for name in df.columns:
+        assert df[name].dtype == COMPACT_DTYPES.get(name, synthetic_df[name].dtype)
+        np.testing.assert_array_equal(df[name].to_numpy(), synthetic_df[name].to_numpy())
+    assert {'Cycle_Year', 'Is_Year3', 'Is_Election', 'Year'} <= set(COMPACT_DTYPES)
+
+
+def test_columns_are_read_only_memory_maps(data_file):
+    df = load_dataset(data_file, columns=['SP500_Ret', 'Is_Year3'])
+    assert list(df.columns) == ['SP500_Ret', 'Is_Year3']
+    for name in df.columns:
+        values = df[name].to_numpy()
+        assert not values.flags.writeable
+        mapped = memmap_of(values)
+        assert mapped is not None
+        assert os.path.dirname(mapped.filename) == store_path(data_file)
+        with pytest.raises(ValueError):
+            values[0] = values[1]
+
+
+def test_rewritten_pickle_rebuilds_store(data_file, synthetic_df):
+    assert len(load_dataset(data_file)) == len(synthetic_df)
+    first = read_meta(store_path(data_file))['source']
+    synthetic_df.iloc[:-100].to_pickle(data_file)
+    df = load_dataset(data_file)
+    assert len(df) == len(synthetic_df) - 100
+    assert read_meta(store_path(data_file))['source'] != first
+
+
+def test_float32_reads_only_its_own_store(data_file, synthetic_df):
+    df = load_dataset(data_file, float32=True)
+    assert not os.path.exists(store_path(data_file))
+    assert df['SP500_Ret'].dtype == np.float32 and df['Cycle_Year'].dtype == np.int8
+    assert os.path.dirname(memmap_of(df['SP500_Ret'].to_numpy()).filename) == store_path(data_file, float32=True)
+    np.testing.assert_allclose(df['SP500_Ret'], synthetic_df['SP500_Ret'], rtol=1e-6)
+
+    # The float64 store is built separately and loading it leaves the float32 one alone
+    f32_meta = os.stat(os.path.join(store_path(data_file, float32=True), 'meta.json')).st_mtime_ns
+    assert load_dataset(data_file)['SP500_Ret'].dtype == np.float64
+    assert load_dataset(data_file, float32=True)['SP500_Ret'].dtype == np.float32
+    assert os.stat(os.path.join(store_path(data_file, float32=True), 'meta.json')).st_mtime_ns == f32_meta
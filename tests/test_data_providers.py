@@ -0,0 +1,116 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_providers import (CachedProvider, DataProvider, HTTPProvider, LocalFileProvider, export_fixture,
+                            make_fixture_server, normalize_price_frame)
+
+
+def price_frame(days=10):
+    index = pd.bdate_range('2020-01-01', periods=days, name='Date')
+    close = 100 + np.arange(days, dtype=float)
+    return pd.DataFrame({'Close': close, 'Volume': np.arange(days) * 1000}, index=index)
+
+
+@pytest.fixture
+def fixture_dir(tmp_path):
+    export_fixture(price_frame(), 'yfinance', 'SPY', directory=str(tmp_path))
+    return str(tmp_path)
+
+
+@pytest.fixture
+def fixture_url(fixture_dir):
+    server = make_fixture_server(fixture_dir, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    yield f"http://{host}:{port}"
+    server.shutdown()
+    server.server_close()
+
+
+class CountingProvider(DataProvider):
+    source = 'yfinance'
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.calls = []
+
+    def fetch(self, symbol, start=None, end=None):
+        self.calls.append(symbol)
+        return self.frame
+
+
+def test_local_provider_clips_start_inclusive_end_exclusive(fixture_dir):
+    frame = LocalFileProvider(fixture_dir, 'yfinance').fetch('SPY', start='2020-01-03', end='2020-01-08')
+    assert list(frame.index.strftime('%Y-%m-%d')) == ['2020-01-03', '2020-01-06', '2020-01-07']
+
+
+def test_http_provider_matches_local(fixture_dir, fixture_url):
+    local = LocalFileProvider(fixture_dir, 'yfinance').fetch('SPY', start='2020-01-02')
+    remote = HTTPProvider(fixture_url, 'yfinance').fetch('SPY', start='2020-01-02')
+    pd.testing.assert_frame_equal(remote, local)
+
+
+def test_http_provider_fetch_many_skips_missing(fixture_url):
+    frames = HTTPProvider(fixture_url, 'yfinance').fetch_many(['SPY', 'MISSING'])
+    assert list(frames) == ['SPY']
+
+
+def test_cached_provider_hits_after_first_fetch(tmp_path):
+    inner = CountingProvider(price_frame())
+    cached = CachedProvider(inner, str(tmp_path / 'cache'))
+    first = cached.fetch('SPY', start='2020-01-01', end='2020-02-01')
+    second = cached.fetch('SPY', start='2020-01-01', end='2020-02-01')
+    assert inner.calls == ['SPY']
+    pd.testing.assert_frame_equal(first, second)
+
+    # A different range is a different key
+    cached.fetch('SPY', start='2020-01-02', end='2020-02-01')
+    assert inner.calls == ['SPY', 'SPY']
+
+
+def test_cached_provider_fetch_many_only_requests_misses(tmp_path):
+    inner = CountingProvider(price_frame())
+    cached = CachedProvider(inner, str(tmp_path / 'cache'))
+    cached.fetch('SPY', end='2020-02-01')
+    frames = cached.fetch_many(['SPY', 'QQQ'], end='2020-02-01')
+    assert list(frames) == ['SPY', 'QQQ']
+    assert inner.calls == ['SPY', 'QQQ']
+
+
+def test_cached_provider_does_not_store_empty_frames(tmp_path):
+    inner = CountingProvider(pd.DataFrame())
+    cached = CachedProvider(inner, str(tmp_path / 'cache'))
+    cached.fetch('SPY', end='2020-02-01')
+    cached.fetch('SPY', end='2020-02-01')
+    assert inner.calls == ['SPY', 'SPY']
+
+
+def test_cached_provider_expires_open_ended_requests(tmp_path):
+    inner = CountingProvider(price_frame())
+    cached = CachedProvider(inner, str(tmp_path / 'cache'), open_ttl=0)
+    cached.fetch('SPY')
+    cached.fetch('SPY')
+    assert inner.calls == ['SPY', 'SPY']
+
+    cached.open_ttl = 3600
+    cached.fetch('SPY')
+    assert inner.calls == ['SPY', 'SPY']
+
+
+def test_normalize_price_frame_multiindex():
+    index = pd.to_datetime(['2020-01-03', '2020-01-02'])
+    columns = pd.MultiIndex.from_product([['Close', 'Open'], ['SPY', 'QQQ']], names=['Price', 'Ticker'])
+    raw = pd.DataFrame(np.arange(8, dtype=float).reshape(2, 4), index=index, columns=columns)
+
+    spy = normalize_price_frame(raw, 'SPY')
+    assert list(spy.columns) == ['Close', 'Open']
+    assert spy.index.name == 'Date' and spy.index.is_monotonic_increasing
+    assert spy['Close'].tolist() == [4.0, 0.0]
+
+    # Unknown symbol: keep the field level
+    single = normalize_price_frame(raw.xs('QQQ', axis=1, level=-1, drop_level=False), 'OTHER')
+    assert list(single.columns) == ['Close', 'Open']
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from institutional_analysis import excess_returns, full_regression
+from live_state import LiveState
+from rolling_regression import rolling_ols
+from streaming import FACTORS, cycle_design
+
+WINDOWS = (252, 600)
+REPLAY_DAYS = 700  # longer than every window, so the periodic resync runs too
+
+
+@pytest.fixture(scope='module')
+def replayed(synthetic_df):
+    state = LiveState.build(synthetic_df.iloc[:-REPLAY_DAYS], windows=WINDOWS)
+    for i in range(len(synthetic_df) - REPLAY_DAYS, len(synthetic_df)):
+        assert state.append(synthetic_df.iloc[i:i + 1]) == 1
+    return state
+
+
+def test_replayed_regression_matches_full_recompute(synthetic_df, replayed):
+    snap = replayed.snapshot()
+    model = full_regression(excess_returns(synthetic_df))
+    for term in model['params'].index:
+        assert snap['regression']['params'][term] == pytest.approx(model['params'][term], rel=1e-9)
+        assert snap['regression']['bse'][term] == pytest.approx(model['bse'][term], rel=1e-9)
+    assert snap['rows'] == len(synthetic_df)
+
+
+def test_replayed_rolling_alpha_matches_rolling_ols(synthetic_df, replayed):
+    snap = replayed.snapshot()
+    X = pd.DataFrame(cycle_design(synthetic_df, FACTORS), index=synthetic_df.index, columns=replayed.stream.terms)
+    rolled = rolling_ols(synthetic_df['SP500_Ret'] - synthetic_df['RF'], X, list(WINDOWS), hac_lags=1)
+    for window, result in rolled.items():
+        got = snap['rolling'][str(window)]
+        expected_gamma = result.params['Is_Year3'].iloc[-1]
+        if np.isnan(expected_gamma):
+            assert got['gamma'] is None
+        else:
+            assert got['gamma'] == pytest.approx(expected_gamma, rel=1e-8)
+            assert got['t_hac'] == pytest.approx(result.tvalues_hac['Is_Year3'].iloc[-1], rel=1e-8)
+
+
+def test_replay_matches_build_on_full_history(synthetic_df, replayed):
+    built = LiveState.build(synthetic_df, windows=WINDOWS).snapshot()
+    snap = replayed.snapshot()
+    pd.testing.assert_frame_equal(snap['phases'], built['phases'], rtol=1e-10)
+    for key in ('buy_hold', 'year3'):
+        for field in ('current_dd', 'max_dd'):
+            assert snap['drawdown'][key][field] == pytest.approx(built['drawdown'][key][field], rel=1e-10, abs=1e-12)
+
+
+def test_append_skips_seen_days_and_preview_leaves_state(synthetic_df, tmp_path):
+    state = LiveState.build(synthetic_df.iloc[:-5], windows=WINDOWS)
+    assert state.append(synthetic_df.iloc[-10:-5]) == 0
+    before = state.snapshot()['rows']
+    preview = state.preview(synthetic_df.iloc[-5:])
+    assert preview['rows'] == before + 5 and state.snapshot()['rows'] == before
+
+    path = tmp_path / 'live_state.pkl'
+    state.save(path)
+    loaded = LiveState.load(path)
+    assert loaded.matches(synthetic_df) and loaded.snapshot()['rows'] == before
+    assert not loaded.matches(synthetic_df.iloc[:-6])
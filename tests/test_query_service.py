@@ -0,0 +1,104 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from query_service import LRUCache, QueryService, make_server, normalize_params
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == (True, 1)
+    cache.put('c', 3)
+    assert cache.get('b') == (False, None)
+    assert cache.get('a') == (True, 1)
+    assert cache.get('c') == (True, 3)
+    assert cache.stats() == {'entries': 2, 'max_entries': 2, 'hits': 3, 'misses': 1, 'evictions': 1,
+                             'hit_rate': 0.75}
+
+
+@pytest.mark.parametrize('name, params', [
+    ('rolling_alpha', {'window': '5'}),
+    ('rolling_alpha', {'hac_lags': '-1'}),
+    ('rolling_alpha', {'points': '2'}),
+    ('bootstrap', {'block_length': '0'}),
+    ('bootstrap', {'n_sims': '0'}),
+    ('regression', {'lags': '1'}),
+])
+def test_normalize_params_rejects_out_of_range(name, params):
+    with pytest.raises(ValueError):
+        normalize_params(name, params)
+
+
+def test_normalize_params_fills_defaults():
+    assert normalize_params('regression', {'hac_lags': '3', 'start': '2000-01-03T00:00:00'}) == {
+        'ticker': '^GSPC', 'start': '2000-01-03', 'end': None, 'hac_lags': 3}
+
+
+@pytest.fixture
+def service(synthetic_df, tmp_path):
+    # A private copy: the reload test rewrites it
+    path = tmp_path / 'institutional_data.pkl'
+    synthetic_df.to_pickle(path)
+    return QueryService(str(path), cache_entries=4)
+
+
+def test_repeated_query_hits_cache(service):
+    params, first, hit = service.query('regression', {'start': '2010-01-01'})
+    assert not hit and params['hac_lags'] == 1
+    # Equivalent spellings normalize to the same key
+    _, second, hit = service.query('regression', {'start': '2010-01-01T00:00', 'hac_lags': '1'})
+    assert hit and second == first
+    stats = service.cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+
+
+def test_rewritten_dataset_reloads_and_clears_cache(service, synthetic_df):
+    _, before, _ = service.query('regression', {'start': '2010-01-01'})
+    service.query('phase_metrics', {})
+    assert service.cache.stats()['entries'] == 2
+    synthetic_df.iloc[:-250].to_pickle(service.data_file)
+    _, after, hit = service.query('regression', {'start': '2010-01-01'})
+    assert not hit
+    assert service.reloads == 2
+    assert service.cache.stats()['entries'] == 1
+    assert after['rows'] == before['rows'] - 250
+
+
+@pytest.fixture
+def url(service):
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def get(url, path):
+    try:
+        with urllib.request.urlopen(url + path, timeout=60) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as exc:
+        return exc.code, json.loads(exc.read())
+
+
+def test_http_status_mapping(url, service):
+    status, body = get(url, '/regression?hac_lags=2')
+    assert status == 200 and not body['cached'] and body['params']['hac_lags'] == 2
+    assert get(url, '/regression?hac_lags=2')[1]['cached']
+    assert get(url, '/nope')[0] == 404
+    assert get(url, '/rolling_alpha?window=5')[0] == 400
+    assert get(url, '/regression?lags=1')[0] == 400
+    assert get(url, '/regression?start=2100-01-01')[0] == 400
+
+    def broken(**params):
+        raise KeyError('SP500_Ret')
+    service.phase_metrics = broken
+    status, body = get(url, '/phase_metrics')
+    assert status == 500 and 'KeyError' in body['error']
+    assert get(url, '/stats')[1]['endpoints']['regression']['requests'] == 2
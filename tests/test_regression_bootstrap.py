@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+
+from regression_bootstrap import _jackknife, bca_interval, coefficient_bootstrap
+
+
+def iid_design(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({'const': 1.0, 'Mkt_RF': rng.normal(0, 0.01, n), 'SMB': rng.normal(0, 0.005, n),
+                      'Is_Year3': (np.arange(n) * 16 // n % 4 == 3).astype(float)})
+    y = X @ np.array([0.0002, 1.0, 0.2, 0.0004]) + rng.normal(0, 0.002, n)
+    return X, y
+
+
+def test_bca_equals_percentile_for_symmetric_unbiased_statistic():
+    rng = np.random.default_rng(1)
+    half = rng.normal(0, 1, 5000)
+    # Replicates symmetric about the estimate (no bias) and a symmetric jackknife (no skew)
+    replicates = np.concatenate([2.0 + half, 2.0 - half])
+    jack = rng.normal(0, 1, 200)
+    jackknife = 2.0 + np.concatenate([jack, -jack])
+    (low, high), z0, accel = bca_interval(replicates, 2.0, jackknife, alpha=0.05)
+    assert z0 == 0.0
+    assert accel == pytest.approx(0.0, abs=1e-12)
+    np.testing.assert_allclose([low, high], np.quantile(replicates, [0.025, 0.975]), rtol=1e-12)
+
+
+def test_pairs_standard_error_matches_ols_on_iid_data():
+    X, y = iid_design()
+    ols = sm.OLS(y, X).fit()
+    result = coefficient_bootstrap(y, X, method='pairs', n_boot=2000, seed=3, max_chunk_mb=4)
+    assert result['estimate'] == pytest.approx(ols.params['Is_Year3'], rel=1e-9)
+    assert result['n_valid'] == 2000
+    assert result['std_err'] == pytest.approx(ols.bse['Is_Year3'], rel=0.1)
+    low, high = result['ci_percentile']
+    assert low < ols.params['Is_Year3'] < high
+
+
+def test_jackknife_matches_leave_one_out_refits():
+    X, y = iid_design(n=60, seed=2)
+    Xv, yv = X.to_numpy(), y.to_numpy()
+    j = list(X.columns).index('Is_Year3')
+    expected = [np.linalg.lstsq(np.delete(Xv, i, axis=0), np.delete(yv, i), rcond=None)[0][j] for i in range(len(yv))]
+    np.testing.assert_allclose(_jackknife(Xv, yv, j), expected, rtol=1e-9)
+    # Leave-one-cluster-out with 30 clusters of two days
+    codes = np.arange(len(yv)) // 2
+    expected = [np.linalg.lstsq(Xv[codes != g], yv[codes != g], rcond=None)[0][j] for g in range(30)]
+    np.testing.assert_allclose(_jackknife(Xv, yv, j, codes), expected, rtol=1e-9)
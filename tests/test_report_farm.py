@@ -0,0 +1,60 @@
+import json
+import os
+
+import pytest
+
+from benchmarks import synthetic_panel
+from data_providers import DataProvider
+from generate_institutional_pdf import build_story, build_styles
+from report_farm import run_farm
+
+
+class PanelProvider(DataProvider):
+    """Synthetic price panel; symbols outside it fail like a delisted ticker."""
+    source = 'yfinance'
+
+    def __init__(self, prices):
+        self.prices = prices
+
+    def fetch(self, symbol, start=None, end=None):
+        if symbol not in self.prices:
+            raise KeyError(symbol)
+        return self.prices[[symbol]].rename(columns={symbol: 'Close'})
+
+
+@pytest.fixture(scope='module')
+def farm(synthetic_df, synthetic_data_file, tmp_path_factory):
+    returns = synthetic_panel(synthetic_df, 2)
+    prices = (1 + returns).cumprod() * 100
+    out_dir = str(tmp_path_factory.mktemp('reports'))
+    manifest = run_farm(['A0000', 'A0001', 'GONE'], out_dir=out_dir, workers=1, n_boot=20,
+                        provider=PanelProvider(prices), data_file=synthetic_data_file)
+    return out_dir, manifest
+
+
+def test_manifest_records_built_and_skipped(farm):
+    out_dir, manifest = farm
+    with open(os.path.join(out_dir, 'manifest.json'), encoding='utf-8') as f:
+        assert json.load(f) == json.loads(json.dumps(manifest))
+    assert manifest['tickers'] == 3
+    assert manifest['built'] == 2
+    assert manifest['failed'] == []
+    assert manifest['skipped'] == ['GONE']
+    assert [entry['ticker'] for entry in manifest['reports']] == ['A0000', 'A0001']
+    for entry in manifest['reports']:
+        assert entry['status'] == 'ok'
+        assert os.path.getsize(entry['pdf']) > 0
+    assert not os.path.exists(os.path.join(out_dir, 'GONE'))
+
+
+def test_each_report_has_its_own_conclusion(farm):
+    out_dir, _ = farm
+    conclusions = {}
+    for ticker in ('A0000', 'A0001'):
+        with open(os.path.join(out_dir, ticker, 'results.json'), encoding='utf-8') as f:
+            results = json.load(f)
+        assert results['institutional']['asset'] == ticker
+        texts = [flowable.text for flowable in build_story(results, build_styles()) if hasattr(flowable, 'text')]
+        conclusions[ticker] = texts[texts.index("<b>5. CONCLUSION</b>") + 1]
+        assert f"HAC t = {results['institutional']['regression']['tvalues']['Is_Year3']:.2f}" in conclusions[ticker]
+    assert conclusions['A0000'] != conclusions['A0001']
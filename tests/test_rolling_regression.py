@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+
+import rolling_regression
+from rolling_regression import rolling_ols
+
+FACTORS = ['Mkt_RF', 'SMB', 'HML']
+
+
+@pytest.fixture(scope='module')
+def design(synthetic_df):
+    df = synthetic_df.iloc[:1500]
+    X = sm.add_constant(df[FACTORS + ['Is_Year3']].astype(float))
+    return X, df['SP500_Ret'] - df['RF']
+
+
+@pytest.mark.parametrize('hac_lags', [0, 1, 5])
+def test_matches_statsmodels_per_window(design, hac_lags):
+    X, y = design
+    windows = [252, 600]
+    results = rolling_ols(y, X, windows, hac_lags=hac_lags)
+    for window in windows:
+        res = results[window]
+        assert res.params.iloc[:window - 1].isna().all().all()
+        compared = 0
+        for end in range(window, len(X) + 1, 137):
+            row = end - 1
+            if np.linalg.matrix_rank(X.iloc[end - window:end].to_numpy()) < X.shape[1]:
+                assert res.params.iloc[row].isna().all()
+                continue
+            model = sm.OLS(y.iloc[end - window:end], X.iloc[end - window:end])
+            plain = model.fit()
+            hac = model.fit(cov_type='HAC', cov_kwds={'maxlags': hac_lags})
+            compared += 1
+            np.testing.assert_allclose(res.params.iloc[row], plain.params, rtol=1e-8, atol=1e-12)
+            np.testing.assert_allclose(res.bse.iloc[row], plain.bse, rtol=1e-6)
+            np.testing.assert_allclose(res.bse_hac.iloc[row], hac.bse, rtol=1e-6)
+        assert compared >= 3
+
+
+def test_rank_deficient_windows_are_nan(design):
+    X, y = design
+    # Is_Year3 is constant over any window inside one calendar year
+    res = rolling_ols(y, X, [100])[100]
+    year = X.index.year.to_numpy()
+    constant = pd.Series(year).rolling(100).apply(lambda v: v.min() == v.max(), raw=True).to_numpy() == 1
+    assert res.params['Is_Year3'].to_numpy()[constant].size > 0
+    assert np.isnan(res.params['Is_Year3'].to_numpy()[constant]).all()
+
+
+@pytest.mark.parametrize('block_rows', [1, 50, 333])
+def test_hac_independent_of_block_size(design, monkeypatch, block_rows):
+    # Small blocks wrap the prefix ring buffer many times
+    X, y = design
+    windows = [100, 252, 600]
+    expected = rolling_ols(y, X, windows, hac_lags=5)
+    monkeypatch.setattr(rolling_regression, 'BLOCK_ROWS', block_rows)
+    got = rolling_ols(y, X, windows, hac_lags=5)
+    for window in windows:
+        pd.testing.assert_frame_equal(got[window].bse_hac, expected[window].bse_hac, rtol=1e-9)
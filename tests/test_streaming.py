@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from drawdown import max_drawdown
+from streaming import FACTORS, CycleStream, check_against_memory, iter_csv, iter_store
+
+
+def stream_store(data_file, chunk_rows):
+    columns = ['SP500_Ret', 'RF', 'Cycle_Year'] + FACTORS
+    return CycleStream(['SP500_Ret'], rf='RF', factors=FACTORS).consume(iter_store(data_file, chunk_rows, columns))
+
+
+@pytest.mark.parametrize('chunk_rows', [997, 100_000])
+def test_store_stream_matches_in_memory(synthetic_data_file, chunk_rows):
+    stream = stream_store(synthetic_data_file, chunk_rows)
+    for name, diff in check_against_memory(stream, synthetic_data_file).items():
+        assert diff < 1e-9, name
+
+
+def test_chunking_does_not_change_results(synthetic_data_file):
+    one = stream_store(synthetic_data_file, 100_000)
+    many = stream_store(synthetic_data_file, 313)
+    pd.testing.assert_frame_equal(many.phase_table(), one.phase_table(), rtol=1e-10)
+    pd.testing.assert_frame_equal(many.regression(), one.regression(), rtol=1e-10)
+
+
+def test_csv_source_matches_store(synthetic_df, synthetic_data_file, tmp_path):
+    path = tmp_path / 'daily.csv'
+    synthetic_df.to_csv(path)
+    columns = ['SP500_Ret', 'RF', 'Cycle_Year'] + FACTORS
+    from_csv = CycleStream(['SP500_Ret'], rf='RF', factors=FACTORS).consume(iter_csv(path, 1000, columns))
+    from_store = stream_store(synthetic_data_file, 1000)
+    pd.testing.assert_frame_equal(from_csv.phase_table(), from_store.phase_table(), rtol=1e-10)
+
+
+def test_buy_and_hold_drawdown_matches_curve(synthetic_df, synthetic_data_file):
+    stream = stream_store(synthetic_data_file, 777)
+    # Strategy 4 is buy & hold; the running peak starts at the initial wealth of 1
+    curve = np.concatenate([[1.0], np.cumprod(1 + synthetic_df['SP500_Ret'].to_numpy())])
+    np.testing.assert_allclose(stream.drawdown[4].max_drawdown[0], max_drawdown(curve), rtol=1e-9)
@@ -0,0 +1,129 @@
+"""
+Entry/exit timing grid search around the pre-election year.
+
+Each configuration is "enter `entry` units after the start of Year 3, exit
+`exit` units after it" (negative offsets reach back into Year 2), applied to
+every cycle in the data. With prefix arrays of log returns, returns and
+squared returns, each (configuration, cycle) result is a difference of two
+prefix entries, so the whole grid is a few gathers over an
+(entries x exits x cycles) array instead of a backtest per configuration.
+
+unit='month' anchors on calendar months (entry=-3, exit=12 is "Oct of Year 2
+through Dec of Year 3"; entry=0, exit=12 is the calendar Year 3 used
+elsewhere); unit='day' uses trading-day offsets from the first trading day
+of Year 3.
+"""
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+
+def month_label(offset, anchor_phase=3):
+    """Human label for a month offset from January of the anchor year, e.g. -3 -> 'Oct Y2'."""
+    year, month = divmod(offset, 12)
+    phase = (anchor_phase + year - 1) % 4 + 1
+    return f"{MONTHS[month]} Y{phase}"
+
+
+def _boundaries(dates, anchor_years, offsets, unit):
+    # (len(offsets) x cycles) positions into the prefix arrays, -1 where outside the data
+    n = len(dates)
+    if unit == 'day':
+        first_day = np.searchsorted(dates, (anchor_years - 1970).astype('datetime64[Y]').astype('datetime64[D]'))
+        pos = first_day[None, :] + np.asarray(offsets)[:, None]
+        return np.where((pos >= 0) & (pos <= n), pos, -1)
+    if unit == 'month':
+        anchor = (anchor_years - 1970).astype('datetime64[Y]').astype('datetime64[M]')
+        bound = (anchor[None, :] + np.asarray(offsets)[:, None]).astype('datetime64[D]')
+        pos = np.searchsorted(dates, bound)
+        # Require the boundary to fall inside the sample so windows are complete
+        return np.where((bound >= dates[0]) & (bound <= dates[-1] + np.timedelta64(1, 'D')), pos, -1)
+    raise ValueError(f"Unknown unit: {unit}")
+
+
+def timing_grid(returns, entry_offsets, exit_offsets, unit='month', anchor_phase=3, min_cycles=3):
+    """
+    Metrics for every (entry, exit) pair with exit > entry.
+
+    returns: daily return Series with a DatetimeIndex. Returns a tidy frame
+    with per-configuration mean trade return, hit rate across cycles, and
+    annualized vol/Sharpe of the daily returns held, plus the cycle count.
+    Configurations covering fewer than min_cycles complete cycles are dropped.
+    """
+    dates = pd.DatetimeIndex(returns.index).values.astype('datetime64[D]')
+    r = np.asarray(returns, dtype=np.float64)
+    log_prefix = np.concatenate([[0.0], np.cumsum(np.log1p(r))])
+    sum_prefix = np.concatenate([[0.0], np.cumsum(r)])
+    sq_prefix = np.concatenate([[0.0], np.cumsum(r * r)])
+
+    years = np.unique(pd.DatetimeIndex(returns.index).year)
+    anchor_years = years[years % 4 == anchor_phase]
+
+    entries = np.asarray(entry_offsets)
+    exits = np.asarray(exit_offsets)
+    e_pos = _boundaries(dates, anchor_years, entries, unit)[:, None, :]   # (E, 1, C)
+    x_pos = _boundaries(dates, anchor_years, exits, unit)[None, :, :]     # (1, X, C)
+
+    valid = (e_pos >= 0) & (x_pos >= 0) & (x_pos > e_pos)
+    e_idx = np.where(valid, e_pos, 0)
+    x_idx = np.where(valid, x_pos, 0)
+
+    trade = np.where(valid, np.expm1(log_prefix[x_idx] - log_prefix[e_idx]), np.nan)
+    days = np.where(valid, x_idx - e_idx, 0).sum(axis=2)
+    total = np.where(valid, sum_prefix[x_idx] - sum_prefix[e_idx], 0.0).sum(axis=2)
+    total_sq = np.where(valid, sq_prefix[x_idx] - sq_prefix[e_idx], 0.0).sum(axis=2)
+    cycles = valid.sum(axis=2)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_trade = np.nansum(trade, axis=2) / cycles
+        hit_rate = (trade > 0).sum(axis=2) / cycles
+        daily_mean = total / days
+        daily_std = np.sqrt(np.maximum(total_sq - total * daily_mean, 0.0) / (days - 1))
+        sharpe = daily_mean / daily_std * np.sqrt(TRADING_DAYS)
+
+    entry_grid, exit_grid = np.meshgrid(entries, exits, indexing='ij')
+    grid = pd.DataFrame({
+        'Entry': entry_grid.ravel(),
+        'Exit': exit_grid.ravel(),
+        'Cycles': cycles.ravel(),
+        'Days': days.ravel(),
+        'Mean Return (%)': mean_trade.ravel() * 100,
+        'Hit Rate': hit_rate.ravel(),
+        'Vol (%)': daily_std.ravel() * np.sqrt(TRADING_DAYS) * 100,
+        'Sharpe': sharpe.ravel(),
+    })
+    grid = grid[(grid['Exit'] > grid['Entry']) & (grid['Cycles'] >= min_cycles)].reset_index(drop=True)
+    if unit == 'month':
+        grid.insert(2, 'Window', [f"{month_label(e, anchor_phase)} -> {month_label(x - 1, anchor_phase)}"
+                                  for e, x in zip(grid['Entry'], grid['Exit'])])
+    return grid
+
+
+def surface(grid, metric='Sharpe'):
+    """Heatmap-ready (entry x exit) matrix of one metric."""
+    return grid.pivot(index='Entry', columns='Exit', values=metric)
+
+
+def top_configurations(grid, n=20, metric='Sharpe'):
+    return grid.sort_values(metric, ascending=False).head(n).reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    from column_store import load_dataset
+
+    df = load_dataset()
+    grid = timing_grid(df['SP500_Ret'], range(-24, 24), range(-23, 37), unit='month')
+    baseline = grid[(grid['Entry'] == 0) & (grid['Exit'] == 12)]
+    print(f"Evaluated {len(grid):,} month configurations")
+    print("\n--- Baseline: calendar Year 3 ---")
+    print(baseline.round(3).to_string(index=False))
+    print("\n--- Top 10 by Sharpe ---")
+    print(top_configurations(grid, 10).round(3).to_string(index=False))
+    surface(grid).to_csv("timing_surface.csv")
+    print("Saved timing_surface.csv")
+
+    day_grid = timing_grid(df['SP500_Ret'], range(-504, 253, 5), range(-251, 505, 5), unit='day')
+    print(f"\nEvaluated {len(day_grid):,} trading-day configurations")
+    print(top_configurations(day_grid, 10).round(3).to_string(index=False))
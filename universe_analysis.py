@@ -0,0 +1,143 @@
+"""
+Multi-asset universe mode for the election-cycle study.
+
+Loads a panel of prices for many tickers into one wide frame and computes the
+per-ticker, per-phase metrics from election_analysis (mean, vol, Sharpe,
+min/max, win rate) plus a one-tailed Welch t-test of each phase against the
+ticker's other years, all from a single grouped aggregation.
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from data_providers import get_provider, price_series
+
+CYCLE_NAMES = {
+    1: "Post-Election (Year 1)",
+    2: "Midterm (Year 2)",
+    3: "Pre-Election (Year 3)",
+    4: "Election Year (Year 4)",
+}
+
+
+def cycle_of_year(years):
+    """Vectorized get_election_year_cycle: 1..3 by Year % 4, 4 for election years."""
+    remainder = np.asarray(years) % 4
+    return np.where(remainder == 0, 4, remainder)
+
+
+def load_price_panel(tickers, start="1950-01-01", end=None, provider=None, prefer=('Close',)):
+    """Wide frame of prices (dates x tickers); tickers that fail to load are dropped."""
+    provider = provider or get_provider('yfinance')
+    frames = provider.fetch_many(tickers, start=start, end=end)
+    panel = pd.DataFrame({symbol: price_series(frame, prefer) for symbol, frame in frames.items()})
+    return panel.sort_index()
+
+
+def annual_returns(prices):
+    """Calendar-year returns for every column, NaN before a ticker's first full year."""
+    annual = prices.resample('YE').last()
+    return annual.pct_change(fill_method=None).iloc[1:]
+
+
+def _welch(mean1, var1, n1, mean2, var2, n2):
+    se1, se2 = var1 / n1, var2 / n2
+    t_stat = (mean1 - mean2) / np.sqrt(se1 + se2)
+    dof = (se1 + se2) ** 2 / (se1 ** 2 / (n1 - 1) + se2 ** 2 / (n2 - 1))
+    return t_stat, dof
+
+
+def cycle_phase_table(returns):
+    """
+    Tidy per-ticker, per-phase metrics table from a wide (years x tickers) frame.
+
+    One groupby over (Ticker, Cycle) produces count, sum, sum of squares, wins,
+    min and max; everything else, including each phase's Welch test against
+    the rest of that ticker's years, is derived from those sums.
+    """
+    long = returns.rename_axis(index='Date', columns='Ticker').stack().rename('Return').reset_index()
+    long['Cycle'] = cycle_of_year(long['Date'].dt.year)
+    long['Sq'] = long['Return'] ** 2
+    long['Win'] = long['Return'] > 0
+
+    phases = long.groupby(['Ticker', 'Cycle']).agg(
+        Count=('Return', 'count'), Sum=('Return', 'sum'), SumSq=('Sq', 'sum'),
+        Wins=('Win', 'sum'), Min=('Return', 'min'), Max=('Return', 'max'),
+    ).reset_index()
+
+    # Per-ticker totals ("Buy & Hold (All)" rows) are the sum over phases
+    totals = phases.groupby('Ticker').agg(
+        Count=('Count', 'sum'), Sum=('Sum', 'sum'), SumSq=('SumSq', 'sum'),
+        Wins=('Wins', 'sum'), Min=('Min', 'min'), Max=('Max', 'max'),
+    ).reset_index()
+    totals['Cycle'] = 0
+
+    table = pd.concat([phases, totals], ignore_index=True)
+    n = table['Count']
+    mean = table['Sum'] / n
+    var = (table['SumSq'] - table['Sum'] * mean) / (n - 1)
+    std = np.sqrt(var)
+
+    # Rest-of-ticker moments for the phase-vs-other-years test
+    ticker_total = totals.set_index('Ticker').loc[table['Ticker']].reset_index(drop=True)
+    n_rest = ticker_total['Count'] - n
+    sum_rest = ticker_total['Sum'] - table['Sum']
+    mean_rest = sum_rest / n_rest
+    var_rest = (ticker_total['SumSq'] - table['SumSq'] - sum_rest * mean_rest) / (n_rest - 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_stat, dof = _welch(mean, var, n, mean_rest, var_rest, n_rest)
+    is_phase = table['Cycle'] > 0
+    t_stat = t_stat.where(is_phase)
+    # One-tailed: H1 phase mean > other years
+    p_val = pd.Series(stats.t.sf(t_stat, dof), index=table.index).where(is_phase)
+
+    result = pd.DataFrame({
+        "Ticker": table['Ticker'],
+        "Cycle": table['Cycle'],
+        "Name": table['Cycle'].map(CYCLE_NAMES).fillna("Buy & Hold (All)"),
+        "Count": n,
+        "Mean (%)": mean * 100,
+        "Vol (%)": std * 100,
+        "Sharpe": (mean / std).where(std != 0, 0.0),
+        "Min (%)": table['Min'] * 100,
+        "Max (%)": table['Max'] * 100,
+        "Win Rate": table['Wins'] / n,
+        "T-Stat vs Rest": t_stat,
+        "P-Value (1-tailed)": p_val,
+    })
+    return result.sort_values(['Ticker', 'Cycle']).reset_index(drop=True)
+
+
+def analyze_universe(tickers, start="1950-01-01", output="universe_cycle_table.csv"):
+    print(f"Loading price panel for {len(tickers)} tickers...")
+    prices = load_price_panel(tickers, start=start)
+    print(f"Panel: {prices.shape[0]} days x {prices.shape[1]} tickers")
+
+    table = cycle_phase_table(annual_returns(prices))
+    table.to_csv(output, index=False)
+    print(f"Saved {len(table)} rows to {output}")
+
+    year3 = table[table['Cycle'] == 3].sort_values('T-Stat vs Rest', ascending=False)
+    print("\n--- Strongest Pre-Election (Year 3) Effects ---")
+    print(year3[['Ticker', 'Count', 'Mean (%)', 'Sharpe', 'Win Rate', 'T-Stat vs Rest', 'P-Value (1-tailed)']]
+          .head(20).to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Election-cycle phase metrics for a universe of tickers.")
+    parser.add_argument('tickers', nargs='*', help="Tickers to analyze")
+    parser.add_argument('--file', help="Text file with one ticker per line")
+    parser.add_argument('--start', default="1950-01-01")
+    parser.add_argument('--output', default="universe_cycle_table.csv")
+    args = parser.parse_args()
+
+    tickers = list(args.tickers)
+    if args.file:
+        with open(args.file, encoding='utf-8') as f:
+            tickers += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    if not tickers:
+        parser.error("No tickers given")
+    analyze_universe(tickers, start=args.start, output=args.output)
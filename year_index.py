@@ -0,0 +1,194 @@
+"""
+Per-calendar-year sufficient statistics for instant cycle-phase metrics.
+
+build_year_index condenses the ~19k daily rows of institutional_data.pkl into
+one row per (Year, series) holding
+
+    n, sum, sum_sq, log_sum                  -> mean/std/Sharpe, compounded return
+    cum_max, cum_min, max_dd                 -> intra-year log-wealth path summary
+    first_level, last_level                  -> wealth index at year start/end
+
+Phase metrics, Welch tests and drawdowns are then answered from ~75 rows.
+Drawdowns compose exactly across years: entering a year at log level s with
+running peak P, the worst drawdown inside it is max(max_dd, P - (s + cum_min)),
+and the peak becomes max(P, s + cum_max).
+
+The index is saved next to the dataset (institutional_index.pkl) and
+update_year_index rebuilds only the years touched by newly appended days.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+DATA_FILE = "institutional_data.pkl"
+INDEX_FILE = "institutional_index.pkl"
+SERIES = ['SP500_Ret', 'Excess_Ret', 'Mkt_RF', 'SMB', 'HML', 'RF']
+TRADING_DAYS = 252
+
+PHASE_NAMES = {
+    0: "Election Year (Year 4)",
+    1: "Post-Election (Year 1)",
+    2: "Midterm (Year 2)",
+    3: "Pre-Election (Year 3)",
+}
+
+
+def _with_excess(df):
+    if 'Excess_Ret' not in df.columns:
+        df = df.assign(Excess_Ret=df['SP500_Ret'] - df['RF'])
+    return df
+
+
+def build_year_index(df, series=SERIES):
+    """One row per (Year, Series) of sufficient statistics from daily returns."""
+    df = _with_excess(df)
+    years = df.index.year.to_numpy()
+    rows = []
+    for name in series:
+        ret = df[name].to_numpy(dtype=np.float64)
+        log_ret = np.log1p(ret)
+        # Wealth path in logs over the full history; levels are exp of this
+        log_level = np.cumsum(log_ret)
+
+        frame = pd.DataFrame({'Year': years, 'ret': ret, 'sq': ret * ret, 'log': log_ret, 'level': log_level})
+        g = frame.groupby('Year', sort=True)
+        stats_ = g.agg(n=('ret', 'size'), sum=('ret', 'sum'), sum_sq=('sq', 'sum'),
+                       log_sum=('log', 'sum'), last_log_level=('level', 'last'))
+        stats_['first_log_level'] = stats_['last_log_level'] - stats_['log_sum']
+
+        # Intra-year cumulative log return relative to the year's opening level
+        cum = log_level - stats_['first_log_level'].reindex(years).to_numpy()
+        frame['cum'] = cum
+        peak = frame.groupby('Year')['cum'].cummax().clip(lower=0.0)
+        frame['dd'] = peak - cum
+        g = frame.groupby('Year', sort=True)
+        stats_['cum_max'] = g['cum'].max().clip(lower=0.0)
+        stats_['cum_min'] = g['cum'].min().clip(upper=0.0)
+        stats_['max_dd'] = g['dd'].max().clip(lower=0.0)
+
+        stats_['first_level'] = np.exp(stats_.pop('first_log_level'))
+        stats_['last_level'] = np.exp(stats_.pop('last_log_level'))
+        stats_['Series'] = name
+        rows.append(stats_.reset_index())
+
+    index = pd.concat(rows, ignore_index=True)
+    index['Cycle_Year'] = index['Year'] % 4
+    columns = ['Series', 'Year', 'Cycle_Year', 'n', 'sum', 'sum_sq', 'log_sum',
+               'cum_max', 'cum_min', 'max_dd', 'first_level', 'last_level']
+    return index[columns].sort_values(['Series', 'Year']).reset_index(drop=True)
+
+
+def save_year_index(index, path=INDEX_FILE):
+    tmp_path = f"{path}.tmp"
+    index.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def update_year_index(df, path=INDEX_FILE):
+    """
+    Bring the persisted index in line with df, rebuilding only the last indexed
+    year and any later years. Wealth levels of the rebuilt years are chained
+    onto the stored level at the end of the previous year.
+    """
+    if not os.path.exists(path):
+        index = build_year_index(df)
+        save_year_index(index, path)
+        return index
+
+    index = pd.read_pickle(path)
+    first_dirty = index['Year'].max()
+    kept = index[index['Year'] < first_dirty]
+    fresh = build_year_index(df[df.index.year >= first_dirty], series=index['Series'].unique())
+
+    # Rescale the rebuilt years so their wealth index continues from the kept ones
+    base = kept.groupby('Series')['last_level'].last()
+    scale = fresh['Series'].map(base).fillna(1.0)
+    fresh['first_level'] *= scale
+    fresh['last_level'] *= scale
+
+    index = pd.concat([kept, fresh], ignore_index=True).sort_values(['Series', 'Year']).reset_index(drop=True)
+    save_year_index(index, path)
+    return index
+
+
+def load_year_index(data_file=DATA_FILE, index_file=INDEX_FILE):
+    """Load the index, refreshing it first if the dataset has newer days."""
+    if os.path.exists(index_file) and os.path.getmtime(index_file) >= os.path.getmtime(data_file):
+        return pd.read_pickle(index_file)
+    return update_year_index(pd.read_pickle(data_file), index_file)
+
+
+def _select(index, series, years=None, phases=None):
+    rows = index[index['Series'] == series]
+    if years is not None:
+        rows = rows[rows['Year'].isin(years)]
+    if phases is not None:
+        rows = rows[rows['Cycle_Year'].isin(phases)]
+    return rows
+
+
+def chain_drawdown(rows):
+    """Max drawdown (as a negative fraction) of a strategy invested only in `rows`' years."""
+    peak, level, worst = 0.0, 0.0, 0.0
+    for cum_max, cum_min, max_dd, log_sum in rows[['cum_max', 'cum_min', 'max_dd', 'log_sum']].itertuples(index=False):
+        worst = max(worst, max_dd, peak - (level + cum_min))
+        peak = max(peak, level + cum_max)
+        level += log_sum
+    return np.expm1(-worst)
+
+
+def metrics_from_rows(rows, name):
+    """calculate_metrics-style statistics for the days in `rows` (daily and annual views)."""
+    n, total, total_sq = rows['n'].sum(), rows['sum'].sum(), rows['sum_sq'].sum()
+    mean = total / n
+    std = np.sqrt((total_sq - total * mean) / (n - 1))
+    annual = np.expm1(rows['log_sum'].to_numpy())
+    return {
+        "Name": name,
+        "Days": int(n),
+        "Years": len(rows),
+        "Daily Mean (%)": mean * 100,
+        "Daily Vol (%)": std * 100,
+        "Sharpe (Ann.)": mean / std * np.sqrt(TRADING_DAYS) if std != 0 else 0,
+        "Mean Annual (%)": annual.mean() * 100,
+        "Vol Annual (%)": annual.std(ddof=1) * 100 if len(annual) > 1 else np.nan,
+        "Min Annual (%)": annual.min() * 100,
+        "Max Annual (%)": annual.max() * 100,
+        "Win Rate": (annual > 0).mean(),
+        "Max DD (%)": chain_drawdown(rows) * 100,
+    }
+
+
+def phase_metrics(index, series='SP500_Ret', years=None):
+    """Metrics table for every cycle phase plus the full sample, from the year index."""
+    metrics = [metrics_from_rows(_select(index, series, years, [phase]), PHASE_NAMES[phase])
+               for phase in (3, 1, 0, 2)]
+    metrics.append(metrics_from_rows(_select(index, series, years), "Buy & Hold (All)"))
+    return pd.DataFrame(metrics)
+
+
+def compare_phases(index, phase=3, series='Excess_Ret', years=None):
+    """One-tailed Welch t-test of daily returns in `phase` vs all other phases."""
+    rows = _select(index, series, years)
+    in_phase = rows['Cycle_Year'] == phase
+
+    def moments(part):
+        n, total = part['n'].sum(), part['sum'].sum()
+        mean = total / n
+        return mean, (part['sum_sq'].sum() - total * mean) / (n - 1), n
+
+    m1, v1, n1 = moments(rows[in_phase])
+    m2, v2, n2 = moments(rows[~in_phase])
+    se1, se2 = v1 / n1, v2 / n2
+    t_stat = (m1 - m2) / np.sqrt(se1 + se2)
+    dof = (se1 + se2) ** 2 / (se1 ** 2 / (n1 - 1) + se2 ** 2 / (n2 - 1))
+    return {'t_stat': t_stat, 'dof': dof, 'p_value': stats.t.sf(t_stat, dof), 'mean_diff': m1 - m2}
+
+
+if __name__ == "__main__":
+    index = load_year_index()
+    print(f"Year index: {index['Year'].nunique()} years x {index['Series'].nunique()} series")
+    print(phase_metrics(index).round(2).to_string(index=False))
+    print(compare_phases(index))